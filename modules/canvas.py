@@ -1,14 +1,68 @@
 """
 画布组件，用于绘制几何图形
 """
-import math
 from PyQt6.QtWidgets import QWidget, QSizePolicy
-from PyQt6.QtCore import Qt, QRect, pyqtSignal
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt6.QtCore import Qt, QRect, QRectF, QPointF, QLineF, QTimer, pyqtSignal
+from PyQt6.QtGui import QPainter, QPainterPath, QTransform, QPixmap
+
+from modules.scene import SceneStore, load_scene, save_scene
+from modules.render_cache import STYLES, LABELS, GRID
+from modules.scene_renderer import SceneRenderer, fit_transform, paint_scene, tick_step
+from modules.shape_renderers import ShapeRendererRegistry
+from modules.tile_renderer import TileCache
+from modules.motion_predictor import PointerPredictor
+from modules.intersection_cache import IntersectionCache
 
 class Canvas(QWidget):
     """自定义画布组件，用于绘制几何图形"""
     
+    # 预览包围盒的外扩像素，覆盖端点标记和尺寸标签
+    PREVIEW_MARGIN = 40
+    
+    # 标签字体（字体族, 字号, 是否加粗），同时作为标签缓存的键
+    POINT_NAME_FONT = SceneRenderer.POINT_NAME_FONT
+    
+    # 命中测试的容差（像素）
+    HIT_TOLERANCE = 6
+    
+    # 悬停和选中高亮的颜色（半透明，#AARRGGBB）
+    HOVER_COLOR = "#80FFC107"
+    SELECTION_COLOR = "#802196F3"
+    # 高亮的线宽、选中图元自身颜色描边的线宽，以及点高亮圆圈的半径（像素）
+    HIGHLIGHT_WIDTH = 8
+    SELECTION_OUTLINE_WIDTH = 3
+    POINT_HIGHLIGHT_RADIUS = 7
+    # 高亮局部重绘时在图元包围盒外扩的像素：点的高亮圆圈加上整个线宽
+    # （方头线端在对角方向伸出约0.71倍线宽，整个线宽足以覆盖）和抗锯齿余量
+    HIGHLIGHT_MARGIN = POINT_HIGHLIGHT_RADIUS + max(HIGHLIGHT_WIDTH, SELECTION_OUTLINE_WIDTH) + 2
+    
+    # 交点（派生点）标记的颜色和半径（像素）
+    INTERSECTION_COLOR = "#D81B60"
+    INTERSECTION_RADIUS = 4
+    
+    # 细节层次：可见图元数超过该值时省略标签，并合并屏幕上重叠的点
+    LOD_DENSITY = 500
+    
+    # 图元数达到该值时改用后台线程分块渲染，避免在GUI线程上重建整个静态图层
+    TILED_RENDERING_THRESHOLD = 5000
+    # 可见区域向外扩展的像素，保证视口边缘的点标记和标签完整
+    CULL_MARGIN = 20
+    
+    # 无法获取屏幕刷新率时使用的默认值（Hz）
+    DEFAULT_REFRESH_RATE = 60
+    # 启用运动预测时，预览向前外推的帧数（补偿输入到显示的延迟）
+    PREDICTION_FRAMES = 1.5
+    
+    # 缩放范围（每单位网格的像素距离）和滚轮每格的缩放倍数
+    DEFAULT_GRID_SPACING = 50
+    MIN_GRID_SPACING = 0.01
+    MAX_GRID_SPACING = 100000
+    ZOOM_STEP = 1.15
+    # 刻度之间的目标像素距离，实际刻度间距取最接近的 1/2/5×10^n 网格单位
+    TICK_TARGET_PIXELS = 50
+    # 适应窗口时四周保留的像素
+    FIT_MARGIN = 40
+    
     # 信号定义
     mouse_position_changed = pyqtSignal(float, float)  # 传递网格坐标
     point_created = pyqtSignal(dict)  # 传递点数据
@@ -28,11 +82,8 @@ class Canvas(QWidget):
             }
         """)
         
-        # 存储绘制的点和线段
-        self.points = []
-        self.lines = []
-        self.line_texts = []  # 存储线段长度文本
-        self.shapes = []  # 存储其他形状
+        # 已提交的点、线段和形状统一保存在列式场景存储中（网格坐标）
+        self.scene = SceneStore()
         
         # 临时绘制状态
         self.temp_shape = None
@@ -41,78 +92,388 @@ class Canvas(QWidget):
         self.line_start_point = None
         self.triangle_points = []
         
-        # 当前选中的项
+        # 当前选中的项和鼠标悬停的项，均为 (类型, ID)
         self.selected_item = None
+        self.hovered_item = None
         
-        # 坐标轴设置
+        # 细节层次阈值，可按需调整
+        self.lod_density = self.LOD_DENSITY
+        
+        # 坐标轴和方格纸背景设置
         self.show_axes = True
-        self.grid_spacing = 50  # 每单位网格线间的像素距离
+        self.show_grid = True
+        self.show_intersections = False  # 是否标出图形之间的交点
+        self.grid_spacing = self.DEFAULT_GRID_SPACING  # 每单位网格线间的像素距离
         self.axis_color = "#555555"
         
+        # 平移偏移（像素），原点位于画布中心加上该偏移处
+        self._pan_x = 0.0
+        self._pan_y = 0.0
+        self._pan_anchor = None  # 拖动平移时上一次的指针位置
+        self._pan_button = None  # 发起拖动平移的鼠标按键
+        
+        # 网格坐标到屏幕坐标的缓存变换，仅在尺寸、缩放或平移变化时重建
+        self._transform = QTransform()
+        self._inverse_transform = QTransform()
+        self._rebuild_transform()
+        
+        # 静态图层：坐标轴和已提交图形的离屏缓存，场景变化时才重新光栅化
+        self._static_layer = None
+        self._static_key = None
+        self._static_origin = None  # 绘制静态图层时原点的屏幕位置，平移时据此滚动图层
+        
+        # 大场景的后台瓦片渲染
+        self._tiles = TileCache(self)
+        self._tiles.tile_ready.connect(self._on_tile_ready)
+        
+        # 场景交点：编辑后增量更新，全量重建在线程池中进行，完成后重绘
+        self._intersections = IntersectionCache(self)
+        self._intersections.ready.connect(self.update)
+        
+        # 当前预览在屏幕上的包围盒，用于局部重绘
+        self._preview_bounds = QRect()
+        
+        # 鼠标移动合并：每帧只处理最新的指针位置
+        self._pending_move = None
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._move_timer.timeout.connect(self._on_move_frame)
+        
+        # 指针运动预测（可选），只影响绘制中的预览
+        self._predictor = None
+        self._last_move = None       # 最近处理的真实指针位置
+        self._move_predicted = False # 最近一次预览是否使用了预测位置
+        
         # 启用鼠标跟踪
         self.setMouseTracking(True)
 
         self.shape_handler = None  # 当前激活的形状处理器
         self.draw_mode = None      # 当前绘制模式
         self.current_shape = None  # 当前形状类型
+        # 在设置处理器时一次性绑定的事件入口和预览绘制函数，事件处理中不再做反射查找
+        self._handler_press = None
+        self._handler_move = None
+        self._handler_release = None
+        self._draw_preview = ShapeRendererRegistry.preview_for(None)
     
     def set_shape_handler(self, handler):
-        """设置当前形状处理器"""
+        """设置当前形状处理器（None表示没有绘制工具），并绑定其事件入口和预览绘制函数"""
         self.shape_handler = handler
+        self._reset_prediction()
+        if handler is None:
+            self._handler_press = self._handler_move = self._handler_release = None
+            self._draw_preview = ShapeRendererRegistry.preview_for(None)
+            return
+        self._handler_press = handler.dispatch_press
+        self._handler_move = handler.dispatch_move
+        self._handler_release = handler.dispatch_release
+        self._draw_preview = ShapeRendererRegistry.preview_for(handler.shape_type)
 
     def clear(self):
         """清除画布上的所有内容"""
-        self.points = []
-        self.lines = []
-        self.line_texts = []
-        self.shapes = []
+        self._pending_move = None
+        self.scene.clear()
+        self._tiles.clear()
         self.temp_shape = None
         self.temp_point = None
         self.temp_endpoints = []
         self.line_start_point = None
         self.triangle_points = []
         self.selected_item = None
+        self.hovered_item = None
         self.draw_mode = None  # 清除时也重置绘制模式
         self.current_shape = None
         self.update()
         self.canvas_cleared.emit()
     
+    def save_scene(self, path):
+        """把已提交的图形保存为场景文件（可由scene_export在无界面环境中渲染）"""
+        save_scene(self.scene, path)
+    
+    def load_scene(self, path):
+        """加载场景文件，替换画布上的所有内容
+
+        新场景的修订号从头计数，可能与旧场景的相同，因此静态图层和瓦片必须显式丢弃。
+        """
+        self.clear()
+        self.scene = load_scene(path)
+        self._static_layer = None
+        self._static_key = None
+        self._static_origin = None
+        self._tiles.clear()
+        self._intersections.clear()
+        self.update()
+    
+    def _rebuild_transform(self):
+        """重建网格坐标到屏幕坐标的变换，缩放变化时清空标签缓存"""
+        if self._transform.m11() != self.grid_spacing:
+            # 换一个缩放级别后可见的刻度和标签基本都不同了，旧的排版结果不再复用
+            LABELS.clear()
+        origin_x = self.width() // 2 + self._pan_x
+        origin_y = self.height() // 2 + self._pan_y
+        # Y轴方向相反
+        self._transform = QTransform(self.grid_spacing, 0, 0, -self.grid_spacing,
+                                     origin_x, origin_y)
+        self._inverse_transform, _ = self._transform.inverted()
+    
+    def set_grid_spacing(self, spacing):
+        """设置缩放级别（每单位网格的像素距离），原点位置不变"""
+        spacing = min(max(spacing, self.MIN_GRID_SPACING), self.MAX_GRID_SPACING)
+        if spacing == self.grid_spacing:
+            return
+        self.grid_spacing = spacing
+        self._rebuild_transform()
+        self.update()
+    
+    def pan_by(self, dx, dy):
+        """按屏幕像素平移视图"""
+        if not dx and not dy:
+            return
+        self._pan_x += dx
+        self._pan_y += dy
+        self._rebuild_transform()
+        self.update()
+    
+    def zoom_at(self, screen_x, screen_y, factor):
+        """以屏幕上的一点为中心缩放，该点下的网格坐标保持不动"""
+        grid_x, grid_y = self.screen_to_grid(screen_x, screen_y)
+        spacing = min(max(self.grid_spacing * factor, self.MIN_GRID_SPACING),
+                      self.MAX_GRID_SPACING)
+        if spacing == self.grid_spacing:
+            return
+        self.grid_spacing = spacing
+        self._rebuild_transform()
+        mapped_x, mapped_y = self.grid_to_screen(grid_x, grid_y)
+        self._pan_x += screen_x - mapped_x
+        self._pan_y += screen_y - mapped_y
+        self._rebuild_transform()
+        self.update()
+    
+    def zoom_to_fit(self):
+        """缩放并平移视图，使全部图元居中显示（使用场景维护的包围盒）"""
+        if self.scene.extent() is None:
+            self.reset_view()
+            return
+        fit = fit_transform(self.scene, self.width(), self.height(), self.FIT_MARGIN,
+                            self.grid_spacing)
+        self.grid_spacing = min(max(fit.m11(), self.MIN_GRID_SPACING), self.MAX_GRID_SPACING)
+        # 包围盒中心对准画布中心
+        self._pan_x = fit.dx() - self.width() // 2
+        self._pan_y = fit.dy() - self.height() // 2
+        self._rebuild_transform()
+        self.update()
+    
+    def reset_view(self):
+        """恢复默认缩放，原点回到画布中心"""
+        self.grid_spacing = self.DEFAULT_GRID_SPACING
+        self._pan_x = 0.0
+        self._pan_y = 0.0
+        self._rebuild_transform()
+        self.update()
+    
+    def set_lod_density(self, density):
+        """设置进入简化绘制的可见图元数阈值"""
+        self.lod_density = density
+        self.invalidate_static_layer()
+    
     def grid_to_screen(self, grid_x, grid_y):
         """将网格坐标转换为屏幕坐标"""
-        center_x = self.width() // 2
-        center_y = self.height() // 2
-        screen_x = center_x + grid_x * self.grid_spacing
-        screen_y = center_y - grid_y * self.grid_spacing  # Y轴方向相反
-        return screen_x, screen_y
+        return self._transform.map(float(grid_x), float(grid_y))
     
     def screen_to_grid(self, screen_x, screen_y):
         """将屏幕坐标转换为网格坐标"""
-        center_x = self.width() // 2
-        center_y = self.height() // 2
-        grid_x = (screen_x - center_x) / self.grid_spacing
-        grid_y = (center_y - screen_y) / self.grid_spacing  # Y轴方向相反
-        return grid_x, grid_y
+        return self._inverse_transform.map(float(screen_x), float(screen_y))
     
-    def paintEvent(self, event):
-        """绘制事件处理"""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    def resizeEvent(self, event):
+        """尺寸变化时重建坐标变换"""
+        self._rebuild_transform()
+        super().resizeEvent(event)
+    
+    def invalidate_static_layer(self):
+        """使静态图层失效，下一帧重新光栅化"""
+        self._static_key = None
+        self.update()
+    
+    def _static_layer_key(self):
+        """静态图层内容依赖的状态，任一变化都需要重建；平移不在其中，由滚动图层处理"""
+        # 坐标轴进出可见范围时刻度标签的取舍会变，此时也整幅重建
+        margin = SceneRenderer.AXIS_MARGIN
+        transform = self._transform
+        axes_visible = (-margin <= transform.dx() <= self.width() + margin,
+                        -margin <= transform.dy() <= self.height() + margin)
+        return (self.scene.revision, self.show_axes, self.show_grid, self.width(), self.height(),
+                transform.m11(), axes_visible, self.lod_density, self.devicePixelRatioF())
+    
+    def _paint_static(self, pixmap, regions=None):
+        """把背景、坐标轴和已提交图元绘制到静态图层上（regions为None时绘制整幅）"""
+        painter = QPainter(pixmap)
+        paint_scene(painter, self.scene, self._transform, self.width(), self.height(),
+                    show_axes=self.show_axes, axis_color=self.axis_color,
+                    tick_pixels=self.TICK_TARGET_PIXELS, lod_density=self.lod_density,
+                    labels=LABELS, margin=self.CULL_MARGIN,
+                    grid=GRID if self.show_grid else None, regions=regions)
+        painter.end()
+    
+    def _scroll_static_layer(self, origin):
+        """平移后把静态图层按位移滚动，只重绘露出的条带；无法滚动时返回False"""
+        ratio = self._static_layer.devicePixelRatio()
+        shift_x = origin[0] - self._static_origin[0]
+        shift_y = origin[1] - self._static_origin[1]
+        device_x, device_y = shift_x * ratio, shift_y * ratio
+        width, height = self.width(), self.height()
+        # 位移必须是整数个设备像素（否则无法逐像素复用），且不超过图层尺寸
+        if (device_x != round(device_x) or device_y != round(device_y) or
+                abs(shift_x) >= width or abs(shift_y) >= height):
+            return False
         
-        # 绘制白色背景
-        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+        pixmap = self._static_layer
+        pixmap.scroll(int(device_x), int(device_y), pixmap.rect())
+        exposed = []
+        if shift_x > 0:
+            exposed.append(QRectF(0, 0, shift_x, height))
+        elif shift_x < 0:
+            exposed.append(QRectF(width + shift_x, 0, -shift_x, height))
+        if shift_y > 0:
+            exposed.append(QRectF(0, 0, width, shift_y))
+        elif shift_y < 0:
+            exposed.append(QRectF(0, height + shift_y, width, -shift_y))
+        self._paint_static(pixmap, exposed)
+        return True
+    
+    def _ensure_static_layer(self):
+        """返回最新的静态图层，必要时重建；仅平移时滚动复用已有图层"""
+        key = self._static_layer_key()
+        transform = self._transform
+        origin = (transform.dx(), transform.dy())
+        if self._static_layer is not None and key == self._static_key:
+            if origin == self._static_origin or self._scroll_static_layer(origin):
+                self._static_origin = origin
+                return self._static_layer
+        
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+        pixmap.setDevicePixelRatio(ratio)
+        
+        # 白色背景（或方格纸）、坐标轴和可见的已提交图元，可见图元过多时进入简化模式
+        self._paint_static(pixmap)
+        
+        self._static_layer = pixmap
+        self._static_key = key
+        self._static_origin = origin
+        return pixmap
+    
+    def preview_bounds(self, grid_points, radius=0.0):
+        """计算预览图形（含标签）在屏幕上的包围矩形
         
-        # 绘制坐标轴
+        Args:
+            grid_points: 预览涉及的网格坐标点
+            radius: 以第一个点为圆心的圆半径（网格单位）
+        """
+        screen_points = [self._transform.map(float(x), float(y)) for x, y in grid_points]
+        xs = [x for x, _ in screen_points]
+        ys = [y for _, y in screen_points]
+        if radius:
+            center_x, center_y = screen_points[0]
+            screen_radius = radius * self.grid_spacing
+            xs += [center_x - screen_radius, center_x + screen_radius]
+            ys += [center_y - screen_radius, center_y + screen_radius]
+        bounds = QRectF(QPointF(min(xs), min(ys)), QPointF(max(xs), max(ys))).toAlignedRect()
+        margin = self.PREVIEW_MARGIN
+        return bounds.adjusted(-margin, -margin, margin, margin)
+    
+    def hit_test(self, screen_x, screen_y):
+        """返回屏幕坐标处（容差范围内）最近的已提交图元，没有则返回None"""
+        grid_x, grid_y = self.screen_to_grid(screen_x, screen_y)
+        return self.scene.nearest(grid_x, grid_y, self.HIT_TOLERANCE / self.grid_spacing)
+    
+    def item_screen_bounds(self, key):
+        """图元高亮在屏幕上的包围矩形"""
+        bounds = self.scene.bounds(key)
+        if bounds is None:
+            return QRect()
+        min_x, min_y, max_x, max_y = bounds
+        rect = self._transform.mapRect(QRectF(QPointF(min_x, min_y), QPointF(max_x, max_y)))
+        margin = self.HIGHLIGHT_MARGIN
+        return rect.toAlignedRect().adjusted(-margin, -margin, margin, margin)
+    
+    def set_hovered_item(self, key):
+        """更新悬停项，只重绘新旧高亮区域"""
+        if key == self.hovered_item:
+            return
+        dirty = self.item_screen_bounds(self.hovered_item) if self.hovered_item else QRect()
+        self.hovered_item = key
+        if key is not None:
+            dirty = dirty.united(self.item_screen_bounds(key))
+        self.update(dirty)
+    
+    def select_item(self, key):
+        """选中图元（None表示取消选中），选中高亮画在静态图层之上，只重绘新旧高亮区域"""
+        if key == self.selected_item:
+            return
+        dirty = self.item_screen_bounds(self.selected_item) if self.selected_item else QRect()
+        self.selected_item = key
+        if key is not None:
+            dirty = dirty.united(self.item_screen_bounds(key))
+        self.update(dirty)
+    
+    def update_preview(self, bounds):
+        """报告预览的新包围盒，只重绘新旧包围盒的并集"""
+        dirty = self._preview_bounds.united(bounds)
+        self._preview_bounds = bounds
+        self.update(dirty)
+    
+    def uses_tiled_rendering(self):
+        """场景较大时使用后台瓦片渲染"""
+        return len(self.scene) >= self.TILED_RENDERING_THRESHOLD
+    
+    def _on_tile_ready(self, key):
+        """瓦片绘制完成，只重绘瓦片所在区域"""
+        transform = self._transform
+        self.update(self._tiles.tile_rect(key, transform.dx(), transform.dy()))
+    
+    def _paint_tiles(self, painter, dirty):
+        """大场景：背景和坐标轴在GUI线程绘制，已提交图元由瓦片合成"""
+        if self.show_grid:
+            renderer = SceneRenderer(self.scene, self._transform)
+            renderer.draw_grid(painter, self.width(), self.height(), GRID,
+                               self.TICK_TARGET_PIXELS, "#FFFFFF")
+        else:
+            painter.fillRect(dirty, Qt.GlobalColor.white)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         if self.show_axes:
             self._draw_coordinate_axes(painter)
+        self._tiles.sync(self.scene, self.lod_density, self.width() * self.height())
+        transform = self._transform
+        self._tiles.paint(painter, dirty, transform.dx(), transform.dy(),
+                          self.grid_spacing, self.devicePixelRatioF())
+    
+    def paintEvent(self, event):
+        """绘制事件处理：贴上静态图层（或合成瓦片），再绘制实时预览"""
+        dirty = event.rect()
+        painter = QPainter(self)
+        painter.setClipRect(dirty)
+        if self.uses_tiled_rendering():
+            self._static_layer = None
+            self._paint_tiles(painter, dirty)
+        else:
+            layer = self._ensure_static_layer()
+            ratio = layer.devicePixelRatio()
+            # 只贴回脏区域对应的静态图层部分
+            source = QRectF(dirty.x() * ratio, dirty.y() * ratio,
+                            dirty.width() * ratio, dirty.height() * ratio)
+            painter.drawPixmap(QRectF(dirty), layer, source)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
-        # 绘制已保存的点
-        self._draw_points(painter)
-        
-        # 绘制已保存的线段
-        self._draw_lines(painter)
+        # 标出图形之间的交点
+        if self.show_intersections:
+            self._draw_intersections(painter, dirty)
         
-        # 绘制保存的形状
-        self._draw_shapes(painter)
+        # 绘制选中和悬停高亮
+        if self.selected_item:
+            self._draw_selection(painter, self.selected_item)
+        if self.hovered_item and self.hovered_item != self.selected_item:
+            self._draw_highlight(painter, self.hovered_item, self.HOVER_COLOR)
         
         # 绘制临时形状
         self._draw_temp_shapes(painter)
@@ -125,315 +486,302 @@ class Canvas(QWidget):
         if self.temp_endpoints:
             self._draw_temp_endpoints(painter)
     
+    def tick_step(self):
+        """当前缩放下的刻度间距（网格单位）"""
+        return tick_step(self.grid_spacing, self.TICK_TARGET_PIXELS)
+    
     def _draw_coordinate_axes(self, painter):
-        """绘制坐标轴"""
-        # 获取画布中心点
-        center_x = self.width() // 2
-        center_y = self.height() // 2
-        
-        # 设置坐标轴样式
-        painter.setPen(QPen(QColor(self.axis_color), 1))
-        
-        # 绘制X轴和Y轴
-        painter.drawLine(0, center_y, self.width(), center_y)  # X轴
-        painter.drawLine(center_x, 0, center_x, self.height())  # Y轴
-        
-        # 绘制刻度和标签
-        painter.setFont(QFont("Arial", 8))
-        
-        # 绘制X轴刻度
-        for i in range(-10, 11):
-            if i == 0:  # 跳过原点
-                continue
-            
-            x = center_x + i * self.grid_spacing
-            if 0 <= x <= self.width():
-                painter.drawLine(x, center_y - 5, x, center_y + 5)
-                painter.drawText(QRect(x - 10, center_y + 10, 20, 15), 
-                                Qt.AlignmentFlag.AlignCenter, str(i))
-        
-        # 绘制Y轴刻度
-        for i in range(-10, 11):
-            if i == 0:  # 跳过原点
-                continue
-            
-            y = center_y + i * self.grid_spacing
-            if 0 <= y <= self.height():
-                painter.drawLine(center_x - 5, y, center_x + 5, y)
-                painter.drawText(QRect(center_x + 10, y - 10, 20, 20), 
-                                Qt.AlignmentFlag.AlignCenter, str(-i))
-        
-        # 在原点绘制O标记
-        painter.drawText(QRect(center_x + 10, center_y + 10, 15, 15), 
-                        Qt.AlignmentFlag.AlignCenter, "O")
-    
-    def _draw_points(self, painter):
-        """绘制已保存的点"""
-        for i, point in enumerate(self.points):
-            # 设置点的颜色
-            painter.setPen(QPen(QColor(point['color']), 2))
-            painter.setBrush(QBrush(QColor(point['color'])))
-            x = int(point['x'])
-            y = int(point['y'])
-            
-            # 绘制点
-            painter.drawEllipse(x - 5, y - 5, 10, 10)
-            
-            # 绘制点的名称标签
-            point_name = 'ABCDEFGHIJKLMN'[i % 14]
-            
-            painter.setPen(QPen(QColor("#000000")))
-            font = QFont("Arial", 10)
-            font.setBold(True)
-            painter.setFont(font)
-            
-            painter.drawText(x - 5, y - 10, point_name)
-    
-    def _draw_lines(self, painter):
-        """绘制已保存的线段"""
-        for i, line in enumerate(self.lines):
-            if self.selected_item == ('line', i):
-                # 选中的线段用更粗的线
-                painter.setPen(QPen(QColor(line['color']), 3))
-            else:
-                painter.setPen(QPen(QColor(line['color']), 2))
-            
-            painter.drawLine(int(line['x1']), int(line['y1']), int(line['x2']), int(line['y2']))
-            
-            # 绘制线段长度文本
-            if i < len(self.line_texts):
-                text = self.line_texts[i]
-                mid_x = int((line['x1'] + line['x2']) / 2)
-                mid_y = int((line['y1'] + line['y2']) / 2)
-                painter.drawText(QRect(mid_x - 20, mid_y - 10, 40, 20), 
-                                Qt.AlignmentFlag.AlignCenter, text)
-    
-    def _draw_shapes(self, painter):
-        """绘制保存的形状"""
-        for shape in self.shapes:
-            if shape['type'] == 'circle':
-                # 绘制圆形
-                painter.setPen(QPen(QColor(shape['color']), 2))
-                painter.setBrush(Qt.BrushStyle.NoBrush)  # 不填充
-                
-                center_x, center_y = shape['center']
-                radius = shape['radius']
-                painter.drawEllipse(int(center_x - radius), int(center_y - radius), 
-                                   int(radius * 2), int(radius * 2))
+        """绘制坐标轴（只为可见区间生成刻度）"""
+        renderer = SceneRenderer(self.scene, self._transform, labels=LABELS)
+        renderer.draw_axes(painter, self.width(), self.height(), self.axis_color,
+                           self.TICK_TARGET_PIXELS)
+    
+    def _draw_highlight(self, painter, key, color):
+        """在图元轮廓上叠加一层半透明的粗线高亮"""
+        location = self.scene.locate(key[1])
+        if location is not None:
+            self._draw_outline(painter, *location, STYLES.pen(color, self.HIGHLIGHT_WIDTH))
+    
+    def _draw_selection(self, painter, key):
+        """选中高亮；选中的线段和多边形再用自身颜色加粗描一遍（不进入静态图层）"""
+        location = self.scene.locate(key[1])
+        if location is None:
+            return
+        kind, row = location
+        self._draw_outline(painter, kind, row, STYLES.pen(self.SELECTION_COLOR, self.HIGHLIGHT_WIDTH))
+        if kind == 'line' or kind == 'polygon':
+            column = self.scene.lines if kind == 'line' else self.scene.polygons
+            color = self.scene.colors[column.color[row]]
+            self._draw_outline(painter, kind, row, STYLES.pen(color, self.SELECTION_OUTLINE_WIDTH))
+    
+    def _draw_outline(self, painter, kind, row, pen):
+        """用给定画笔描出场景中一个图元的轮廓"""
+        transform = self._transform
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        if kind == 'point':
+            points = self.scene.points
+            x, y = transform.map(points.x[row], points.y[row])
+            radius = self.POINT_HIGHLIGHT_RADIUS
+            painter.drawEllipse(QPointF(x, y), radius, radius)
+        elif kind == 'line':
+            lines = self.scene.lines
+            painter.drawLine(QLineF(*transform.map(lines.x1[row], lines.y1[row]),
+                                    *transform.map(lines.x2[row], lines.y2[row])))
+        elif kind == 'circle':
+            circles = self.scene.circles
+            screen_radius = circles.r[row] * self.grid_spacing
+            painter.drawEllipse(QPointF(*transform.map(circles.cx[row], circles.cy[row])),
+                                screen_radius, screen_radius)
+        else:
+            path = QPainterPath()
+            vertices = [QPointF(*transform.map(x, y))
+                        for x, y in self.scene.polygons.vertices(row)]
+            path.moveTo(vertices[0])
+            for vertex in vertices[1:]:
+                path.lineTo(vertex)
+            path.closeSubpath()
+            painter.drawPath(path)
+    
+    def intersection_points(self):
+        """场景中需要标出的交点（网格坐标），不含与已有点重合的交点
+
+        全量重建尚未完成时返回上一次的结果，不阻塞绘制。
+        """
+        return self._intersections.points(self.scene)
+    
+    def _draw_intersections(self, painter, dirty):
+        """在脏区域内的交点处绘制空心圆标记"""
+        margin = self.INTERSECTION_RADIUS + 2
+        visible = self._inverse_transform.mapRect(
+            QRectF(dirty.adjusted(-margin, -margin, margin, margin)))
+        min_x, max_x = visible.left(), visible.right()
+        min_y, max_y = visible.top(), visible.bottom()
+        radius = self.INTERSECTION_RADIUS
+        painter.setPen(STYLES.pen(self.INTERSECTION_COLOR, 2))
+        painter.setBrush(STYLES.brush("#FFFFFF"))
+        transform = self._transform
+        for x, y in self.intersection_points():
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                painter.drawEllipse(QPointF(*transform.map(x, y)), radius, radius)
     
     def _draw_temp_shapes(self, painter):
-        """绘制临时形状"""
+        """绘制临时形状（由当前处理器对应的预览函数绘制）"""
         if not self.temp_shape or not self.line_start_point:
             return
         
-        # 设置虚线样式，无填充
-        painter.setPen(QPen(QColor("#999999"), 1, Qt.PenStyle.DashLine))
-        painter.setBrush(Qt.BrushStyle.NoBrush)  # 确保无填充
-        
-        # 根据当前形状类型绘制临时预览
-        if hasattr(self, 'current_shape'):
-            if self.current_shape == "rectangle" or self.current_shape == "rectangle_preview":
-                # 绘制矩形预览
-                x1, y1 = self.line_start_point
-                x2, y2 = self.temp_shape
-                
-                # 计算矩形边界
-                min_x, max_x = min(x1, x2), max(x1, x2)
-                min_y, max_y = min(y1, y2), max(y1, y2)
-                width = max_x - min_x
-                height = max_y - min_y
-                
-                # 绘制矩形（无填充）
-                painter.drawRect(int(min_x), int(min_y), int(width), int(height))
-                
-                # 计算实际尺寸
-                real_width = width / self.grid_spacing
-                real_height = height / self.grid_spacing
-                
-                # 绘制尺寸标签
-                painter.setPen(QPen(QColor("#333333"), 1))
-                painter.setBrush(Qt.BrushStyle.NoBrush)
-                font = QFont("Arial", 9)
-                painter.setFont(font)
-                
-                # 在上边绘制宽度
-                mid_x_top = int((min_x + max_x) / 2)
-                painter.drawText(mid_x_top - 15, int(min_y) - 5, f"{real_width:.1f}")
-                
-                # 在左边绘制高度
-                mid_y_left = int((min_y + max_y) / 2)
-                painter.drawText(int(min_x) - 25, mid_y_left + 5, f"{real_height:.1f}")
-            
-            elif self.current_shape == "circle" or self.current_shape == "circle_preview":
-                # 绘制圆形预览
-                center_x, center_y = self.line_start_point
-                temp_x, temp_y = self.temp_shape
-                radius = math.sqrt((temp_x - center_x)**2 + (temp_y - center_y)**2)
-                
-                # 绘制圆形（虚线）
-                painter.drawEllipse(int(center_x - radius), int(center_y - radius),
-                                  int(radius * 2), int(radius * 2))
-                
-                # 绘制半径线（虚线）
-                painter.drawLine(int(center_x), int(center_y), int(temp_x), int(temp_y))
-                
-                # 计算实际半径
-                real_radius = radius / self.grid_spacing
-                
-                # 绘制半径标签
-                painter.setPen(QPen(QColor("#333333"), 1))
-                font = QFont("Arial", 9)
-                painter.setFont(font)
-                
-                # 在半径线的中点显示半径长度
-                mid_x = int((center_x + temp_x) / 2)
-                mid_y = int((center_y + temp_y) / 2)
-                painter.drawText(mid_x + 5, mid_y - 5, f"r={real_radius:.1f}")
-            
-            elif self.current_shape == "triangle" or self.current_shape == "triangle_preview":
-                # 绘制三角形预览
-                x1, y1 = self.line_start_point
-                temp_x, temp_y = self.temp_shape
-                
-                # 如果有第二个点，绘制部分三角形
-                if self.triangle_points:
-                    x2, y2 = self.triangle_points[0]
-                    # 绘制已确定的边
-                    painter.setPen(QPen(QColor("#666666"), 2))
-                    painter.drawLine(int(x1), int(y1), int(x2), int(y2))
-                    
-                    # 计算并显示第一条边的长度
-                    side1_length = math.sqrt((x2 - x1)**2 + (y2 - y1)**2) / self.grid_spacing
-                    mid_x1 = int((x1 + x2) / 2)
-                    mid_y1 = int((y1 + y2) / 2)
-                    painter.setPen(QPen(QColor("#333333"), 1))
-                    font = QFont("Arial", 9)
-                    painter.setFont(font)
-                    painter.drawText(mid_x1 + 5, mid_y1 - 5, f"{side1_length:.1f}")
-                    
-                    # 绘制临时边
-                    painter.setPen(QPen(QColor("#999999"), 1, Qt.PenStyle.DashLine))
-                    painter.drawLine(int(x2), int(y2), int(temp_x), int(temp_y))
-                    painter.drawLine(int(temp_x), int(temp_y), int(x1), int(y1))
-                    
-                    # 显示临时边的长度
-                    painter.setPen(QPen(QColor("#333333"), 1))
-                    
-                    # 第二条边长度
-                    side2_length = math.sqrt((temp_x - x2)**2 + (temp_y - y2)**2) / self.grid_spacing
-                    mid_x2 = int((x2 + temp_x) / 2)
-                    mid_y2 = int((y2 + temp_y) / 2)
-                    painter.drawText(mid_x2 + 5, mid_y2 - 5, f"{side2_length:.1f}")
-                    
-                    # 第三条边长度
-                    side3_length = math.sqrt((x1 - temp_x)**2 + (y1 - temp_y)**2) / self.grid_spacing
-                    mid_x3 = int((temp_x + x1) / 2)
-                    mid_y3 = int((temp_y + y1) / 2)
-                    painter.drawText(mid_x3 + 5, mid_y3 - 5, f"{side3_length:.1f}")
-                else:
-                    # 只绘制从第一个点到鼠标的线
-                    painter.drawLine(int(x1), int(y1), int(temp_x), int(temp_y))
-                    
-                    # 显示第一条边的长度
-                    side_length = math.sqrt((temp_x - x1)**2 + (temp_y - y1)**2) / self.grid_spacing
-                    mid_x = int((x1 + temp_x) / 2)
-                    mid_y = int((y1 + temp_y) / 2)
-                    painter.setPen(QPen(QColor("#333333"), 1))
-                    font = QFont("Arial", 9)
-                    painter.setFont(font)
-                    painter.drawText(mid_x + 5, mid_y - 5, f"{side_length:.1f}")
-            
-            else:
-                # 默认绘制线段
-                x1, y1 = self.line_start_point
-                x2, y2 = self.temp_shape
-                painter.drawLine(int(x1), int(y1), int(x2), int(y2))
+        # 临时状态以网格坐标保存，这里统一投影到屏幕
+        transform = self._transform
+        anchors = [transform.map(*point) for point in [self.line_start_point] + self.triangle_points]
+        self._draw_preview(painter, anchors, transform.map(*self.temp_shape), self.grid_spacing)
     
     def _draw_temp_point(self, painter):
         """绘制临时点"""
-        painter.setPen(QPen(QColor("#E65100"), 2))
-        painter.setBrush(QBrush(QColor("#E65100")))
-        x, y = self.temp_point
+        painter.setPen(STYLES.pen("#E65100", 2))
+        painter.setBrush(STYLES.brush("#E65100"))
+        x, y = self._transform.map(*self.temp_point)
         painter.drawEllipse(int(x) - 5, int(y) - 5, 10, 10)
         
-        point_name = 'ABCDEFGHIJKLMN'[len(self.points) % 14]
-        painter.setPen(QPen(QColor("#000000")))
-        font = QFont("Arial", 10)
-        font.setBold(True)
-        painter.setFont(font)
-        painter.drawText(int(x) - 5, int(y) - 10, point_name)
+        point_name = 'ABCDEFGHIJKLMN'[len(self.scene.points) % 14]
+        font_key = self.POINT_NAME_FONT
+        painter.setPen(STYLES.pen("#000000"))
+        painter.setFont(STYLES.font(*font_key))
+        LABELS.draw_at_baseline(painter, int(x) - 5, int(y) - 10, point_name, font_key)
     
     def _draw_temp_endpoints(self, painter):
         """绘制临时端点集合"""
-        for i, point in enumerate(self.temp_endpoints):
+        screen_points = [self._transform.map(point['x'], point['y']) for point in self.temp_endpoints]
+        
+        for point, (x, y) in zip(self.temp_endpoints, screen_points):
             # 设置点的颜色
-            painter.setPen(QPen(QColor(point['color']), 2))
-            painter.setBrush(QBrush(QColor(point['color'])))
-            x = int(point['x'])
-            y = int(point['y'])
+            painter.setPen(STYLES.pen(point['color'], 2))
+            painter.setBrush(STYLES.brush(point['color']))
             
             # 绘制点
-            painter.drawEllipse(x - 5, y - 5, 10, 10)
-            
-            # 绘制点的名称标签
+            painter.drawEllipse(int(x) - 5, int(y) - 5, 10, 10)
+        
+        # 绘制点的名称标签
+        font_key = self.POINT_NAME_FONT
+        painter.setPen(STYLES.pen("#000000"))
+        painter.setFont(STYLES.font(*font_key))
+        for i, (point, (x, y)) in enumerate(zip(self.temp_endpoints, screen_points)):
             point_name = point.get('name', 'ABCDEFGHIJKLMN'[i % 14])
-            
-            painter.setPen(QPen(QColor("#000000")))
-            font = QFont("Arial", 10)
-            font.setBold(True)
-            painter.setFont(font)
-            
-            painter.drawText(x - 5, y - 10, point_name)
+            LABELS.draw_at_baseline(painter, int(x) - 5, int(y) - 10, point_name, font_key)
+    
+    def set_motion_prediction(self, enabled):
+        """启用或关闭指针运动预测，预览按外推的位置绘制以抵消显示延迟"""
+        if enabled == (self._predictor is not None):
+            return
+        self._predictor = PointerPredictor() if enabled else None
+        self._move_predicted = False
+    
+    def _reset_prediction(self, sample=None):
+        """清空指针运动历史，新的一笔绘制或新的工具不沿用上一次手势的速度
+        
+        Args:
+            sample: 新一笔的第一次采样 (时间, x, y)，例如按下的位置
+        """
+        self._move_predicted = False
+        if self._predictor is None:
+            return
+        self._predictor.reset()
+        if sample is not None:
+            self._predictor.add(*sample)
+    
+    def motion_prediction_enabled(self):
+        """是否启用了指针运动预测"""
+        return self._predictor is not None
+    
+    def frame_interval(self):
+        """一帧的时长（毫秒），跟随当前屏幕的刷新率"""
+        screen = self.screen()
+        rate = screen.refreshRate() if screen else 0
+        if rate <= 0:
+            rate = self.DEFAULT_REFRESH_RATE
+        return max(1, int(1000 / rate))
     
     def mouseMoveEvent(self, event):
-        """鼠标移动事件处理"""
-        x, y = event.position().x(), event.position().y()
+        """鼠标移动事件处理：同一帧内的多次移动合并为一次
+        
+        空闲时立即处理第一次移动并开始计帧，帧内后续的移动只记录最新位置，
+        在帧结束时统一处理。
+        """
+        position = (event.position().x(), event.position().y())
+        if self._predictor is not None:
+            # 每次原始移动都作为一次采样，合并只影响处理频率，不影响速度估计
+            self._predictor.add(event.timestamp() / 1000, *position)
+        if self._move_timer.isActive():
+            self._pending_move = position
+        else:
+            self._process_mouse_move(*position)
+            self._move_timer.start(self.frame_interval())
+        
+        # 调用父类方法
+        super().mouseMoveEvent(event)
+    
+    def _on_move_frame(self):
+        """帧结束：处理帧内最新的移动，若有则继续计帧"""
+        if self._pending_move is None:
+            if self._move_predicted:
+                # 指针已停下：预览回到真实位置，不再停留在外推的位置上
+                self._move_predicted = False
+                self._process_mouse_move(*self._last_move, predict=False)
+            return
+        self.flush_pending_move()
+        self._move_timer.start(self.frame_interval())
+    
+    def flush_pending_move(self):
+        """立即处理尚未处理的移动（按下和释放之前调用，保证事件顺序）"""
+        position = self._pending_move
+        if position is None:
+            return
+        self._pending_move = None
+        self._process_mouse_move(*position)
+    
+    def _process_mouse_move(self, x, y, predict=True):
+        """处理一次指针移动
+        
+        启用运动预测且处理器正在绘制时，传给处理器的是外推后的位置；
+        位置信号和悬停命中测试始终使用真实位置。
+        """
+        self._last_move = (x, y)
+        if self._pan_anchor is not None:
+            # 拖动平移
+            anchor_x, anchor_y = self._pan_anchor
+            self._pan_anchor = (x, y)
+            self.pan_by(x - anchor_x, y - anchor_y)
+            return
+        
         grid_x, grid_y = self.screen_to_grid(x, y)
         
         # 发送鼠标位置变化信号
         self.mouse_position_changed.emit(grid_x, grid_y)
         
-        # 委托给当前形状处理器
-        if self.shape_handler and hasattr(self.shape_handler, "handle_mouse_move"):
-            self.shape_handler.handle_mouse_move(grid_x, grid_y)
-        
-        # 调用父类方法
-        super().mouseMoveEvent(event)
+        # 委托给当前形状处理器；没有处理器时做悬停命中测试
+        if self._handler_move is not None:
+            self.set_hovered_item(None)
+            if predict and self._predictor is not None and self.shape_handler.is_drawing:
+                lead = self.frame_interval() * self.PREDICTION_FRAMES / 1000
+                predicted = self._predictor.predict(lead)
+                if predicted is not None and predicted != (x, y):
+                    self._move_predicted = True
+                    self._handler_move(*self.screen_to_grid(*predicted))
+                    return
+            self._move_predicted = False
+            self._handler_move(grid_x, grid_y)
+        else:
+            self.set_hovered_item(self.hit_test(x, y))
+    
+    def _begin_pan(self, x, y, button):
+        """开始拖动平移"""
+        self._pan_anchor = (x, y)
+        self._pan_button = button
+        self.set_hovered_item(None)
+        self.setCursor(Qt.CursorShape.ClosedHandCursor)
+    
+    def _end_pan(self):
+        """结束拖动平移"""
+        self._pan_anchor = None
+        self._pan_button = None
+        self.unsetCursor()
+    
+    def wheelEvent(self, event):
+        """滚轮缩放，以指针位置为中心"""
+        delta = event.angleDelta().y()
+        if delta:
+            self.flush_pending_move()
+            position = event.position()
+            self.zoom_at(position.x(), position.y(), self.ZOOM_STEP ** (delta / 120))
+        event.accept()
     
     def mousePressEvent(self, event):
         """鼠标按下事件，用于处理形状创建的起始点"""
-        if event.button() == Qt.MouseButton.LeftButton:
+        self.flush_pending_move()
+        if event.button() == Qt.MouseButton.MiddleButton:
+            # 中键在任何模式下都可以拖动平移
+            self._begin_pan(event.position().x(), event.position().y(), event.button())
+        elif event.button() == Qt.MouseButton.LeftButton:
             self.start_x = event.position().x()
             self.start_y = event.position().y()
             grid_x, grid_y = self.screen_to_grid(self.start_x, self.start_y)
-            # 优先委托给当前形状处理器
-            if self.shape_handler and hasattr(self.shape_handler, "handle_mouse_press"):
-                self.shape_handler.handle_mouse_press(grid_x, grid_y)
+            # 优先委托给当前形状处理器；按下开始或结束一笔绘制时重新开始运动预测
+            if self._handler_press is not None:
+                was_drawing = self.shape_handler.is_drawing
+                self._handler_press(grid_x, grid_y)
+                if self.shape_handler.is_drawing != was_drawing:
+                    self._reset_prediction((event.timestamp() / 1000, self.start_x, self.start_y))
             elif self.draw_mode == "point":
                 # 添加一个点
-                new_point = {
-                    'x': self.start_x,
-                    'y': self.start_y,
-                    'color': "#E65100"  # 橙色
-                }
-                self.points.append(new_point)
+                self.scene.add_point(grid_x, grid_y, "#E65100")  # 橙色
                 self.update()
                 # 发送点创建信号
                 point_data = {'x': grid_x, 'y': grid_y, 'color': "#E65100"}
                 self.point_created.emit(point_data)
+            else:
+                # 没有绘制工具时，点击选中光标下的图元；点在空白处则拖动平移
+                hit = self.hit_test(self.start_x, self.start_y)
+                self.select_item(hit)
+                if hit is None:
+                    self._begin_pan(self.start_x, self.start_y, event.button())
         
         # 调用父类的mousePressEvent
         super().mousePressEvent(event)
     
     def mouseReleaseEvent(self, event):
         """鼠标释放事件，用于完成形状的创建"""
-        if event.button() == Qt.MouseButton.LeftButton:
+        self.flush_pending_move()
+        if self._pan_anchor is not None and event.button() == self._pan_button:
+            self._end_pan()
+        elif event.button() == Qt.MouseButton.LeftButton:
             x = event.position().x()
             y = event.position().y()
             grid_x, grid_y = self.screen_to_grid(x, y)
-            # 优先委托给当前形状处理器
-            if self.shape_handler and hasattr(self.shape_handler, "handle_mouse_release"):
-                self.shape_handler.handle_mouse_release(grid_x, grid_y)
+            # 优先委托给当前形状处理器；释放时提交或取消了绘制则清空运动历史
+            if self._handler_release is not None:
+                was_drawing = self.shape_handler.is_drawing
+                self._handler_release(grid_x, grid_y)
+                if was_drawing and not self.shape_handler.is_drawing:
+                    self._reset_prediction()
         
         # 调用父类的mouseReleaseEvent
         super().mouseReleaseEvent(event)
\ No newline at end of file
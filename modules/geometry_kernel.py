@@ -0,0 +1,207 @@
+"""
+批量几何计算模块，一次调用计算N个线段、矩形、圆或三角形的度量
+
+安装了NumPy时以向量化方式计算；没有NumPy时退回纯Python实现，接口和结果相同
+（结果为array('d')而不是numpy数组）。用于批改和统计等需要处理大量图形的场合，
+交互绘制仍使用modules.shapes中的单个值类型。
+
+每个函数接受形状为 (N, k) 的数组，或任意由长度为k的序列组成的序列：
+    线段   (x1, y1, x2, y2)
+    矩形   (宽, 高)
+    圆     半径（一维）
+    三角形 (x1, y1, x2, y2, x3, y3)
+"""
+import math
+from array import array
+from typing import Any, Iterator, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy是可选依赖
+    np = None
+
+# 是否可以使用NumPy向量化计算
+HAS_NUMPY = np is not None
+
+# 计算结果的一列：numpy.ndarray或array('d')
+Column = Any
+
+
+class SegmentMetrics(NamedTuple):
+    """线段度量"""
+    lengths: Column
+    angles: Column  # 度数，0-360°
+
+
+class RectangleMetrics(NamedTuple):
+    """矩形度量"""
+    areas: Column
+    perimeters: Column
+
+
+class CircleMetrics(NamedTuple):
+    """圆度量"""
+    areas: Column
+    circumferences: Column
+
+
+class TriangleMetrics(NamedTuple):
+    """三角形度量"""
+    sides: Tuple[Column, Column, Column]  # v1-v2、v2-v3、v3-v1三列边长
+    perimeters: Column
+    areas: Column
+    angles: Tuple[Column, Column, Column]  # v1、v2、v3处的内角，度数
+
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool:
+    if use_numpy is None:
+        return HAS_NUMPY
+    if use_numpy and not HAS_NUMPY:
+        raise ImportError("未安装NumPy，无法使用向量化计算")
+    return use_numpy
+
+
+def _matrix(data, width: int):
+    """转换为 (N, width) 的浮点矩阵
+
+    一维输入只在长度恰好为width时视为单行，空输入视为零行；
+    其余形状不匹配的输入与纯Python路径一样抛出ValueError。
+    """
+    m = np.asarray(data, dtype=np.float64)
+    if m.ndim == 1 and m.shape[0] in (0, width):
+        return m.reshape(-1, width)
+    if m.ndim != 2 or m.shape[1] != width:
+        actual = int(np.prod(m.shape[1:])) if m.ndim > 1 else m.size
+        raise ValueError(f"每一行应包含 {width} 个数值，实际为 {actual}")
+    return m
+
+
+def _rows(data, width: int) -> Iterator[Sequence[float]]:
+    """纯Python路径：逐行产出，同时检查每一行的长度
+
+    与_matrix相同，一维的数值序列视为单行。
+    """
+    if np is not None and isinstance(data, np.ndarray):
+        data = _matrix(data, width).tolist()
+    elif isinstance(data, (list, tuple, array)) and data and isinstance(data[0], (int, float)):
+        data = [data]
+    for row in data:
+        if len(row) != width:
+            raise ValueError(f"每一行应包含 {width} 个数值，实际为 {len(row)}")
+        yield row
+
+
+def segment_metrics(segments, use_numpy: Optional[bool] = None) -> SegmentMetrics:
+    """线段的长度和角度
+
+    Args:
+        segments: N行 (x1, y1, x2, y2)
+        use_numpy: 是否使用NumPy，None表示可用时使用
+    """
+    if _use_numpy(use_numpy):
+        m = _matrix(segments, 4)
+        dx = m[:, 2] - m[:, 0]
+        dy = m[:, 3] - m[:, 1]
+        return SegmentMetrics(np.hypot(dx, dy), np.degrees(np.arctan2(dy, dx)) % 360)
+
+    lengths, angles = array('d'), array('d')
+    for x1, y1, x2, y2 in _rows(segments, 4):
+        dx, dy = x2 - x1, y2 - y1
+        lengths.append(math.hypot(dx, dy))
+        angles.append(math.degrees(math.atan2(dy, dx)) % 360)
+    return SegmentMetrics(lengths, angles)
+
+
+def rectangle_metrics(rectangles, use_numpy: Optional[bool] = None) -> RectangleMetrics:
+    """矩形的面积和周长
+
+    Args:
+        rectangles: N行 (宽, 高)
+    """
+    if _use_numpy(use_numpy):
+        m = _matrix(rectangles, 2)
+        width, height = m[:, 0], m[:, 1]
+        return RectangleMetrics(width * height, 2 * (width + height))
+
+    areas, perimeters = array('d'), array('d')
+    for width, height in _rows(rectangles, 2):
+        areas.append(width * height)
+        perimeters.append(2 * (width + height))
+    return RectangleMetrics(areas, perimeters)
+
+
+def circle_metrics(radii, use_numpy: Optional[bool] = None) -> CircleMetrics:
+    """圆的面积和周长
+
+    Args:
+        radii: N个半径
+    """
+    if _use_numpy(use_numpy):
+        r = np.asarray(radii, dtype=np.float64).reshape(-1)
+        return CircleMetrics(math.pi * r * r, 2 * math.pi * r)
+
+    areas, circumferences = array('d'), array('d')
+    for r in radii:
+        areas.append(math.pi * r * r)
+        circumferences.append(2 * math.pi * r)
+    return CircleMetrics(areas, circumferences)
+
+
+def triangle_metrics(triangles, use_numpy: Optional[bool] = None) -> TriangleMetrics:
+    """三角形的三条边长、周长、面积和三个内角
+
+    面积由两条边向量的叉积计算（|AB × AC| / 2），不经过边长，
+    对狭长三角形比海伦公式稳定。内角同样由叉积和点积计算（atan2(|叉积|, 点积)），
+    接近0°或180°时不会像余弦定理加acos那样丢失精度；三点共线时内角为0°或180°。
+
+    Args:
+        triangles: N行 (x1, y1, x2, y2, x3, y3)
+    """
+    if _use_numpy(use_numpy):
+        m = _matrix(triangles, 6)
+        x1, y1, x2, y2, x3, y3 = m.T
+        a = np.hypot(x2 - x1, y2 - y1)
+        b = np.hypot(x3 - x2, y3 - y2)
+        c = np.hypot(x1 - x3, y1 - y3)
+        cross = np.abs((x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1))
+        # 三个内角的叉积绝对值相同，都等于面积的两倍
+        angle_1 = np.degrees(np.arctan2(cross, (x2 - x1) * (x3 - x1) + (y2 - y1) * (y3 - y1)))
+        angle_2 = np.degrees(np.arctan2(cross, (x3 - x2) * (x1 - x2) + (y3 - y2) * (y1 - y2)))
+        angle_3 = np.degrees(np.arctan2(cross, (x1 - x3) * (x2 - x3) + (y1 - y3) * (y2 - y3)))
+        return TriangleMetrics((a, b, c), a + b + c, cross / 2, (angle_1, angle_2, angle_3))
+
+    side_a, side_b, side_c = array('d'), array('d'), array('d')
+    perimeters, areas = array('d'), array('d')
+    angle_1, angle_2, angle_3 = array('d'), array('d'), array('d')
+    hypot, atan2, degrees = math.hypot, math.atan2, math.degrees
+    for x1, y1, x2, y2, x3, y3 in _rows(triangles, 6):
+        a = hypot(x2 - x1, y2 - y1)
+        b = hypot(x3 - x2, y3 - y2)
+        c = hypot(x1 - x3, y1 - y3)
+        side_a.append(a)
+        side_b.append(b)
+        side_c.append(c)
+        perimeters.append(a + b + c)
+        cross = abs((x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1))
+        areas.append(cross / 2)
+        angle_1.append(degrees(atan2(cross, (x2 - x1) * (x3 - x1) + (y2 - y1) * (y3 - y1))))
+        angle_2.append(degrees(atan2(cross, (x3 - x2) * (x1 - x2) + (y3 - y2) * (y1 - y2))))
+        angle_3.append(degrees(atan2(cross, (x1 - x3) * (x2 - x3) + (y1 - y3) * (y2 - y3))))
+    return TriangleMetrics((side_a, side_b, side_c), perimeters, areas,
+                           (angle_1, angle_2, angle_3))
+
+
+def point_distances(points, x: float, y: float, use_numpy: Optional[bool] = None) -> Column:
+    """N个点到(x, y)的距离
+
+    Args:
+        points: N行 (x, y)
+    """
+    if _use_numpy(use_numpy):
+        m = _matrix(points, 2)
+        return np.hypot(m[:, 0] - x, m[:, 1] - y)
+
+    distances = array('d')
+    for px, py in _rows(points, 2):
+        distances.append(math.hypot(px - x, py - y))
+    return distances
@@ -1,20 +1,27 @@
 """
 重构后的几何模块，整合了Canvas、形状处理器和属性面板
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, 
                              QLabel, QSizePolicy)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
 from modules.ui_components_pyqt import BaseModule, MetroButton
 from modules.canvas import Canvas
+from modules.status_strip import StatusStrip
 from modules.shapes import ShapeType
 from modules.factories import ShapeHandlerFactory, PropertyPanelFactory
 
 class GeometryModuleRefactored(BaseModule):
     """重构后的几何模块"""
     
+    # 近邻测量在信息栏中显示的点数
+    NEIGHBOR_COUNT = 3
+    
+    # 按帧节流的信息来源，合并显示时按此顺序排列：指针位置（或近邻），然后是形状预览
+    INFO_SOURCES = ('pointer', 'preview')
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -54,30 +61,23 @@ class GeometryModuleRefactored(BaseModule):
         content_layout.addWidget(canvas_container)
         
         # 创建信息显示栏
-        self.info_panel = QLabel("Informations de coordonnées")
-        self.info_panel.setFont(QFont("Arial", 10))
-        self.info_panel.setStyleSheet("""
-            QLabel {
-                background-color: #F8F9FA;
-                color: #212529;
-                border: 1px solid #DEE2E6;
-                border-radius: 3px;
-                padding: 2px 8px;
-            }
-        """)
-        self.info_panel.setMinimumHeight(24)
-        self.info_panel.setMaximumHeight(60)
-        self.info_panel.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-        self.info_panel.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        self.info_panel.setTextFormat(Qt.TextFormat.RichText)
-        self.info_panel.setWordWrap(True)
+        self.info_panel = StatusStrip("Informations de coordonnées")
         canvas_layout.addWidget(self.info_panel)
         
+        # 信息栏节流：每个信息来源每帧最多刷新一次，内容不变时不重绘
+        self._pending_info = {}  # 来源 -> (格式化函数, 参数)，帧内只保留每个来源最新的一次
+        self._info_fields = {}   # 来源 -> 最近一次格式化得到的字段
+        self._info_timer = QTimer(self)
+        self._info_timer.setSingleShot(True)
+        self._info_timer.timeout.connect(self._on_info_frame)
+        
         # 设置画布容器的最小宽度
         canvas_container.setMinimumWidth(600)
         
         # 初始化画布
         self.canvas = Canvas()
+        # 预览按预测的指针位置绘制，拖动时预览不落后于光标（提交的图形仍使用真实位置）
+        self.canvas.set_motion_prediction(True)
         canvas_layout.addWidget(self.canvas)
         
         # 连接画布信号
@@ -96,7 +96,7 @@ class GeometryModuleRefactored(BaseModule):
         self.active_panel = None
 
         # 关键：初始化时将canvas.shape_handler设为None
-        self.canvas.shape_handler = None
+        self.canvas.set_shape_handler(None)
         
         # 创建属性面板开关按钮
         self.properties_button = MetroButton("Propriétés", "#030d03", "#FFFFFF")
@@ -178,6 +178,45 @@ class GeometryModuleRefactored(BaseModule):
         self.axes_button.clicked.connect(self.toggle_axes)
         self.axes_button.set_active(self.canvas.show_axes)
         self.tools_layout.addWidget(self.axes_button, 10, 1)
+        
+        # 添加适应窗口按钮（缩放到显示全部图形）
+        fit_button = MetroButton("Ajuster", "#00695C", "#FFFFFF")
+        fit_button.setMinimumSize(110, 110)
+        fit_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        fit_button.clicked.connect(self.canvas.zoom_to_fit)
+        self.tools_layout.addWidget(fit_button, 11, 0)
+        
+        # 添加方格纸背景切换按钮
+        self.grid_button = MetroButton("Grille", "#78909C", "#FFFFFF")
+        self.grid_button.setMinimumSize(110, 110)
+        self.grid_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        self.grid_button.clicked.connect(self.toggle_grid)
+        self.grid_button.set_active(self.canvas.show_grid)
+        self.tools_layout.addWidget(self.grid_button, 11, 1)
+        
+        # 添加交点显示切换按钮
+        self.intersections_button = MetroButton("Intersections", "#AD1457", "#FFFFFF")
+        self.intersections_button.setMinimumSize(110, 110)
+        self.intersections_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        self.intersections_button.clicked.connect(self.toggle_intersections)
+        self.intersections_button.set_active(self.canvas.show_intersections)
+        self.tools_layout.addWidget(self.intersections_button, 12, 0)
+        
+        # 添加最近点对测量按钮
+        closest_button = MetroButton("Plus proches", "#4527A0", "#FFFFFF")
+        closest_button.setMinimumSize(110, 110)
+        closest_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        closest_button.clicked.connect(self.show_closest_points)
+        self.tools_layout.addWidget(closest_button, 12, 1)
+        
+        # 添加近邻测量切换按钮（信息栏跟随指针显示最近的点）
+        self.neighbors_enabled = False
+        self.neighbors_button = MetroButton("Voisins", "#283593", "#FFFFFF")
+        self.neighbors_button.setMinimumSize(110, 110)
+        self.neighbors_button.setFont(QFont("Arial", 12, weight=QFont.Weight.Bold))
+        self.neighbors_button.clicked.connect(self.toggle_neighbors)
+        self.neighbors_button.set_active(self.neighbors_enabled)
+        self.tools_layout.addWidget(self.neighbors_button, 13, 0)
     
     def _init_handlers_and_panels(self):
         """初始化所有形状处理器和属性面板"""
@@ -237,7 +276,7 @@ class GeometryModuleRefactored(BaseModule):
         self.active_handler = handler
 
         # 关键：将当前handler赋值给canvas.shape_handler
-        self.canvas.shape_handler = handler
+        self.canvas.set_shape_handler(handler)
         
         # 显示属性面板（如果存在）
         if panel:
@@ -305,23 +344,134 @@ class GeometryModuleRefactored(BaseModule):
         self.axes_button.set_active(self.canvas.show_axes)
         self.canvas.update()
     
+    def toggle_grid(self):
+        """切换方格纸背景显示状态"""
+        self.canvas.show_grid = not self.canvas.show_grid
+        self.grid_button.set_active(self.canvas.show_grid)
+        self.canvas.update()
+    
+    def toggle_intersections(self):
+        """切换交点标记显示状态"""
+        self.canvas.show_intersections = not self.canvas.show_intersections
+        self.intersections_button.set_active(self.canvas.show_intersections)
+        self.canvas.update()
+    
+    def show_closest_points(self):
+        """在信息栏显示距离最近的两个点"""
+        scene = self.canvas.scene
+        pair = scene.closest_points()
+        if pair is None:
+            self._discard_info()
+            self.info_panel.set_message("Il faut au moins deux points")
+            return
+        distance, first, second = pair
+        points = scene.point_grid
+        x1, y1 = points.position(first)
+        x2, y2 = points.position(second)
+        self._set_info_fields([("Points les plus proches:", f"({x1:.2f}, {y1:.2f}) – ({x2:.2f}, {y2:.2f})"),
+                               ("Distance:", f"{distance:.2f}")])
+    
+    def toggle_neighbors(self):
+        """切换近邻测量：开启时信息栏显示距离指针最近的点"""
+        self.neighbors_enabled = not self.neighbors_enabled
+        self.neighbors_button.set_active(self.neighbors_enabled)
+        if not self.neighbors_enabled:
+            self.reset_info_panel()
+    
+    def _set_info_fields(self, fields: List[Tuple[str, str]]):
+        """设置信息栏字段（取代按帧节流的信息），状态栏只重绘数值发生变化的槽位"""
+        self._discard_info()
+        self.info_panel.set_fields(fields)
+    
+    def _discard_info(self):
+        """丢弃待刷新和已显示的节流信息"""
+        self._pending_info = {}
+        self._info_fields = {}
+    
+    def _schedule_info(self, source, formatter, *args):
+        """提交一次高频信息更新
+        
+        空闲时立即刷新并开始计帧，帧内同一来源后续的更新只保留最新一次，
+        到帧结束时才格式化，并与其他来源的最新字段合并显示。信息栏隐藏时不做任何工作。
+        
+        Args:
+            source: INFO_SOURCES中的来源，不同来源的更新互不覆盖
+        """
+        self._pending_info[source] = (formatter, args)
+        if not self._info_timer.isActive():
+            self._flush_info()
+            self._info_timer.start(self.canvas.frame_interval())
+    
+    def _on_info_frame(self):
+        """帧结束：刷新帧内最新的信息，若有则继续计帧"""
+        if not self._pending_info or not self.info_panel.isVisible():
+            return
+        self._flush_info()
+        self._info_timer.start(self.canvas.frame_interval())
+    
+    def _flush_info(self):
+        """格式化待处理的信息，按来源顺序合并后显示（信息栏隐藏时保留到重新显示）
+        
+        格式化函数返回None的来源不再显示；所有来源都没有字段时信息栏保持原样。
+        """
+        if not self._pending_info or not self.info_panel.isVisible():
+            return
+        for source, (formatter, args) in self._pending_info.items():
+            fields = formatter(*args)
+            if fields is None:
+                self._info_fields.pop(source, None)
+            else:
+                self._info_fields[source] = fields
+        self._pending_info = {}
+        merged = [field for source in self.INFO_SOURCES for field in self._info_fields.get(source, ())]
+        if merged:
+            self.info_panel.set_fields(merged)
+    
+    def showEvent(self, event):
+        """模块重新显示时补上隐藏期间最新的信息"""
+        super().showEvent(event)
+        self._flush_info()
+    
     def update_mouse_position_info(self, x: float, y: float):
-        """更新鼠标位置信息"""
+        """更新鼠标位置信息（按帧节流）"""
+        if self.neighbors_enabled:
+            self._schedule_info('pointer', self._format_neighbors_info, x, y)
+        else:
+            self._schedule_info('pointer', self._format_mouse_position_info, x, y)
+    
+    def _format_neighbors_info(self, x: float, y: float) -> Optional[List[Tuple[str, str]]]:
+        """格式化距离指针最近的几个点，没有点时返回None"""
+        scene = self.canvas.scene
+        neighbors = scene.nearest_points(x, y, self.NEIGHBOR_COUNT)
+        if not neighbors:
+            return None
+        fields = [("Position:", f"({x:.2f}, {y:.2f})")]
+        for rank, (distance, item_id) in enumerate(neighbors, 1):
+            px, py = scene.point_grid.position(item_id)
+            fields.append((f"Voisin {rank}:", f"({px:.2f}, {py:.2f}) à {distance:.2f}"))
+        return fields
+    
+    def _format_mouse_position_info(self, x: float, y: float) -> Optional[List[Tuple[str, str]]]:
+        """格式化鼠标位置信息，无需显示时返回None"""
         if not self.active_handler:
-            return
+            return None
         
         if self.active_handler.shape_type == ShapeType.POINT:
             # 显示鼠标当前坐标
-            self.info_panel.setText(f"<b>Coordonnées:</b> ({x:.2f}, {y:.2f})")
+            return [("Coordonnées:", f"({x:.2f}, {y:.2f})")]
+        return None
 
     def update_shape_preview_info(self, preview_data: Dict[str, Any]):
-        """更新形状预览信息"""
+        """更新形状预览信息（按帧节流）"""
+        self._schedule_info('preview', self._format_preview_info, preview_data)
+    
+    def _format_preview_info(self, preview_data: Dict[str, Any]) -> Optional[List[Tuple[str, str]]]:
+        """格式化形状预览信息，未知的预览类型返回None"""
         if preview_data.get('type') == 'line_preview_start':
             # 显示线段起点实时坐标
             x1 = preview_data.get('x1', 0)
             y1 = preview_data.get('y1', 0)
-            info = f"<b>Point de départ:</b> ({x1:.2f}, {y1:.2f})"
-            self.info_panel.setText(info)
+            return [("Point de départ:", f"({x1:.2f}, {y1:.2f})")]
             
         elif preview_data.get('type') == 'line_preview':
             # 显示完整线段信息
@@ -332,15 +482,14 @@ class GeometryModuleRefactored(BaseModule):
             length = preview_data.get('length', 0)
             angle = preview_data.get('angle', 0)
             
-            info = f"<b>Ligne:</b> Début({x1:.2f}, {y1:.2f}) → Fin({x2:.2f}, {y2:.2f}) | "
-            info += f"<b>Longueur:</b> {length:.2f} | <b>Angle:</b> {angle:.1f}°"
-            self.info_panel.setText(info)
+            return [("Ligne:", f"Début({x1:.2f}, {y1:.2f}) → Fin({x2:.2f}, {y2:.2f})"),
+                    ("Longueur:", f"{length:.2f}"),
+                    ("Angle:", f"{angle:.1f}°")]
         elif preview_data.get('type') == 'rectangle_preview_start':
             # 显示矩形起点实时坐标
             x = preview_data.get('x', 0)
             y = preview_data.get('y', 0)
-            info = f"<b>Coin de départ:</b> ({x:.2f}, {y:.2f})"
-            self.info_panel.setText(info)
+            return [("Coin de départ:", f"({x:.2f}, {y:.2f})")]
         elif preview_data.get('type') == 'rectangle_preview':
             # 显示完整矩形信息
             x1 = preview_data.get('x1', 0)
@@ -351,16 +500,15 @@ class GeometryModuleRefactored(BaseModule):
             height = preview_data.get('height', 0)
             area = preview_data.get('area', 0)
             
-            info = f"<b>Rectangle:</b> ({x1:.2f}, {y1:.2f}) → ({x2:.2f}, {y2:.2f}) | "
-            info += f"<b>Largeur:</b> {width:.2f} | <b>Hauteur:</b> {height:.2f} | "
-            info += f"<b>Aire:</b> {area:.2f}"
-            self.info_panel.setText(info)
+            return [("Rectangle:", f"({x1:.2f}, {y1:.2f}) → ({x2:.2f}, {y2:.2f})"),
+                    ("Largeur:", f"{width:.2f}"),
+                    ("Hauteur:", f"{height:.2f}"),
+                    ("Aire:", f"{area:.2f}")]
         elif preview_data.get('type') == 'circle_preview_start':
             # 显示圆心实时坐标
             x = preview_data.get('x', 0)
             y = preview_data.get('y', 0)
-            info = f"<b>Centre du cercle:</b> ({x:.2f}, {y:.2f})"
-            self.info_panel.setText(info)
+            return [("Centre du cercle:", f"({x:.2f}, {y:.2f})")]
         elif preview_data.get('type') == 'circle_preview':
             # 显示完整圆形信息
             center_x = preview_data.get('center_x', 0)
@@ -368,16 +516,14 @@ class GeometryModuleRefactored(BaseModule):
             radius = preview_data.get('radius', 0)
             area = preview_data.get('area', 0)
             
-            info = f"<b>Cercle:</b> Centre({center_x:.2f}, {center_y:.2f}) | "
-            info += f"<b>Rayon:</b> {radius:.2f} | "
-            info += f"<b>Aire:</b> {area:.2f}"
-            self.info_panel.setText(info)
+            return [("Cercle:", f"Centre({center_x:.2f}, {center_y:.2f})"),
+                    ("Rayon:", f"{radius:.2f}"),
+                    ("Aire:", f"{area:.2f}")]
         elif preview_data.get('type') == 'triangle_preview_start':
             # 显示三角形第一点实时坐标
             x1 = preview_data.get('x1', 0)
             y1 = preview_data.get('y1', 0)
-            info = f"<b>Premier point:</b> A({x1:.2f}, {y1:.2f})"
-            self.info_panel.setText(info)
+            return [("Premier point:", f"A({x1:.2f}, {y1:.2f})")]
             
         elif preview_data.get('type') == 'triangle_preview_side1':
             # 显示三角形第一条边信息
@@ -387,9 +533,8 @@ class GeometryModuleRefactored(BaseModule):
             y2 = preview_data.get('y2', 0)
             side1 = preview_data.get('side1', 0)
             
-            info = f"<b>Triangle:</b> A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}) | "
-            info += f"<b>Côté AB:</b> {side1:.2f}"
-            self.info_panel.setText(info)
+            return [("Triangle:", f"A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f})"),
+                    ("Côté AB:", f"{side1:.2f}")]
             
         elif preview_data.get('type') == 'triangle_preview':
             # 显示完整三角形信息
@@ -403,16 +548,17 @@ class GeometryModuleRefactored(BaseModule):
             area = preview_data.get('area', 0)
             perimeter = sum(sides)  # 计算周长
             
-            info = f"<b>Triangle:</b> A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}), C({x3:.2f}, {y3:.2f}) | "
-            info += f"<b>Côtés:</b> {sides[0]:.2f}, {sides[1]:.2f}, {sides[2]:.2f} | "
-            info += f"<b>Périmètre:</b> {perimeter:.2f} | <b>Aire:</b> {area:.2f}"
-            self.info_panel.setText(info)
+            return [("Triangle:", f"A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}), C({x3:.2f}, {y3:.2f})"),
+                    ("Côtés:", f"{sides[0]:.2f}, {sides[1]:.2f}, {sides[2]:.2f}"),
+                    ("Périmètre:", f"{perimeter:.2f}"),
+                    ("Aire:", f"{area:.2f}")]
+        return None
 
     def update_coordinate_info(self, point_data: Dict[str, Any]):
         """更新坐标信息"""
         x = point_data.get('x', 0)
         y = point_data.get('y', 0)
-        self.info_panel.setText(f"<b>Point:</b> ({x:.2f}, {y:.2f})")
+        self._set_info_fields([("Point:", f"({x:.2f}, {y:.2f})")])
     
     def update_shape_info(self, shape_data: Dict[str, Any]):
         """更新形状信息"""
@@ -426,9 +572,9 @@ class GeometryModuleRefactored(BaseModule):
             length = shape_data.get('length', 0)
             angle = shape_data.get('angle', 0)
             
-            info = f"<b>Ligne:</b> ({x1:.2f}, {y1:.2f}) → ({x2:.2f}, {y2:.2f}) | "
-            info += f"<b>Longueur:</b> {length:.2f} | <b>Angle:</b> {angle:.1f}°"
-            self.info_panel.setText(info)
+            self._set_info_fields([("Ligne:", f"({x1:.2f}, {y1:.2f}) → ({x2:.2f}, {y2:.2f})"),
+                                   ("Longueur:", f"{length:.2f}"),
+                                   ("Angle:", f"{angle:.1f}°")])
         
         elif shape_type == 'rectangle':
             x = shape_data.get('x', 0)
@@ -437,10 +583,10 @@ class GeometryModuleRefactored(BaseModule):
             height = shape_data.get('width', 0)
             area = shape_data.get('area', 0)
             
-            info = f"<b>Rectangle:</b> Coin sup. gauche ({x:.2f}, {y:.2f}) | "
-            info += f"<b>Largeur:</b> {width:.2f} | <b>Hauteur:</b> {height:.2f} | "
-            info += f"<b>Aire:</b> {area:.2f}"
-            self.info_panel.setText(info)
+            self._set_info_fields([("Rectangle:", f"Coin sup. gauche ({x:.2f}, {y:.2f})"),
+                                   ("Largeur:", f"{width:.2f}"),
+                                   ("Hauteur:", f"{height:.2f}"),
+                                   ("Aire:", f"{area:.2f}")])
         
         elif shape_type == 'circle':
             x = shape_data.get('x', 0)
@@ -448,10 +594,9 @@ class GeometryModuleRefactored(BaseModule):
             radius = shape_data.get('radius', 0)
             
             import math
-            info = f"<b>Cercle:</b> Centre ({x:.2f}, {y:.2f}) | "
-            info += f"<b>Rayon:</b> {radius:.2f} | "
-            info += f"<b>Aire:</b> {math.pi * radius * radius:.2f}"
-            self.info_panel.setText(info)
+            self._set_info_fields([("Cercle:", f"Centre ({x:.2f}, {y:.2f})"),
+                                   ("Rayon:", f"{radius:.2f}"),
+                                   ("Aire:", f"{math.pi * radius * radius:.2f}")])
         
         elif shape_type == 'triangle':
             x1 = shape_data.get('x1', 0)
@@ -464,11 +609,12 @@ class GeometryModuleRefactored(BaseModule):
             perimeter = shape_data.get('perimeter', 0)
             area = shape_data.get('area', 0)  # 获取面积数据
             
-            info = f"<b>Triangle:</b> A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}), C({x3:.2f}, {y3:.2f}) | "
-            info += f"<b>Côtés:</b> {sides[0]:.2f}, {sides[1]:.2f}, {sides[2]:.2f} | "
-            info += f"<b>Périmètre:</b> {perimeter:.2f} | <b>Aire:</b> {area:.2f}"
-            self.info_panel.setText(info)
+            self._set_info_fields([("Triangle:", f"A({x1:.2f}, {y1:.2f}), B({x2:.2f}, {y2:.2f}), C({x3:.2f}, {y3:.2f})"),
+                                   ("Côtés:", f"{sides[0]:.2f}, {sides[1]:.2f}, {sides[2]:.2f}"),
+                                   ("Périmètre:", f"{perimeter:.2f}"),
+                                   ("Aire:", f"{area:.2f}")])
 
     def reset_info_panel(self):
         """重置信息面板"""
-        self.info_panel.setText("Informations de coordonnées")
+        self._discard_info()
+        self.info_panel.set_message("Informations de coordonnées")
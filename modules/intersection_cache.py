@@ -0,0 +1,79 @@
+"""
+交点缓存模块，把交点的全量重建放到线程池中，画布绘制时只读取已完成的结果
+"""
+from typing import List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from modules.intersections import Coord, IntersectionFinder, scene_intersections
+
+
+class _IntersectionSignals(QObject):
+    """工作线程向GUI线程回传结果的信号（排队连接）"""
+    finished = pyqtSignal(object, int, int)  # (交点映射, 快照修订号, 请求序号)
+
+
+class _IntersectionJob(QRunnable):
+    """全量计算交点的任务，只读取不可变的场景快照"""
+
+    def __init__(self, snapshot, signals: _IntersectionSignals, ticket: int):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._snapshot = snapshot
+        self._signals = signals
+        self._ticket = ticket
+
+    def run(self):
+        points = scene_intersections(self._snapshot)
+        self._signals.finished.emit(points, self._snapshot.revision, self._ticket)
+
+
+class IntersectionCache(QObject):
+    """画布的交点服务
+
+    编辑后的增量更新（新增图元只与候选求交、删除图元只去掉相应交点）开销很小，
+    在绘制时直接进行；需要全量重建时拍摄场景快照交给线程池，绘制继续使用上一次的结果
+    （更换了场景时不标出交点），重建完成后通过ready通知画布重绘，再从快照的修订号增量追上场景。
+    扫描线是纯Python计算，工作线程仍会周期性地让出GIL，界面不会卡住。
+    """
+
+    ready = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _IntersectionSignals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._finder = IntersectionFinder()
+        self._pending: Optional[Tuple[object, int]] = None  # 重建中的 (场景, 请求序号)
+        self._tickets = 0
+
+    def points(self, scene) -> List[Coord]:
+        """需要标出的交点（网格坐标），不含与已有点重合的交点；不会在当前线程全量重建"""
+        if not self._finder.update(scene):
+            self._request(scene)
+        return self._finder.current_points(scene)
+
+    def _request(self, scene):
+        """提交全量重建任务（同一场景已有任务在进行时不重复提交）"""
+        if self._pending is not None and self._pending[0] is scene:
+            return
+        self._tickets += 1
+        self._pending = (scene, self._tickets)
+        self._pool.start(_IntersectionJob(scene.snapshot(), self._signals, self._tickets))
+
+    def _on_finished(self, points, revision: int, ticket: int):
+        """重建完成（GUI线程），已作废请求的结果直接丢弃"""
+        if self._pending is None or self._pending[1] != ticket:
+            return
+        scene = self._pending[0]
+        self._pending = None
+        self._finder.install(scene, points, revision)
+        self.ready.emit()
+
+    def clear(self):
+        """丢弃结果并作废进行中的重建"""
+        self._pool.clear()
+        self._pending = None
+        self._finder = IntersectionFinder()
@@ -0,0 +1,495 @@
+"""
+交点查找模块，求场景中线段（含多边形的边）和圆两两之间的全部交点
+
+线段之间用Bentley–Ottmann扫描线求交：竖直扫描线从左向右经过端点和已发现的交点，
+状态结构中按纵坐标保存与扫描线相交的线段，只检查新变成相邻的线段对，
+比较次数只和线段数n、交点数k有关，而不是两两比较。扫描中的方向判断使用modules.predicates
+的鲁棒谓词，交点坐标用Fraction精确表示，退化情况（多条线段交于一点、端点接触、
+共线重叠、竖直线段）不需要容差。精确运算只是后备：方向判断和斜率比较先用浮点数计算，
+误差界内无法确定符号时才化为整数精确计算，事件队列也先比较坐标的浮点近似值。
+
+复杂度：扫描状态是按二分查找维护的Python列表而不是平衡树，每个事件的定位是O(log n)次比较，
+但插入删除是列表切片，要移动O(n)个元素。因此总的比较次数为O((n + k) log n)，
+总耗时的上界是O((n + k) · n)；切片移动的是连续内存，n在数万以内时这一项远小于比较的开销。
+
+圆与线段、圆与圆的交点借助场景的空间索引只在包围盒相交的候选之间计算。
+全量计算只读取场景的列表和空间索引，可以在工作线程中对场景快照进行（见modules.intersection_cache）。
+"""
+import heapq
+import itertools
+import math
+from fractions import Fraction
+from functools import cmp_to_key
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from modules.predicates import on_segment, orientation, segments_intersect
+from modules.scene import ItemKey, SceneStore
+
+# 网格坐标点；扫描中求得的交点坐标可能是Fraction
+Coord = Tuple[float, float]
+
+# 双精度浮点的单位舍入误差 2^-53
+_EPSILON = 2.0 ** -53
+# 与modules.predicates相同的方向行列式误差界系数，用于浮点坐标的斜率比较
+_ORIENT_ERROR_BOUND = (3.0 + 16.0 * _EPSILON) * _EPSILON
+# 交点坐标舍入为浮点后计算方向行列式的误差界系数（保守取值）
+_ROUNDED_ERROR_BOUND = 8.0 * _EPSILON
+
+
+class Segment(NamedTuple):
+    """参与求交的线段，端点按 (x, y) 字典序排列：start在左，竖直线段start在下"""
+    start: Coord
+    end: Coord
+    key: ItemKey  # 线段所属的图元（线段或多边形）
+
+
+class Intersection(NamedTuple):
+    """一个交点及经过它的图元"""
+    x: float
+    y: float
+    keys: frozenset
+
+
+def make_segment(p: Coord, q: Coord, key: ItemKey) -> Optional[Segment]:
+    """按扫描方向排列端点，长度为0的线段返回None"""
+    if p == q:
+        return None
+    return Segment(p, q, key) if p < q else Segment(q, p, key)
+
+
+def _exact(numerator: int, denominator: int):
+    """精确值 numerator / denominator；能用浮点数表示时返回浮点数，使后续判断走浮点快速路径"""
+    value = Fraction(numerator, denominator)
+    approx = float(value)
+    # 浮点数的as_integer_ratio和Fraction都是既约的，相等即表示同一个值
+    if approx.as_integer_ratio() == (value.numerator, value.denominator):
+        return approx
+    return value
+
+
+def _scaled(values: Sequence[float]) -> Tuple[List[int], int]:
+    """把一组浮点数同乘以一个2的幂化为整数，返回 (整数列表, 公分母)"""
+    ratios = [value.as_integer_ratio() for value in values]
+    scale = max(denominator for _, denominator in ratios)
+    return [numerator * (scale // denominator) for numerator, denominator in ratios], scale
+
+
+def _orientation(a: Coord, b: Coord, p: Coord) -> int:
+    """方向判断；p的坐标可能是Fraction
+
+    p为Fraction时先把它舍入为浮点数计算 (b - a) × (p - a)，误差界同时计入
+    运算的舍入和p的舍入；符号无法确定时才化为整数精确计算。
+    """
+    if type(p[0]) is not Fraction and type(p[1]) is not Fraction:
+        return orientation(a, b, p)
+    px, py = float(p[0]), float(p[1])
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    det_left = dx * (py - a[1])
+    det_right = dy * (px - a[0])
+    det = det_left - det_right
+    error_bound = _ROUNDED_ERROR_BOUND * (abs(det_left) + abs(det_right) +
+                                         abs(dx * py) + abs(dy * px))
+    if det > error_bound:
+        return 1
+    if det < -error_bound:
+        return -1
+    # a、b化为公分母scale下的整数，p的两个坐标各自化为分数，行列式乘以正的公分母后为整数
+    (ax, ay, bx, by), scale = _scaled(a + b)
+    px_numerator, px_denominator = p[0].as_integer_ratio()
+    py_numerator, py_denominator = p[1].as_integer_ratio()
+    det = ((bx - ax) * (py_numerator * scale - ay * py_denominator) * px_denominator -
+           (by - ay) * (px_numerator * scale - ax * px_denominator) * py_denominator)
+    return (det > 0) - (det < 0)
+
+
+def _side(segment: Segment, p: Coord) -> int:
+    """p相对于扫描线上的线段的位置：1在上方，-1在下方，0在线段上"""
+    (ax, ay), (bx, by) = segment.start, segment.end
+    if ax == bx:
+        # 竖直线段：扫描线经过它时按纵坐标区间判断
+        if p[1] > by:
+            return 1
+        if p[1] < ay:
+            return -1
+        return 0
+    return _orientation(segment.start, segment.end, p)
+
+
+def _compare_slopes(a: Segment, b: Segment) -> int:
+    """经过同一点的两条线段在该点右侧的上下次序（斜率从小到大，竖直线段最后）"""
+    cross_left = (a.end[0] - a.start[0]) * (b.end[1] - b.start[1])
+    cross_right = (a.end[1] - a.start[1]) * (b.end[0] - b.start[0])
+    cross = cross_left - cross_right
+    error_bound = _ORIENT_ERROR_BOUND * (abs(cross_left) + abs(cross_right))
+    if cross > error_bound:
+        return -1
+    if cross < -error_bound:
+        return 1
+    (ax1, ay1, ax2, ay2, bx1, by1, bx2, by2), _ = _scaled(a.start + a.end + b.start + b.end)
+    cross = (ax2 - ax1) * (by2 - by1) - (ay2 - ay1) * (bx2 - bx1)
+    return (cross < 0) - (cross > 0)
+
+
+def segment_intersection(a: Segment, b: Segment) -> Optional[Coord]:
+    """两条线段所在直线的精确交点，平行或共线时返回None（不检查是否在线段上）
+
+    端点坐标先按同一个2的幂缩放为整数，整个计算只在最后构造一次Fraction。
+    """
+    (x1, y1, x2, y2, x3, y3, x4, y4), scale = _scaled(a.start + a.end + b.start + b.end)
+    denominator = (x2 - x1) * (y4 - y3) - (y2 - y1) * (x4 - x3)
+    if denominator == 0:
+        return None
+    # 交点为 (x1, y1) + t * (x2 - x1, y2 - y1)，t = numerator / denominator
+    numerator = (x3 - x1) * (y4 - y3) - (y3 - y1) * (x4 - x3)
+    scale *= denominator
+    return (_exact(x1 * denominator + numerator * (x2 - x1), scale),
+            _exact(y1 * denominator + numerator * (y2 - y1), scale))
+
+
+def segment_pair_points(a: Segment, b: Segment) -> List[Coord]:
+    """两条线段的交点；共线重叠时返回重叠部分的两个端点"""
+    if not segments_intersect(a.start, a.end, b.start, b.end):
+        return []
+    point = segment_intersection(a, b)
+    if point is not None:
+        return [point]
+    points = [p for p in (a.start, a.end) if on_segment(p, b.start, b.end)]
+    points += [p for p in (b.start, b.end) if on_segment(p, a.start, a.end) and p not in points]
+    return points
+
+
+def sweep_intersections(segments: Sequence[Segment]) -> Dict[Coord, Set[int]]:
+    """Bentley–Ottmann扫描线求交
+
+    n条线段、k个交点时比较次数为O((n + k) log n)；扫描状态是Python列表，
+    每次插入删除移动O(n)个元素，最坏总耗时为O((n + k) · n)。
+
+    Returns:
+        交点到经过该点的线段下标集合的映射，只包含至少两条线段经过的点
+    """
+    starts: Dict[Coord, List[int]] = {}
+    # 事件按 (float(x), x, float(y), y) 排序：舍入是单调的，浮点部分不同时次序与精确值一致，
+    # 相同时再比较精确值，这样大多数比较不涉及Fraction
+    queue: List[tuple] = []
+    scheduled: Set[Coord] = set()
+
+    def schedule(point):
+        if point not in scheduled:
+            scheduled.add(point)
+            x, y = point
+            heapq.heappush(queue, (float(x), x, float(y), y))
+
+    for i, segment in enumerate(segments):
+        starts.setdefault(segment.start, []).append(i)
+        schedule(segment.start)
+        schedule(segment.end)
+
+    # 与扫描线相交的线段下标，自下而上排列
+    status: List[int] = []
+    results: Dict[Coord, Set[int]] = {}
+    by_slope = cmp_to_key(lambda i, j: _compare_slopes(segments[i], segments[j]) or (i - j))
+
+    def check(i, j, p):
+        # 相邻线段若在事件点之后相交，把交点加入事件队列；共线重叠的部分由端点事件报告
+        a, b = segments[i], segments[j]
+        if not segments_intersect(a.start, a.end, b.start, b.end):
+            return
+        point = segment_intersection(a, b)
+        if point is not None and point > p:
+            schedule(point)
+
+    while queue:
+        _, x, _, y = heapq.heappop(queue)
+        p = (x, y)
+        scheduled.discard(p)
+        upper = starts.pop(p, [])
+
+        # 状态中经过p的线段是连续的一段 [low, high)
+        low, high = 0, len(status)
+        while low < high:
+            mid = (low + high) // 2
+            if _side(segments[status[mid]], p) > 0:
+                low = mid + 1
+            else:
+                high = mid
+        first = low
+        high = len(status)
+        while low < high:
+            mid = (low + high) // 2
+            if _side(segments[status[mid]], p) >= 0:
+                low = mid + 1
+            else:
+                high = mid
+        through = status[first:low]
+
+        if len(upper) + len(through) > 1:
+            results[p] = set(upper).union(through)
+
+        # 删除在p结束或经过p的线段，再把经过p和从p开始的线段按p右侧的次序插回
+        continuing = [i for i in through if segments[i].end != p]
+        inserted = sorted(upper + continuing, key=by_slope)
+        status[first:low] = inserted
+
+        if not inserted:
+            if 0 < first < len(status):
+                check(status[first - 1], status[first], p)
+        else:
+            last = first + len(inserted)
+            if first > 0:
+                check(status[first - 1], status[first], p)
+            if last < len(status):
+                check(status[last - 1], status[last], p)
+    return results
+
+
+def circle_segment_points(cx: float, cy: float, r: float, p: Coord, q: Coord) -> List[Coord]:
+    """圆与线段的交点"""
+    dx, dy = q[0] - p[0], q[1] - p[1]
+    fx, fy = p[0] - cx, p[1] - cy
+    a = dx * dx + dy * dy
+    if a == 0:
+        return []
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - r * r
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return []
+    root = math.sqrt(discriminant)
+    points = []
+    for t in ((-b - root) / (2 * a), (-b + root) / (2 * a)):
+        if 0 <= t <= 1:
+            point = (p[0] + t * dx, p[1] + t * dy)
+            if point not in points:
+                points.append(point)
+    return points
+
+
+def circle_circle_points(c1: Tuple[float, float, float],
+                         c2: Tuple[float, float, float]) -> List[Coord]:
+    """两个圆的交点（同心圆没有交点）"""
+    x1, y1, r1 = c1
+    x2, y2, r2 = c2
+    dx, dy = x2 - x1, y2 - y1
+    distance = math.hypot(dx, dy)
+    if distance == 0 or distance > r1 + r2 or distance < abs(r1 - r2):
+        return []
+    a = (r1 * r1 - r2 * r2 + distance * distance) / (2 * distance)
+    h = math.sqrt(max(0.0, r1 * r1 - a * a))
+    mx, my = x1 + a * dx / distance, y1 + a * dy / distance
+    if h == 0:
+        return [(mx, my)]
+    ox, oy = -dy * h / distance, dx * h / distance
+    return [(mx + ox, my + oy), (mx - ox, my - oy)]
+
+
+def item_segments(scene: SceneStore, key: ItemKey) -> List[Segment]:
+    """图元的线段：线段本身或多边形的各条边"""
+    kind, item_id = key
+    if kind == 'line':
+        lines = scene.lines
+        row = lines.row_of(item_id)
+        if row is None:
+            return []
+        segment = make_segment((lines.x1[row], lines.y1[row]), (lines.x2[row], lines.y2[row]), key)
+        return [segment] if segment else []
+    if kind == 'polygon':
+        row = scene.polygons.row_of(item_id)
+        if row is None:
+            return []
+        vertices = scene.polygons.vertices(row)
+        edges = (make_segment(p, q, key) for p, q in zip(vertices, vertices[1:] + vertices[:1]))
+        return [edge for edge in edges if edge]
+    return []
+
+
+def item_circle(scene: SceneStore, key: ItemKey) -> Optional[Tuple[float, float, float]]:
+    """圆图元的 (cx, cy, r)，其他图元返回None"""
+    kind, item_id = key
+    if kind != 'circle':
+        return None
+    circles = scene.circles
+    row = circles.row_of(item_id)
+    if row is None:
+        return None
+    return circles.cx[row], circles.cy[row], circles.r[row]
+
+
+def pair_points(scene: SceneStore, first: ItemKey, second: ItemKey) -> List[Coord]:
+    """两个图元之间的全部交点"""
+    circle1 = item_circle(scene, first)
+    circle2 = item_circle(scene, second)
+    if circle1 and circle2:
+        return circle_circle_points(circle1, circle2)
+    if circle1 or circle2:
+        circle = circle1 or circle2
+        other = second if circle1 else first
+        return [point for segment in item_segments(scene, other)
+                for point in circle_segment_points(*circle, segment.start, segment.end)]
+    return [point for a in item_segments(scene, first) for b in item_segments(scene, second)
+            for point in segment_pair_points(a, b)]
+
+
+def _scene_segments(scene) -> List[Segment]:
+    segments = []
+    for kind, table in (('line', scene.lines), ('polygon', scene.polygons)):
+        for item_id in table.ids:
+            segments.extend(item_segments(scene, (kind, item_id)))
+    return segments
+
+
+def _overlapping(scene, key: ItemKey) -> List[ItemKey]:
+    """包围盒与图元相交的其他线段、圆和多边形"""
+    bounds = scene.index.bounds(key)
+    if bounds is None:
+        return []
+    return [other for other in scene.index.query(*bounds)
+            if other[0] != 'point' and other != key]
+
+
+def scene_intersections(scene) -> Dict[Coord, Set[ItemKey]]:
+    """全量计算场景中的交点，返回交点到经过它的图元键集合的映射
+
+    线段和多边形的边用扫描线求交，圆只与空间索引给出的候选求交。只读取列表、
+    空间索引和多边形顶点，因此也可以传入SceneSnapshot，在工作线程中计算。
+    """
+    points: Dict[Coord, Set[ItemKey]] = {}
+    segments = _scene_segments(scene)
+    for point, indices in sweep_intersections(segments).items():
+        keys = {segments[i].key for i in indices}
+        if len(keys) > 1:  # 同一多边形相邻两边的公共顶点不算交点
+            points.setdefault(point, set()).update(keys)
+    for item_id in scene.circles.ids:
+        key = ('circle', item_id)
+        for other in _overlapping(scene, key):
+            if other[0] == 'circle' and other[1] > item_id:
+                continue  # 每对圆只计算一次
+            for point in pair_points(scene, key, other):
+                points.setdefault(point, set()).update((key, other))
+    return points
+
+
+class IntersectionFinder:
+    """场景交点服务
+
+    结果按场景的变更日志增量维护：新增的图元只与空间索引给出的候选求交，
+    删除的图元从经过的交点中去掉，只剩一个图元经过的交点随之删除。
+    日志无法覆盖（清空过场景、变更太多）或更换场景时需要用scene_intersections全量重建；
+    update只做增量部分并报告是否需要重建，由调用方决定在哪里重建（画布交给工作线程），
+    sync则直接在当前线程重建。
+    """
+
+    def __init__(self):
+        self._scene: Optional[SceneStore] = None
+        self._revision = None
+        self._points: Dict[Coord, Set[ItemKey]] = {}
+        # 交点的浮点坐标 -> 舍入到该坐标的交点数；Fraction的哈希和转换都较慢，
+        # 标记交点时只遍历这张表，它随交点的增删同步维护
+        self._coords: Dict[Coord, int] = {}
+        self._derived: Optional[List[Coord]] = None
+
+    def _add(self, point: Coord, keys: Iterable[ItemKey]):
+        existing = self._points.get(point)
+        if existing is None:
+            self._points[point] = existing = set()
+            coord = (float(point[0]), float(point[1]))
+            self._coords[coord] = self._coords.get(coord, 0) + 1
+        existing.update(keys)
+
+    def _remove_items(self, scene: SceneStore, removed: Set[ItemKey]):
+        """从交点中去掉已删除的图元
+
+        剩下的图元不一定仍在该点相交：例如共线重叠的两条线段经过被删除线段的端点，
+        重叠部分内部的点只因那个端点才成为交点。因此逐对重新确认剩下的图元。
+        """
+        for point in list(self._points):
+            keys = self._points[point]
+            if keys.isdisjoint(removed):
+                continue
+            confirmed = set()
+            # 与全量计算相同，两个圆按ID较大者在前的次序求交，保证浮点结果一致
+            remaining = sorted(keys - removed, key=lambda key: key[1], reverse=True)
+            for first, second in itertools.combinations(remaining, 2):
+                if point in pair_points(scene, first, second):
+                    confirmed.update((first, second))
+            if len(confirmed) < 2:
+                del self._points[point]
+                coord = (float(point[0]), float(point[1]))
+                if self._coords[coord] == 1:
+                    del self._coords[coord]
+                else:
+                    self._coords[coord] -= 1
+            else:
+                self._points[point] = confirmed
+
+    def _add_items(self, scene: SceneStore, added: Dict[ItemKey, None]):
+        """合并新图元与其候选之间的交点"""
+        for key in added:
+            for other in _overlapping(scene, key):
+                if other in added and other > key:
+                    continue  # 两个新图元之间的交点只计算一次
+                for point in pair_points(scene, key, other):
+                    self._add(point, (key, other))
+
+    def install(self, scene: SceneStore, points: Dict[Coord, Set[ItemKey]], revision: int):
+        """采用scene_intersections对场景修订号revision（可以是快照的修订号）算出的结果"""
+        self._scene = scene
+        self._revision = revision
+        self._points = points
+        coords: Dict[Coord, int] = {}
+        for x, y in points:
+            coord = (float(x), float(y))
+            coords[coord] = coords.get(coord, 0) + 1
+        self._coords = coords
+        self._derived = None
+
+    def update(self, scene: SceneStore) -> bool:
+        """按变更日志增量更新结果，需要全量重建时返回False（结果保持不变）"""
+        if scene is self._scene and scene.revision == self._revision:
+            return True
+        changes = scene.changes_since(self._revision) if scene is self._scene else None
+        if changes is None:
+            if len(scene):
+                return False
+            self.install(scene, {}, scene.revision)
+            return True
+        removed: Set[ItemKey] = set()
+        added: Dict[ItemKey, None] = {}  # 有序去重
+        for key, _ in changes:
+            if key[0] == 'point':
+                continue
+            if scene.index.bounds(key) is None:
+                removed.add(key)  # ID不会复用，不在场景中的键即已删除
+            else:
+                added[key] = None
+        if removed:
+            self._remove_items(scene, removed)
+        self._add_items(scene, added)
+        self._revision = scene.revision
+        self._derived = None
+        return True
+
+    def sync(self, scene: SceneStore):
+        """使结果与场景一致，需要时在当前线程全量重建"""
+        if not self.update(scene):
+            self.install(scene, scene_intersections(scene), scene.revision)
+
+    def intersections(self, scene: SceneStore) -> List[Intersection]:
+        """场景中全部交点"""
+        self.sync(scene)
+        return [Intersection(float(x), float(y), frozenset(keys))
+                for (x, y), keys in self._points.items()]
+
+    def derived_points(self, scene: SceneStore) -> List[Coord]:
+        """需要在画布上标出的交点：不与场景中已有的点重合的交点"""
+        self.sync(scene)
+        return self.current_points(scene)
+
+    def current_points(self, scene: SceneStore) -> List[Coord]:
+        """不做同步，返回当前结果中需要标出的交点；结果属于其他场景时返回空列表"""
+        if scene is not self._scene:
+            return []
+        if self._derived is None:
+            # 与已有点重合即坐标完全相等，用集合判断，不必逐个查询空间索引
+            existing = set(zip(scene.points.x, scene.points.y))
+            self._derived = [coord for coord in self._coords if coord not in existing]
+        return self._derived
@@ -0,0 +1,82 @@
+"""
+指针运动预测模块，根据最近的移动历史外推指针的下一位置，用于降低预览的感知延迟
+"""
+import math
+from typing import Optional, Tuple
+
+
+class PointerPredictor:
+    """指针位置预测器
+
+    使用alpha-beta滤波（常速度模型的稳态卡尔曼滤波）平滑估计指针速度，
+    从最近一次的真实位置沿估计速度外推。预测结果只用于绘制预览，
+    提交图形时始终使用真实的按下或释放位置。
+    """
+
+    # 位置和速度的修正增益，越大越跟手，越小越平稳
+    ALPHA = 0.5
+    BETA = 0.2
+    # 两次采样间隔超过该值（秒）视为新的一段移动，重新开始估计
+    RESET_GAP = 0.1
+    # 外推距离上限（像素），防止急停或抖动时预览明显越过指针
+    MAX_LEAD_DISTANCE = 48
+
+    def __init__(self, alpha: float = ALPHA, beta: float = BETA):
+        self.alpha = alpha
+        self.beta = beta
+        self.reset()
+
+    def reset(self):
+        """清空运动历史"""
+        self._time: Optional[float] = None
+        self._x = self._y = 0.0           # 滤波后的位置
+        self._vx = self._vy = 0.0         # 滤波后的速度（像素/秒）
+        self._last: Optional[Tuple[float, float]] = None  # 最近一次的真实位置
+
+    @property
+    def last(self) -> Optional[Tuple[float, float]]:
+        """最近一次采样的真实位置"""
+        return self._last
+
+    def add(self, time: float, x: float, y: float):
+        """加入一次采样
+
+        Args:
+            time: 采样时间（秒），取自输入事件的时间戳
+            x, y: 指针的屏幕坐标
+        """
+        self._last = (x, y)
+        dt = time - self._time if self._time is not None else None
+        if dt is None or dt > self.RESET_GAP or dt < 0:
+            self._time = time
+            self._x, self._y = x, y
+            self._vx = self._vy = 0.0
+            return
+        if dt == 0:
+            # 同一时间戳的多次采样只修正位置
+            self._x, self._y = x, y
+            return
+        self._time = time
+
+        # 按常速度模型预测到当前时刻，再用测量残差修正位置和速度
+        predicted_x = self._x + self._vx * dt
+        predicted_y = self._y + self._vy * dt
+        residual_x = x - predicted_x
+        residual_y = y - predicted_y
+        self._x = predicted_x + self.alpha * residual_x
+        self._y = predicted_y + self.alpha * residual_y
+        self._vx += self.beta * residual_x / dt
+        self._vy += self.beta * residual_y / dt
+
+    def predict(self, lead: float) -> Optional[Tuple[float, float]]:
+        """外推lead秒之后的指针位置，没有采样时返回None"""
+        if self._last is None:
+            return None
+        x, y = self._last
+        dx = self._vx * lead
+        dy = self._vy * lead
+        distance = math.hypot(dx, dy)
+        if distance > self.MAX_LEAD_DISTANCE:
+            dx *= self.MAX_LEAD_DISTANCE / distance
+            dy *= self.MAX_LEAD_DISTANCE / distance
+        return x + dx, y + dy
@@ -0,0 +1,133 @@
+"""
+鲁棒几何谓词模块：方向判断、共线判断、线段相交和点在多边形内的判断
+
+方向判断先用浮点计算行列式，并按Shewchuk的误差界判断结果的符号是否可信；
+只有行列式过于接近0、符号无法确定时，才改用fractions.Fraction精确重算。
+浮点输入都能被Fraction精确表示，因此结果的符号总是正确的，
+建立在这些谓词上的算法（凸包、三角剖分、求交等）不需要容差或重试。
+
+点均为 (x, y) 坐标元组。
+"""
+from fractions import Fraction
+from typing import Sequence, Tuple, Union
+
+Coord = Tuple[float, float]
+
+# 双精度浮点的单位舍入误差 2^-53
+_EPSILON = 2.0 ** -53
+# 二维方向行列式的浮点误差界系数（Shewchuk, ccwerrboundA）
+_ORIENT_ERROR_BOUND = (3.0 + 16.0 * _EPSILON) * _EPSILON
+
+
+def _orient(a: Coord, b: Coord, c: Coord) -> Union[float, Fraction]:
+    """方向行列式；浮点结果的符号可信时直接返回，否则返回精确的Fraction"""
+    det_left = (a[0] - c[0]) * (b[1] - c[1])
+    det_right = (a[1] - c[1]) * (b[0] - c[0])
+    det = det_left - det_right
+
+    # 两项异号（或有一项为0）时减法不会发生抵消，符号一定正确
+    if det_left > 0:
+        if det_right <= 0:
+            return det
+        det_sum = det_left + det_right
+    elif det_left < 0:
+        if det_right >= 0:
+            return det
+        det_sum = -det_left - det_right
+    else:
+        return det
+
+    error_bound = _ORIENT_ERROR_BOUND * det_sum
+    if det >= error_bound or -det >= error_bound:
+        return det
+
+    ax, ay = Fraction(a[0]), Fraction(a[1])
+    bx, by = Fraction(b[0]), Fraction(b[1])
+    cx, cy = Fraction(c[0]), Fraction(c[1])
+    return (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+
+
+def orient2d(a: Coord, b: Coord, c: Coord) -> float:
+    """a、b、c构成的有向面积的两倍
+
+    正值表示a→b→c为逆时针，负值为顺时针，0表示三点共线；符号总是精确的。
+    """
+    return float(_orient(a, b, c))
+
+
+def orientation(a: Coord, b: Coord, c: Coord) -> int:
+    """三点的方向：1为逆时针，-1为顺时针，0为共线"""
+    det = _orient(a, b, c)
+    return (det > 0) - (det < 0)
+
+
+def collinear(a: Coord, b: Coord, c: Coord) -> bool:
+    """三点是否共线"""
+    return orientation(a, b, c) == 0
+
+
+def triangle_area(a: Coord, b: Coord, c: Coord) -> float:
+    """三角形面积，由方向行列式计算，退化（共线）时恰好为0"""
+    return abs(orient2d(a, b, c)) / 2
+
+
+def _in_box(a: Coord, b: Coord, p: Coord) -> bool:
+    """p是否在a、b确定的轴对齐包围盒内（用于已知共线的情况）"""
+    return (min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and
+            min(a[1], b[1]) <= p[1] <= max(a[1], b[1]))
+
+
+def on_segment(p: Coord, a: Coord, b: Coord) -> bool:
+    """点p是否在线段ab上（含端点）"""
+    return orientation(a, b, p) == 0 and _in_box(a, b, p)
+
+
+def segments_intersect(p1: Coord, p2: Coord, q1: Coord, q2: Coord) -> bool:
+    """线段p1p2与q1q2是否相交（端点接触和共线重叠也算相交）"""
+    d1 = orientation(q1, q2, p1)
+    d2 = orientation(q1, q2, p2)
+    d3 = orientation(p1, p2, q1)
+    d4 = orientation(p1, p2, q2)
+
+    if d1 * d2 < 0 and d3 * d4 < 0:
+        return True
+
+    return ((d1 == 0 and _in_box(q1, q2, p1)) or
+            (d2 == 0 and _in_box(q1, q2, p2)) or
+            (d3 == 0 and _in_box(p1, p2, q1)) or
+            (d4 == 0 and _in_box(p1, p2, q2)))
+
+
+def point_in_triangle(p: Coord, a: Coord, b: Coord, c: Coord) -> bool:
+    """点p是否在三角形abc内（含边界），三角形可以是任意方向"""
+    if orientation(a, b, c) == 0:
+        # 退化三角形只剩下线段
+        return on_segment(p, a, b) or on_segment(p, b, c) or on_segment(p, c, a)
+
+    o1 = orientation(a, b, p)
+    o2 = orientation(b, c, p)
+    o3 = orientation(c, a, p)
+    has_negative = o1 < 0 or o2 < 0 or o3 < 0
+    has_positive = o1 > 0 or o2 > 0 or o3 > 0
+    return not (has_negative and has_positive)
+
+
+def point_in_polygon(p: Coord, vertices: Sequence[Coord]) -> bool:
+    """点p是否在简单多边形内（含边界）
+
+    射线法：统计从p向右的水平射线与各边的交叉次数，交点在p的哪一侧由方向谓词判断，
+    不计算交点坐标，因此没有舍入误差。
+    """
+    inside = False
+    py = p[1]
+    for i in range(len(vertices)):
+        a = vertices[i - 1]
+        b = vertices[i]
+        turn = orientation(a, b, p)
+        if turn == 0 and _in_box(a, b, p):
+            return True
+        if (a[1] > py) != (b[1] > py):
+            # 边跨过p所在的水平线；p在向上的边左侧、或在向下的边右侧时，交点在p右边
+            if (b[1] > a[1]) == (turn > 0):
+                inside = not inside
+    return inside
@@ -7,6 +7,7 @@ from PyQt6.QtWidgets import QLabel, QDoubleSpinBox, QGridLayout
 from PyQt6.QtCore import Qt
 
 from modules.property_panels import PropertyPanel
+from modules.predicates import triangle_area
 
 class TrianglePropertiesPanel(PropertyPanel):
     """三角形属性面板，提供三个顶点坐标设置"""
@@ -142,13 +143,12 @@ class TrianglePropertiesPanel(PropertyPanel):
         perimeter = side1 + side2 + side3
         self.perimeter_label.setText(f"{perimeter:.2f} cm")
         
-        # 计算面积（使用海伦公式）
-        s = perimeter / 2
-        try:
-            area = (s * (s - side1) * (s - side2) * (s - side3)) ** 0.5
+        # 计算面积（方向行列式）
+        area = triangle_area((x1, y1), (x2, y2), (x3, y3))
+        if area > 0:
             self.area_label.setText(f"{area:.2f} cm²")
-        except ValueError:
-            # 处理无法形成三角形的情况
+        else:
+            # 三点共线，无法形成三角形
             self.area_label.setText("Triangle invalide")
         
         # 发送属性变化信号
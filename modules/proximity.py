@@ -0,0 +1,212 @@
+"""
+邻近查询模块：最近点对和k近邻
+
+PointGrid是只保存点的均匀网格哈希，随点的增删维护，k近邻查询从查询点所在的方格
+一圈一圈向外搜索，找到k个点且剩余的方格不可能更近时停止。
+closest_pair用按x排序的扫描线求最近点对：排序O(n log n)，每个点只与常数个点比较，
+但活动集合是有序列表，插入和删除要移动列表元素，最坏情况为O(n²)。
+"""
+import heapq
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class PointGrid:
+    """点的均匀网格哈希
+
+    点数每翻一倍，按点的分布范围重新选择方格边长（平均每个方格约TARGET_LOAD个点）
+    并重新登记，摊还代价为常数；分布很不均匀、一圈圈搜索的方格数超过点数时，
+    查询退回到逐点比较，最坏情况也只是线性的。
+    """
+
+    # 重新登记时每个方格的目标平均点数
+    TARGET_LOAD = 2
+
+    def __init__(self, cell_size: float = 1.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._points: Dict[Hashable, Tuple[float, float]] = {}
+        self._extent: Optional[Tuple[float, float, float, float]] = None  # 点的包围盒，删除时不收缩
+        self._rehash_size = 1  # 点数达到该值的两倍时重新登记
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        size = self.cell_size
+        return math.floor(x / size), math.floor(y / size)
+
+    def _register(self, key: Hashable, x: float, y: float):
+        cell = self._cell(x, y)
+        bucket = self._cells.get(cell)
+        if bucket is None:
+            self._cells[cell] = {key}
+        else:
+            bucket.add(key)
+
+    def _rehash(self):
+        """按点的分布范围重新选择方格边长，并重新登记所有点"""
+        count = len(self._points)
+        min_x, min_y, max_x, max_y = self._extent
+        width, height = max_x - min_x, max_y - min_y
+        if width > 0 and height > 0:
+            self.cell_size = math.sqrt(width * height * self.TARGET_LOAD / count)
+        elif width > 0 or height > 0:
+            self.cell_size = max(width, height) * self.TARGET_LOAD / count
+        self._cells = {}
+        for key, (x, y) in self._points.items():
+            self._register(key, x, y)
+        self._rehash_size = count
+
+    def insert(self, key: Hashable, x: float, y: float):
+        """登记一个点，已存在时更新其坐标"""
+        if key in self._points:
+            self.remove(key)
+        self._points[key] = (x, y)
+        if self._extent is None:
+            self._extent = (x, y, x, y)
+        else:
+            min_x, min_y, max_x, max_y = self._extent
+            self._extent = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+        if len(self._points) >= 2 * self._rehash_size:
+            self._rehash()
+        else:
+            self._register(key, x, y)
+
+    def remove(self, key: Hashable) -> bool:
+        """注销一个点"""
+        point = self._points.pop(key, None)
+        if point is None:
+            return False
+        cell = self._cell(*point)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+        return True
+
+    def clear(self):
+        """清空索引"""
+        self._cells.clear()
+        self._points.clear()
+        self._extent = None
+        self._rehash_size = 1
+
+    def position(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """返回点的坐标"""
+        return self._points.get(key)
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                exclude: Optional[Hashable] = None) -> List[Tuple[float, Hashable]]:
+        """距离(x, y)最近的k个点，按距离升序返回 (距离, 键)
+
+        Args:
+            exclude: 不参与查询的点，例如查询某个点自身的近邻时
+        """
+        if k <= 0 or not self._points:
+            return []
+        min_col, min_row = self._cell(*self._extent[:2])
+        max_col, max_row = self._cell(*self._extent[2:])
+        col, row = self._cell(x, y)
+        cells = self._cells
+        points = self._points
+        size = self.cell_size
+
+        # 第ring圈及以外的方格与查询点的距离不小于 (ring - 1) * cell_size
+        ring = max(0, min_col - col, col - max_col, min_row - row, row - max_row)
+        last_ring = max(col - min_col, max_col - col, row - min_row, max_row - row)
+        best: List[Tuple[float, Hashable]] = []  # 以负距离为键的最大堆
+        candidates: Iterable[Hashable] = ()
+        visited = 0
+        while ring <= last_ring:
+            if len(best) == k and -best[0][0] <= (ring - 1) * size:
+                break
+            ring_cells = list(_ring_cells(col, row, ring, min_col, min_row, max_col, max_row))
+            visited += len(ring_cells)
+            if visited > len(points):
+                # 方格过于稀疏，逐点比较更快
+                best = []
+                candidates = points
+                break
+            for cell in ring_cells:
+                bucket = cells.get(cell)
+                if bucket:
+                    _push_nearest(best, k, bucket, points, x, y, exclude)
+            ring += 1
+        _push_nearest(best, k, candidates, points, x, y, exclude)
+        return sorted((-negative, key) for negative, key in best)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._points
+
+
+def _push_nearest(best: List[Tuple[float, Hashable]], k: int, keys: Iterable[Hashable],
+                  points: Dict[Hashable, Tuple[float, float]], x: float, y: float,
+                  exclude: Optional[Hashable]):
+    """把keys中的点加入以负距离为键、容量为k的最大堆"""
+    for key in keys:
+        if key == exclude:
+            continue
+        px, py = points[key]
+        distance = math.hypot(px - x, py - y)
+        if len(best) < k:
+            heapq.heappush(best, (-distance, key))
+        elif distance < -best[0][0]:
+            heapq.heapreplace(best, (-distance, key))
+
+
+def _ring_cells(col: int, row: int, ring: int,
+                min_col: int, min_row: int, max_col: int, max_row: int):
+    """以(col, row)为中心、切比雪夫距离为ring的一圈方格中落在下标范围内的部分"""
+    if ring == 0:
+        yield col, row
+        return
+    left, right = max(col - ring, min_col), min(col + ring, max_col)
+    for r in (row - ring, row + ring):
+        if min_row <= r <= max_row:
+            for c in range(left, right + 1):
+                yield c, r
+    bottom, top = max(row - ring + 1, min_row), min(row + ring - 1, max_row)
+    for c in (col - ring, col + ring):
+        if min_col <= c <= max_col:
+            for r in range(bottom, top + 1):
+                yield c, r
+
+
+def closest_pair(xs: Sequence[float], ys: Sequence[float]) -> Optional[Tuple[float, int, int]]:
+    """最近点对，返回 (距离, 下标i, 下标j)，少于两个点时返回None
+
+    按x排序后从左向右扫描，活动集合按y有序保存横向距离小于当前最小距离的点，
+    每个点只与活动集合中纵向距离小于当前最小距离的点比较，这样的点最多只有常数个。
+
+    活动集合是普通列表，bisect定位是O(log n)，但insort和del要移动插入点之后的元素，
+    每次O(n)。一般分布的点活动集合很小，整体接近O(n log n)；大量点横坐标几乎相同时
+    活动集合会包含几乎所有点，退化为O(n²)（元素移动由memmove完成，常数很小）。
+    """
+    count = len(xs)
+    if count < 2:
+        return None
+    order = sorted(range(count), key=lambda i: (xs[i], ys[i]))
+    active: List[Tuple[float, int]] = []  # (y, 下标)，按y升序
+    best = math.inf
+    pair = None
+    left = 0
+    for i in order:
+        x, y = xs[i], ys[i]
+        while xs[order[left]] < x - best:
+            j = order[left]
+            del active[bisect_left(active, (ys[j], j))]
+            left += 1
+        low = bisect_left(active, (y - best, -1))
+        high = bisect_right(active, (y + best, count))
+        for other_y, j in active[low:high]:
+            distance = math.hypot(xs[j] - x, other_y - y)
+            if distance < best:
+                best = distance
+                pair = (j, i)
+        if best == 0:
+            break
+        insort(active, (y, i))
+    return best, pair[0], pair[1]
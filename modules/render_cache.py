@@ -0,0 +1,182 @@
+"""
+绘图资源缓存，复用画布和形状绘制时使用的QPen、QBrush、QFont和静态文本对象
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import (QPen, QBrush, QColor, QFont, QFontMetricsF, QImage, QPainter,
+                         QStaticText, QTransform)
+
+
+class StyleCache:
+    """样式缓存，按键值驻留画笔、画刷和字体，避免在绘制循环中重复构造"""
+
+    def __init__(self):
+        self._pens: Dict[Tuple[str, float, Qt.PenStyle], QPen] = {}
+        self._brushes: Dict[str, QBrush] = {}
+        self._fonts: Dict[Tuple[str, int, bool], QFont] = {}
+
+    def pen(self, color: str, width: float = 1, style: Qt.PenStyle = Qt.PenStyle.SolidLine) -> QPen:
+        """获取（颜色, 线宽, 线型）对应的画笔"""
+        key = (color, width, style)
+        pen = self._pens.get(key)
+        if pen is None:
+            pen = QPen(QColor(color), width, style)
+            self._pens[key] = pen
+        return pen
+
+    def brush(self, color: str) -> QBrush:
+        """获取颜色对应的实心画刷"""
+        brush = self._brushes.get(color)
+        if brush is None:
+            brush = QBrush(QColor(color))
+            self._brushes[color] = brush
+        return brush
+
+    def font(self, family: str = "Arial", size: int = 10, bold: bool = False) -> QFont:
+        """获取（字体族, 字号, 是否加粗）对应的字体"""
+        key = (family, size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont(family, size)
+            font.setBold(bold)
+            self._fonts[key] = font
+        return font
+
+    def clear(self):
+        """清空所有缓存"""
+        self._pens.clear()
+        self._brushes.clear()
+        self._fonts.clear()
+
+
+class LabelCache:
+    """文本标签缓存，按（文本, 字体）复用已排版的QStaticText
+
+    调用方需先把同一字体设置到painter上，再批量绘制该字体的标签。
+    """
+
+    # 缓存条目上限，超出后淘汰最久未使用的条目，防止长度标签无限增长
+    MAX_ENTRIES = 4096
+
+    def __init__(self, styles: StyleCache, max_entries: int = MAX_ENTRIES):
+        self._styles = styles
+        self.max_entries = max_entries
+        self._labels: OrderedDict[Tuple[str, Tuple[str, int, bool]], QStaticText] = OrderedDict()
+        self._ascents: Dict[Tuple[str, int, bool], float] = {}
+
+    def get(self, text: str, font_key: Tuple[str, int, bool]) -> QStaticText:
+        """获取已排版的静态文本"""
+        key = (text, font_key)
+        labels = self._labels
+        static_text = labels.get(key)
+        if static_text is not None:
+            labels.move_to_end(key)
+            return static_text
+        if len(labels) >= self.max_entries:
+            labels.popitem(last=False)
+        static_text = QStaticText(text)
+        static_text.setTextFormat(Qt.TextFormat.PlainText)
+        static_text.prepare(QTransform(), self._styles.font(*font_key))
+        labels[key] = static_text
+        return static_text
+
+    def ascent(self, font_key: Tuple[str, int, bool]) -> float:
+        """字体的上升高度，用于把基线坐标换算为左上角坐标"""
+        ascent = self._ascents.get(font_key)
+        if ascent is None:
+            ascent = QFontMetricsF(self._styles.font(*font_key)).ascent()
+            self._ascents[font_key] = ascent
+        return ascent
+
+    def draw_at_baseline(self, painter, x: float, y: float, text: str,
+                         font_key: Tuple[str, int, bool]):
+        """以(x, y)为基线起点绘制标签，与QPainter.drawText(x, y, text)位置一致"""
+        painter.drawStaticText(QPointF(x, y - self.ascent(font_key)), self.get(text, font_key))
+
+    def draw_centered(self, painter, center_x: float, center_y: float, text: str,
+                      font_key: Tuple[str, int, bool]):
+        """以(center_x, center_y)为中心绘制标签"""
+        static_text = self.get(text, font_key)
+        size = static_text.size()
+        painter.drawStaticText(QPointF(center_x - size.width() / 2, center_y - size.height() / 2),
+                               static_text)
+
+    def clear(self):
+        """清空缓存（缩放或字体变化时调用）"""
+        self._labels.clear()
+        self._ascents.clear()
+
+
+class GridPattern:
+    """方格纸背景的图案画刷
+
+    一个主网格周期（含若干次网格线）预先光栅化为一块小图像，作为纹理画刷平铺，
+    整个背景只需一次填充。图像只在周期的设备像素数或样式变化（即缩放变化）时重建，
+    平移只改变画刷的变换。
+    """
+
+    def __init__(self):
+        self._key = None
+        self._image: Optional[QImage] = None
+
+    def _tile(self, size: int, divisions: int, line_width: int, major_color: str,
+              minor_color: str, background: Optional[str]) -> QImage:
+        """绘制一个周期的图块：左边和上边为主网格线，内部等分为次网格线"""
+        key = (size, divisions, line_width, major_color, minor_color, background)
+        if key == self._key:
+            return self._image
+        image = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(QColor(background) if background else QColor(Qt.GlobalColor.transparent))
+        painter = QPainter(image)
+        minor = QColor(minor_color)
+        for i in range(1, divisions):
+            offset = round(i * size / divisions)
+            painter.fillRect(offset, 0, line_width, size, minor)
+            painter.fillRect(0, offset, size, line_width, minor)
+        major = QColor(major_color)
+        painter.fillRect(0, 0, line_width, size, major)
+        painter.fillRect(0, 0, size, line_width, major)
+        painter.end()
+        self._key = key
+        self._image = image
+        return image
+
+    def brush(self, period: float, origin_x: float, origin_y: float, ratio: float = 1.0,
+              divisions: int = 5, major_color: str = "#D0D7E2", minor_color: str = "#EEF1F5",
+              background: Optional[str] = None) -> QBrush:
+        """返回平铺方格纸的画刷
+
+        Args:
+            period: 主网格线之间的逻辑像素距离
+            origin_x, origin_y: 一条主网格线交点的逻辑坐标（坐标原点）
+            ratio: 设备像素比，图块按设备像素光栅化
+            divisions: 每个周期内的次网格等分数
+            background: 图块的底色，为None时透明
+        """
+        size = max(divisions, round(period * ratio))
+        line_width = max(1, round(ratio))
+        image = self._tile(size, divisions, line_width, major_color, minor_color, background)
+        brush = QBrush(image)
+        # 图块像素到逻辑坐标：按周期精确缩放，网格线居中于网格坐标，并以原点为锚平铺
+        scale = period / size
+        brush.setTransform(QTransform(scale, 0, 0, scale,
+                                      origin_x - line_width * scale / 2,
+                                      origin_y - line_width * scale / 2))
+        return brush
+
+    def clear(self):
+        """释放缓存的图块"""
+        self._key = None
+        self._image = None
+
+
+# 画布和形状共享的样式缓存
+STYLES = StyleCache()
+
+# 画布共享的标签缓存
+LABELS = LabelCache(STYLES)
+
+# 画布的方格纸背景图案
+GRID = GridPattern()
@@ -0,0 +1,517 @@
+"""
+场景存储模块，使用列式数组保存画布上已提交的几何数据
+"""
+import json
+import math
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from modules.proximity import PointGrid, closest_pair
+from modules.spatial_index import Bounds, SpatialHash, segment_distance
+
+# 图元键 (类型, ID)，类型为 'point'、'line'、'circle' 或 'polygon'
+ItemKey = Tuple[str, int]
+
+# 场景文件格式版本
+SCENE_FORMAT_VERSION = 1
+
+# 距离相同时的命中优先级：点优先于线段，线段优先于圆和多边形
+_KIND_PRIORITY = {'point': 0, 'line': 1, 'circle': 2, 'polygon': 3}
+
+
+class ColorTable:
+    """颜色驻留表，将颜色字符串映射为紧凑的整数索引"""
+
+    def __init__(self):
+        self._colors: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, color: str) -> int:
+        """返回颜色对应的索引，首次出现时登记"""
+        index = self._index.get(color)
+        if index is None:
+            index = len(self._colors)
+            self._colors.append(color)
+            self._index[color] = index
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        return self._colors[index]
+
+    def __len__(self) -> int:
+        return len(self._colors)
+
+    def clear(self):
+        """清空颜色表"""
+        self._colors = []
+        self._index = {}
+
+
+class _ColumnTable:
+    """列式表基类：每一列是一个连续的数组，行按稳定ID升序排列"""
+
+    # 子类声明的浮点坐标列名
+    columns: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """清空所有列"""
+        for name in self.columns:
+            setattr(self, name, array('d'))
+        self.color = array('I')  # 颜色索引
+        self.ids = array('q')    # 稳定ID，单调递增
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def color_buckets(self, rows: Optional[Iterable[int]] = None) -> Dict[int, List[int]]:
+        """按颜色索引对行号分桶，便于每种样式只设置一次
+
+        Args:
+            rows: 只对这些行分桶，默认全部行
+        """
+        color = self.color
+        if rows is None:
+            rows = range(len(color))
+        buckets: Dict[int, List[int]] = {}
+        for row in rows:
+            color_index = color[row]
+            bucket = buckets.get(color_index)
+            if bucket is None:
+                buckets[color_index] = [row]
+            else:
+                bucket.append(row)
+        return buckets
+
+    def copy(self) -> '_ColumnTable':
+        """返回该表的独立副本（逐列复制数组）"""
+        clone = self.__class__.__new__(self.__class__)
+        for name, value in self.__dict__.items():
+            setattr(clone, name, value[:])
+        return clone
+
+    def row_of(self, item_id: int) -> Optional[int]:
+        """根据ID查找行号（ID有序，使用二分查找）"""
+        row = bisect_left(self.ids, item_id)
+        if row < len(self.ids) and self.ids[row] == item_id:
+            return row
+        return None
+
+    def _append(self, item_id: int, color_index: int, values: Sequence[float]):
+        """追加一行"""
+        for name, value in zip(self.columns, values):
+            getattr(self, name).append(value)
+        self.color.append(color_index)
+        self.ids.append(item_id)
+
+    def _remove_row(self, row: int):
+        """删除一行，保持其余行的顺序"""
+        for name in self.columns:
+            del getattr(self, name)[row]
+        del self.color[row]
+        del self.ids[row]
+
+
+class PointTable(_ColumnTable):
+    """点表"""
+    columns = ('x', 'y')
+
+
+class LineTable(_ColumnTable):
+    """线段表，每条线段可带一个长度标签"""
+    columns = ('x1', 'y1', 'x2', 'y2')
+
+    def clear(self):
+        super().clear()
+        self.labels: List[Optional[str]] = []
+
+    def _append(self, item_id, color_index, values, label=None):
+        super()._append(item_id, color_index, values)
+        self.labels.append(label)
+
+    def _remove_row(self, row):
+        super()._remove_row(row)
+        del self.labels[row]
+
+
+class CircleTable(_ColumnTable):
+    """圆表"""
+    columns = ('cx', 'cy', 'r')
+
+
+class PolygonTable(_ColumnTable):
+    """多边形表（矩形、三角形），顶点坐标平铺在共享数组中，每条边可带一个长度标签"""
+    columns = ()
+
+    def clear(self):
+        super().clear()
+        self.vx = array('d')
+        self.vy = array('d')
+        self.offsets = array('q')  # 每个多边形第一个顶点在vx/vy中的位置
+        self.counts = array('I')   # 每个多边形的顶点数
+        # 每个多边形的边标签，第i个标签属于第i个顶点到下一个顶点的边
+        self.labels: List[Tuple[Optional[str], ...]] = []
+
+    def vertices(self, row: int) -> List[Tuple[float, float]]:
+        """返回指定行多边形的顶点列表"""
+        start = self.offsets[row]
+        end = start + self.counts[row]
+        return list(zip(self.vx[start:end], self.vy[start:end]))
+
+    def _append(self, item_id, color_index, vertices, labels=None):
+        self.offsets.append(len(self.vx))
+        self.counts.append(len(vertices))
+        for x, y in vertices:
+            self.vx.append(x)
+            self.vy.append(y)
+        self.labels.append(tuple(labels) if labels else (None,) * len(vertices))
+        super()._append(item_id, color_index, ())
+
+    def _remove_row(self, row):
+        start = self.offsets[row]
+        count = self.counts[row]
+        del self.vx[start:start + count]
+        del self.vy[start:start + count]
+        del self.offsets[row]
+        del self.counts[row]
+        del self.labels[row]
+        for i in range(row, len(self.offsets)):
+            self.offsets[i] -= count
+        super()._remove_row(row)
+
+
+class SceneStore:
+    """画布场景存储
+
+    所有已提交的点、线段、圆和多边形都保存在列式数组中，
+    颜色以索引形式驻留，每个图元拥有一个稳定的整数ID。
+    空间索引随增删同步维护，用于命中测试和范围查询。
+
+    每次新增或删除都使修订号加一，并在变更日志中记下图元键和包围盒，
+    缓存（瓦片、交点）据此只更新受影响的部分；清空场景会截断日志。
+    """
+
+    # 变更日志保留的最大条数，更早的修订无法增量更新，只能整体失效
+    MAX_CHANGES = 4096
+
+    def __init__(self):
+        self.colors = ColorTable()
+        self.points = PointTable()
+        self.lines = LineTable()
+        self.circles = CircleTable()
+        self.polygons = PolygonTable()
+        self.index = SpatialHash()
+        self.point_grid = PointGrid()  # 只含点的网格索引，用于近邻查询
+        self._closest: Optional[Tuple[int, Optional[Tuple[float, int, int]]]] = None  # (revision, 最近点对)
+        self._extent: Optional[Bounds] = None  # 全部图元的包围盒，随增删维护
+        self._extent_dirty = False
+        self.revision = 0  # 每次修改递增，供缓存判断场景是否变化
+        self._next_id = 1
+        # 变更日志：第i条是修订号 _changes_base + i + 1 的变更 (图元键, 包围盒)
+        self._changes: List[Tuple[ItemKey, Bounds]] = []
+        self._changes_base = 0
+
+    def _tables(self) -> Iterable[Tuple[str, _ColumnTable]]:
+        return (('point', self.points), ('line', self.lines),
+                ('circle', self.circles), ('polygon', self.polygons))
+
+    def _new_id(self) -> int:
+        item_id = self._next_id
+        self._next_id += 1
+        self.revision += 1
+        return item_id
+
+    def _record(self, key: ItemKey, bounds: Bounds):
+        """把一次变更记入日志，超出上限时丢弃较早的一半"""
+        changes = self._changes
+        changes.append((key, bounds))
+        if len(changes) > self.MAX_CHANGES:
+            dropped = len(changes) // 2
+            del changes[:dropped]
+            self._changes_base += dropped
+
+    def changes_since(self, revision: int) -> Optional[List[Tuple[ItemKey, Bounds]]]:
+        """修订号revision之后新增或删除的图元，按发生顺序返回 (图元键, 包围盒)
+
+        图元键已不在场景中的是被删除的图元（ID不会复用）。日志不能覆盖该修订
+        （期间清空过场景，或变更太多已被丢弃）时返回None，调用方应整体重建。
+        """
+        if revision < self._changes_base or revision > self.revision:
+            return None
+        return self._changes[revision - self._changes_base:]
+
+    def _index(self, key: ItemKey, bounds: Bounds):
+        """登记图元到空间索引，扩展场景包围盒，并记入变更日志"""
+        self.index.insert(key, bounds)
+        self._record(key, bounds)
+        if self._extent_dirty:
+            return
+        if self._extent is None:
+            self._extent = bounds
+        else:
+            min_x, min_y, max_x, max_y = self._extent
+            self._extent = (min(min_x, bounds[0]), min(min_y, bounds[1]),
+                            max(max_x, bounds[2]), max(max_y, bounds[3]))
+
+    def _unindex(self, key: ItemKey):
+        """从空间索引注销图元；图元贴着场景包围盒边界时标记包围盒待重算"""
+        bounds = self.index.bounds(key)
+        self.index.remove(key)
+        extent = self._extent
+        if bounds is not None and extent is not None and (
+                bounds[0] <= extent[0] or bounds[1] <= extent[1] or
+                bounds[2] >= extent[2] or bounds[3] >= extent[3]):
+            self._extent_dirty = True
+
+    def extent(self) -> Optional[Bounds]:
+        """场景包围盒 (min_x, min_y, max_x, max_y)，空场景返回None
+
+        添加图元时增量扩展；只有删除了贴边的图元后才从索引重算一次。
+        """
+        if self._extent_dirty:
+            self._extent = self.index.extent()
+            self._extent_dirty = False
+        return self._extent
+
+    def add_point(self, x: float, y: float, color: str) -> int:
+        """添加一个点，返回其ID"""
+        item_id = self._new_id()
+        self.points._append(item_id, self.colors.intern(color), (x, y))
+        self._index(('point', item_id), (x, y, x, y))
+        self.point_grid.insert(item_id, x, y)
+        return item_id
+
+    def add_line(self, x1: float, y1: float, x2: float, y2: float,
+                 color: str, label: Optional[str] = None) -> int:
+        """添加一条线段（可带长度标签），返回其ID"""
+        item_id = self._new_id()
+        self.lines._append(item_id, self.colors.intern(color), (x1, y1, x2, y2), label)
+        self._index(('line', item_id), (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+        return item_id
+
+    def add_circle(self, cx: float, cy: float, radius: float, color: str) -> int:
+        """添加一个圆，返回其ID"""
+        item_id = self._new_id()
+        self.circles._append(item_id, self.colors.intern(color), (cx, cy, radius))
+        self._index(('circle', item_id), (cx - radius, cy - radius, cx + radius, cy + radius))
+        return item_id
+
+    def add_polygon(self, vertices: Sequence[Tuple[float, float]], color: str,
+                    labels: Optional[Sequence[Optional[str]]] = None) -> int:
+        """添加一个多边形（可带边长标签，与边一一对应），返回其ID"""
+        if labels is not None and len(labels) != len(vertices):
+            raise ValueError("边标签的数量必须与顶点数相同")
+        item_id = self._new_id()
+        self.polygons._append(item_id, self.colors.intern(color), vertices, labels)
+        xs = [x for x, _ in vertices]
+        ys = [y for _, y in vertices]
+        self._index(('polygon', item_id), (min(xs), min(ys), max(xs), max(ys)))
+        return item_id
+
+    def locate(self, item_id: int) -> Optional[Tuple[str, int]]:
+        """查找ID所属的图元类型和行号"""
+        for kind, table in self._tables():
+            row = table.row_of(item_id)
+            if row is not None:
+                return kind, row
+        return None
+
+    def remove(self, item_id: int) -> bool:
+        """删除指定ID的图元"""
+        for kind, table in self._tables():
+            row = table.row_of(item_id)
+            if row is not None:
+                key = (kind, item_id)
+                bounds = self.index.bounds(key)
+                table._remove_row(row)
+                self._unindex(key)
+                if kind == 'point':
+                    self.point_grid.remove(item_id)
+                self.revision += 1
+                self._record(key, bounds)
+                return True
+        return False
+
+    def bounds(self, key: ItemKey) -> Optional[Bounds]:
+        """返回图元的包围盒（网格坐标）"""
+        return self.index.bounds(key)
+
+    def distance_to(self, key: ItemKey, x: float, y: float) -> Optional[float]:
+        """点(x, y)到图元的距离，圆和多边形按轮廓计算"""
+        kind, item_id = key
+        table = dict(self._tables()).get(kind)
+        row = table.row_of(item_id) if table is not None else None
+        if row is None:
+            return None
+        if kind == 'point':
+            return math.hypot(x - table.x[row], y - table.y[row])
+        if kind == 'line':
+            return segment_distance(x, y, table.x1[row], table.y1[row],
+                                    table.x2[row], table.y2[row])
+        if kind == 'circle':
+            return abs(math.hypot(x - table.cx[row], y - table.cy[row]) - table.r[row])
+        vertices = table.vertices(row)
+        return min(segment_distance(x, y, x1, y1, x2, y2)
+                   for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]))
+
+    def items_within(self, x: float, y: float, tolerance: float) -> List[Tuple[float, ItemKey]]:
+        """返回距离(x, y)不超过tolerance的图元，按（距离, 优先级）升序排列"""
+        hits = []
+        for key in self.index.query_point(x, y, tolerance):
+            distance = self.distance_to(key, x, y)
+            if distance is not None and distance <= tolerance:
+                hits.append((distance, key))
+        hits.sort(key=lambda hit: (hit[0], _KIND_PRIORITY[hit[1][0]], hit[1][1]))
+        return hits
+
+    def rows_in_rect(self, min_x: float, min_y: float,
+                     max_x: float, max_y: float) -> Dict[str, List[int]]:
+        """按类型返回包围盒与矩形相交的图元行号（升序）"""
+        return _rows_in_rect(self._tables(), self.index, (min_x, min_y, max_x, max_y))
+
+    def snapshot(self) -> 'SceneSnapshot':
+        """返回当前场景的只读快照，可交给工作线程绘制"""
+        return SceneSnapshot(self)
+
+    def nearest(self, x: float, y: float, tolerance: float) -> Optional[ItemKey]:
+        """返回tolerance范围内距离(x, y)最近的图元，没有则返回None"""
+        hits = self.items_within(x, y, tolerance)
+        return hits[0][1] if hits else None
+
+    def nearest_points(self, x: float, y: float, k: int = 1) -> List[Tuple[float, int]]:
+        """距离(x, y)最近的k个点，按距离升序返回 (距离, ID)"""
+        return self.point_grid.nearest(x, y, k)
+
+    def closest_points(self) -> Optional[Tuple[float, int, int]]:
+        """距离最近的两个点 (距离, ID, ID)，少于两个点时返回None
+
+        结果按revision缓存，场景不变时重复查询不再计算。
+        """
+        if self._closest is None or self._closest[0] != self.revision:
+            points = self.points
+            pair = closest_pair(points.x, points.y)
+            if pair is not None:
+                distance, first, second = pair
+                pair = (distance, points.ids[first], points.ids[second])
+            self._closest = (self.revision, pair)
+        return self._closest[1]
+
+    def to_dict(self) -> Dict[str, list]:
+        """导出为可JSON序列化的字典（网格坐标，按行顺序）"""
+        colors = self.colors
+        points, lines, circles, polygons = self.points, self.lines, self.circles, self.polygons
+        return {
+            'version': SCENE_FORMAT_VERSION,
+            'points': [{'x': points.x[row], 'y': points.y[row], 'color': colors[points.color[row]]}
+                       for row in range(len(points))],
+            'lines': [{'x1': lines.x1[row], 'y1': lines.y1[row],
+                       'x2': lines.x2[row], 'y2': lines.y2[row],
+                       'color': colors[lines.color[row]], 'label': lines.labels[row]}
+                      for row in range(len(lines))],
+            'circles': [{'cx': circles.cx[row], 'cy': circles.cy[row], 'r': circles.r[row],
+                         'color': colors[circles.color[row]]}
+                        for row in range(len(circles))],
+            'polygons': [{'vertices': [list(vertex) for vertex in polygons.vertices(row)],
+                          'color': colors[polygons.color[row]],
+                          'labels': list(polygons.labels[row])}
+                         for row in range(len(polygons))],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, list]) -> 'SceneStore':
+        """从to_dict导出的字典重建场景"""
+        version = data.get('version', SCENE_FORMAT_VERSION)
+        if version > SCENE_FORMAT_VERSION:
+            raise ValueError(f"不支持的场景文件版本: {version}")
+        scene = cls()
+        for point in data.get('points', []):
+            scene.add_point(point['x'], point['y'], point['color'])
+        for line in data.get('lines', []):
+            scene.add_line(line['x1'], line['y1'], line['x2'], line['y2'],
+                           line['color'], line.get('label'))
+        for circle in data.get('circles', []):
+            scene.add_circle(circle['cx'], circle['cy'], circle['r'], circle['color'])
+        for polygon in data.get('polygons', []):
+            scene.add_polygon([tuple(vertex) for vertex in polygon['vertices']], polygon['color'],
+                              polygon.get('labels'))
+        return scene
+
+    def clear(self):
+        """清空场景"""
+        for _, table in self._tables():
+            table.clear()
+        self.colors.clear()
+        self.index.clear()
+        self.point_grid.clear()
+        self._extent = None
+        self._extent_dirty = False
+        self.revision += 1
+        self._changes = []
+        self._changes_base = self.revision
+
+    def __len__(self) -> int:
+        return sum(len(table) for _, table in self._tables())
+
+
+class SceneSnapshot:
+    """场景的不可变快照
+
+    复制了所有列数组、颜色表和空间索引，与原场景之后的修改互不影响，
+    因此可以在工作线程中安全地读取和绘制。列数组的复制是连续内存拷贝，空间索引的
+    方格集合写时复制，5万个图元时拍摄一次快照约几毫秒，可以在每次编辑后进行。
+    """
+
+    def __init__(self, scene: SceneStore):
+        self.colors: Tuple[str, ...] = tuple(scene.colors)
+        self.points = scene.points.copy()
+        self.lines = scene.lines.copy()
+        self.circles = scene.circles.copy()
+        self.polygons = scene.polygons.copy()
+        self.index = scene.index.copy()
+        self.revision = scene.revision
+        self._extent = scene.extent()
+
+    def _tables(self) -> Iterable[Tuple[str, _ColumnTable]]:
+        return (('point', self.points), ('line', self.lines),
+                ('circle', self.circles), ('polygon', self.polygons))
+
+    def rows_in_rect(self, min_x: float, min_y: float,
+                     max_x: float, max_y: float) -> Dict[str, List[int]]:
+        """按类型返回包围盒与矩形相交的图元行号（升序）"""
+        return _rows_in_rect(self._tables(), self.index, (min_x, min_y, max_x, max_y))
+
+    def extent(self) -> Optional[Bounds]:
+        """拍摄快照时的场景包围盒"""
+        return self._extent
+
+    def __len__(self) -> int:
+        return sum(len(table) for _, table in self._tables())
+
+
+def _rows_in_rect(tables: Iterable[Tuple[str, _ColumnTable]], index: SpatialHash,
+                  bounds: Bounds) -> Dict[str, List[int]]:
+    """借助空间索引，按类型收集包围盒与矩形相交的行号（升序）"""
+    tables = dict(tables)
+    rows: Dict[str, List[int]] = {kind: [] for kind in tables}
+    for kind, item_id in index.query(*bounds):
+        row = tables[kind].row_of(item_id)
+        if row is not None:
+            rows[kind].append(row)
+    for kind_rows in rows.values():
+        kind_rows.sort()
+    return rows
+
+
+def save_scene(scene: SceneStore, path: str):
+    """把场景保存为JSON文件"""
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(scene.to_dict(), file, ensure_ascii=False)
+
+
+def load_scene(path: str) -> SceneStore:
+    """从JSON文件加载场景"""
+    with open(path, 'r', encoding='utf-8') as file:
+        return SceneStore.from_dict(json.load(file))
@@ -0,0 +1,132 @@
+"""
+无界面场景导出，把保存的场景文件批量渲染为PNG
+
+不创建MainApp或任何窗口部件，可在没有显示器的服务器上运行（QT_QPA_PLATFORM=offscreen）。
+用法：
+    python -m modules.scene_export dessin1.json dessin2.json -o rendus/ --jobs 8
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QGuiApplication, QImage
+
+from modules.scene import load_scene
+from modules.scene_renderer import render_scene
+from modules.strip_export import LOGICAL_DPI, export_png_strips
+
+# 超过该像素数的图像改为分条带流式写出
+MAX_SINGLE_IMAGE_PIXELS = 16 * 1024 * 1024
+
+# 每个进程共用的QGuiApplication（字体等资源需要它）
+_app = None
+
+
+def _ensure_app():
+    """在当前进程中创建无界面的QGuiApplication"""
+    global _app
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        _app = QGuiApplication([sys.argv[0]])
+
+
+def render_to_image(scene, width: int, height: int, ratio: float = 1.0, **options) -> QImage:
+    """把场景渲染为QImage，自动缩放到铺满图像
+
+    Args:
+        width, height: 图像的逻辑尺寸
+        ratio: 设备像素比，导出高分辨率图像时大于1
+        options: 传给paint_scene的其他参数（show_axes、background等）
+    """
+    _ensure_app()
+    image = QImage(int(width * ratio), int(height * ratio), QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(ratio)
+    image.fill(Qt.GlobalColor.white)
+    # 与分条导出使用相同的线段绘制方式，大图改走分条时结果不变
+    options.setdefault('segment_quads', True)
+    render_scene(scene, image, **options)
+    return image
+
+
+def export_png(scene_path: str, png_path: str, width: int = 1024, height: int = 768,
+               ratio: float = 1.0, show_axes: bool = True, dpi: Optional[float] = None) -> str:
+    """把一个场景文件渲染为PNG，返回输出路径
+
+    给出dpi时按dpi换算设备像素比（覆盖ratio）并写入物理分辨率；
+    输出过大时按条带流式写出，内存占用保持不变。
+    """
+    scene = load_scene(scene_path)
+    if dpi:
+        ratio = dpi / LOGICAL_DPI
+    if width * height * ratio * ratio > MAX_SINGLE_IMAGE_PIXELS or dpi:
+        _ensure_app()
+        export_png_strips(scene, png_path, width, height, ratio, dpi, show_axes=show_axes)
+        return png_path
+    image = render_to_image(scene, width, height, ratio, show_axes=show_axes)
+    if not image.save(png_path, "PNG"):
+        raise OSError(f"Impossible d'écrire {png_path}")
+    return png_path
+
+
+def _output_path(scene_path: str, output_dir: Optional[str]) -> str:
+    """输出文件路径：与场景文件同名的.png，放在输出目录（默认与场景文件相同目录）中"""
+    stem = os.path.splitext(os.path.basename(scene_path))[0]
+    directory = output_dir if output_dir else os.path.dirname(os.path.abspath(scene_path))
+    return os.path.join(directory, stem + ".png")
+
+
+def _export_job(job: Tuple[str, str, int, int, float, bool, Optional[float]]) -> str:
+    """工作进程中执行的导出任务"""
+    return export_png(*job)
+
+
+def export_many(scene_paths: List[str], output_dir: Optional[str] = None, width: int = 1024,
+                height: int = 768, ratio: float = 1.0, show_axes: bool = True,
+                jobs: Optional[int] = None,
+                dpi: Optional[float] = None) -> List[Tuple[str, Optional[str]]]:
+    """在进程池中批量导出，返回 (场景路径, 错误信息或None) 列表"""
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tasks = [(path, _output_path(path, output_dir), width, height, ratio, show_axes, dpi)
+             for path in scene_paths]
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_ensure_app) as executor:
+        futures = {executor.submit(_export_job, task): task[0] for task in tasks}
+        for future in as_completed(futures):
+            scene_path = futures[future]
+            try:
+                future.result()
+                results.append((scene_path, None))
+            except Exception as e:
+                results.append((scene_path, str(e)))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Exporter des dessins de géométrie en PNG")
+    parser.add_argument("scenes", nargs="+", help="fichiers de scène (.json)")
+    parser.add_argument("-o", "--output-dir", help="répertoire de sortie")
+    parser.add_argument("--width", type=int, default=1024, help="largeur de l'image")
+    parser.add_argument("--height", type=int, default=768, help="hauteur de l'image")
+    parser.add_argument("--scale", type=float, default=1.0, help="rapport de pixels (ex. 2 pour HiDPI)")
+    parser.add_argument("--dpi", type=float, default=None,
+                        help="résolution d'impression (ex. 600), remplace --scale")
+    parser.add_argument("--no-axes", action="store_true", help="ne pas dessiner les axes")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="nombre de processus")
+    args = parser.parse_args(argv)
+
+    results = export_many(args.scenes, args.output_dir, args.width, args.height,
+                          args.scale, not args.no_axes, args.jobs, args.dpi)
+    failures = [(path, error) for path, error in results if error]
+    for path, error in failures:
+        print(f"Erreur: {path}: {error}", file=sys.stderr)
+    print(f"{len(results) - len(failures)}/{len(results)} dessins exportés")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""
+场景绘制模块，把已提交的点、线段和圆以及坐标轴绘制到任意QPainter或QPaintDevice上
+
+本模块只依赖QtGui，不创建任何窗口部件，可在无界面（offscreen）环境中使用。
+"""
+import math
+from typing import Dict, List, Optional, Sequence
+
+from PyQt6.QtCore import Qt, QRectF, QPointF, QLineF
+from PyQt6.QtGui import QPainter, QPolygonF, QTransform
+
+from modules.render_cache import STYLES
+from modules.shape_renderers import ShapeRendererRegistry
+
+
+class SceneRenderer:
+    """已提交图元的绘制器
+
+    绘制对象可以是SceneStore或其快照SceneSnapshot，坐标通过给定的变换投影到设备上。
+    画布的静态图层和后台线程的瓦片共用这一套绘制逻辑。
+
+    labels为标签缓存（LabelCache）时以静态文本绘制标签；为None时直接drawText，
+    供不能共享缓存对象的工作线程使用。styles为样式缓存（StyleCache），为None时使用
+    GUI线程共享的STYLES；工作线程各自传入新的缓存，不与GUI线程争用同一个字典。
+
+    segment_quads为True时线段以填充的四边形绘制：drawLines的抗锯齿快速路径会先把线段
+    裁剪到当前裁剪矩形再光栅化，裁剪边界不同（整幅绘制与分条绘制）时跨边界的线段
+    像素略有差异；四边形填充只按扫描行裁剪，结果与裁剪边界无关，但比drawLines慢。
+    """
+
+    # 标签字体（字体族, 字号, 是否加粗），同时作为标签缓存的键
+    AXIS_FONT = ("Arial", 8, False)
+    POINT_NAME_FONT = ("Arial", 10, True)
+    LINE_LABEL_FONT = ("Arial", 10, True)
+
+    # 坐标轴和刻度标签的外扩像素：轴线或刻度略在区域外时，其标签仍可能落在区域内
+    AXIS_MARGIN = 30
+
+    # 各类图元的绘制方法，按绘制顺序排列，由形状绘制注册表生成
+    KIND_RENDERERS = ShapeRendererRegistry.kind_renderers()
+
+    # 屏幕半径小于该值（像素）的圆退化为点绘制
+    LOD_MIN_CIRCLE_RADIUS = 2
+    # 简化模式下合并点所用的屏幕方格边长（像素）
+    LOD_POINT_MERGE = 4
+
+    def __init__(self, scene, transform: QTransform, labels=None, styles=None,
+                 segment_quads: bool = False):
+        self.scene = scene
+        self.transform = transform
+        self.labels = labels
+        self.styles = styles if styles is not None else STYLES
+        self.segment_quads = segment_quads
+
+    def render(self, painter, rows: Dict[str, List[int]], dense: bool = False):
+        """绘制指定的行
+
+        Args:
+            rows: 按类型（'point'、'line'、'circle'、'polygon'）给出的行号
+            dense: 简化模式，省略标签并合并屏幕上重叠的点
+        """
+        for kind, method in self.KIND_RENDERERS:
+            kind_rows = rows.get(kind)
+            if kind_rows:
+                getattr(self, method)(painter, kind_rows, dense)
+
+    def _mapping(self):
+        """变换的缩放和平移分量，供批量绘制时直接做算术投影"""
+        transform = self.transform
+        return transform.m11(), transform.dx(), transform.m22(), transform.dy()
+
+    def _draw_label_at_baseline(self, painter, x, y, text, font_key):
+        if self.labels is not None:
+            self.labels.draw_at_baseline(painter, x, y, text, font_key)
+        else:
+            painter.drawText(QPointF(x, y), text)
+
+    def _draw_label_centered(self, painter, center_x, center_y, text, font_key):
+        if self.labels is not None:
+            self.labels.draw_centered(painter, center_x, center_y, text, font_key)
+        else:
+            painter.drawText(QRectF(center_x - 50, center_y - 10, 100, 20),
+                             Qt.AlignmentFlag.AlignCenter, text)
+
+    def draw_grid(self, painter, width: float, height: float, pattern, tick_pixels: float = 50,
+                  background: Optional[str] = None):
+        """以图案画刷一次填充方格纸背景，主网格线与坐标轴刻度对齐
+
+        Args:
+            pattern: 缓存图块的GridPattern
+            background: 方格纸的底色，为None时透明
+        """
+        scale_x, origin_x, _, origin_y = self._mapping()
+        spacing = abs(scale_x)
+        step = tick_step(spacing, tick_pixels)
+        # 间距为2×10^n时四等分，其余五等分，次网格线落在整齐的数值上
+        leading = round(step / 10 ** math.floor(math.log10(step)))
+        divisions = 4 if leading == 2 else 5
+        ratio = painter.device().devicePixelRatioF()
+        brush = pattern.brush(step * spacing, origin_x, origin_y, ratio, divisions,
+                              background=background)
+        painter.fillRect(QRectF(0, 0, width, height), brush)
+
+    def draw_axes(self, painter, width: float, height: float, color: str = "#555555",
+                  tick_pixels: float = 50):
+        """绘制坐标轴，只为设备区域内可见的区间生成刻度
+
+        Args:
+            width, height: 设备区域大小
+            color: 坐标轴颜色
+            tick_pixels: 刻度之间的目标像素距离
+        """
+        scale_x, origin_x, scale_y, origin_y = self._mapping()
+        inverse, invertible = self.transform.inverted()
+        if not invertible:
+            return
+        margin = self.AXIS_MARGIN
+        grid_rect = inverse.mapRect(QRectF(-margin, -margin, width + 2 * margin, height + 2 * margin))
+        min_x, min_y, max_x, max_y = (grid_rect.left(), grid_rect.top(),
+                                      grid_rect.right(), grid_rect.bottom())
+        step = tick_step(abs(scale_x), tick_pixels)
+        x_axis_visible = -margin <= origin_y <= height + margin
+        y_axis_visible = -margin <= origin_x <= width + margin
+
+        # 设置坐标轴样式
+        painter.setPen(self.styles.pen(color, 1))
+
+        # 绘制X轴和Y轴以及刻度线
+        axis_lines = []
+        x_ticks = y_ticks = []
+        if x_axis_visible:
+            axis_lines.append(QLineF(0, origin_y, width, origin_y))  # X轴
+            x_ticks = [i for i in range(math.ceil(min_x / step), math.floor(max_x / step) + 1) if i]
+            axis_lines += [QLineF(scale_x * i * step + origin_x, origin_y - 5,
+                                  scale_x * i * step + origin_x, origin_y + 5) for i in x_ticks]
+        if y_axis_visible:
+            axis_lines.append(QLineF(origin_x, 0, origin_x, height))  # Y轴
+            y_ticks = [i for i in range(math.ceil(min_y / step), math.floor(max_y / step) + 1) if i]
+            axis_lines += [QLineF(origin_x - 5, scale_y * i * step + origin_y,
+                                  origin_x + 5, scale_y * i * step + origin_y) for i in y_ticks]
+        painter.drawLines(axis_lines)
+
+        # 绘制刻度标签
+        font_key = self.AXIS_FONT
+        painter.setFont(self.styles.font(*font_key))
+        for i in x_ticks:
+            self._draw_label_centered(painter, scale_x * i * step + origin_x, origin_y + 17.5,
+                                      tick_label(i, step), font_key)
+        for i in y_ticks:
+            self._draw_label_centered(painter, origin_x + 20, scale_y * i * step + origin_y,
+                                      tick_label(i, step), font_key)
+
+        # 在原点绘制O标记
+        if x_axis_visible and y_axis_visible:
+            self._draw_label_centered(painter, origin_x + 17.5, origin_y + 17.5, "O", font_key)
+
+    def draw_points(self, painter, rows: List[int], dense: bool = False):
+        """绘制点（按颜色分组设置一次画笔，每个点单独drawEllipse）
+
+        逐个绘制的小椭圆走光栅化的快速路径；合并成一条大路径后抗锯齿扫描转换的
+        代价随路径规模急剧增长，反而慢一个数量级。
+        """
+        points = self.scene.points
+        colors = self.scene.colors
+        scale_x, offset_x, scale_y, offset_y = self._mapping()
+        xs, ys = points.x, points.y
+        floor = math.floor  # 向下取整到像素，与平移后的整像素滚动一致（int在负坐标处向零取整）
+        screen_points = {row: (floor(scale_x * xs[row] + offset_x), floor(scale_y * ys[row] + offset_y))
+                         for row in rows}
+
+        merge = self.LOD_POINT_MERGE
+        for color_index, bucket in sorted(points.color_buckets(rows).items()):
+            color = colors[color_index]
+            painter.setPen(self.styles.pen(color, 2))
+            painter.setBrush(self.styles.brush(color))
+            occupied = set()
+            for row in bucket:
+                x, y = screen_points[row]
+                if dense:
+                    # 同一屏幕小方格内的同色点只画一次
+                    cell = (x // merge, y // merge)
+                    if cell in occupied:
+                        continue
+                    occupied.add(cell)
+                painter.drawEllipse(QRectF(x - 5, y - 5, 10, 10))
+
+        if dense:
+            return
+
+        # 绘制点的名称标签（名称按点在场景中的序号确定）
+        font_key = self.POINT_NAME_FONT
+        painter.setPen(self.styles.pen("#000000"))
+        painter.setFont(self.styles.font(*font_key))
+        for row, (x, y) in screen_points.items():
+            point_name = 'ABCDEFGHIJKLMN'[row % 14]
+            self._draw_label_at_baseline(painter, x - 5, y - 10, point_name, font_key)
+
+    def draw_lines(self, painter, rows: List[int], dense: bool = False):
+        """绘制线段（按颜色分组，每组一次drawLines调用，或逐条填充四边形）"""
+        lines = self.scene.lines
+        colors = self.scene.colors
+        scale_x, offset_x, scale_y, offset_y = self._mapping()
+
+        x1s, y1s, x2s, y2s, labels = lines.x1, lines.y1, lines.x2, lines.y2, lines.labels
+        font_key = self.LINE_LABEL_FONT
+        painter.setFont(self.styles.font(*font_key))
+        for color_index, bucket in sorted(lines.color_buckets(rows).items()):
+            color = colors[color_index]
+            segments = [QLineF(scale_x * x1s[row] + offset_x, scale_y * y1s[row] + offset_y,
+                               scale_x * x2s[row] + offset_x, scale_y * y2s[row] + offset_y)
+                        for row in bucket]
+            if self.segment_quads:
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(self.styles.brush(color))
+                for segment in segments:
+                    painter.drawPolygon(_segment_quad(segment, 1.0))
+            painter.setPen(self.styles.pen(color, 2))  # 标签文本也用该画笔的颜色
+            if not self.segment_quads:
+                painter.drawLines(segments)
+            if dense:
+                continue
+
+            # 绘制线段长度文本
+            for row, segment in zip(bucket, segments):
+                label = labels[row]
+                if label:
+                    mid = segment.center()
+                    self._draw_label_centered(painter, mid.x(), mid.y(), label, font_key)
+
+    def draw_circles(self, painter, rows: List[int], dense: bool = False):
+        """绘制圆（按颜色分组设置一次画笔，每个圆单独drawEllipse，过小的圆退化为点）"""
+        circles = self.scene.circles
+        colors = self.scene.colors
+        scale_x, offset_x, scale_y, offset_y = self._mapping()
+        scale = abs(scale_x)
+        min_radius = self.LOD_MIN_CIRCLE_RADIUS
+        cxs, cys, radii = circles.cx, circles.cy, circles.r
+        painter.setBrush(Qt.BrushStyle.NoBrush)  # 不填充
+        for color_index, bucket in sorted(circles.color_buckets(rows).items()):
+            painter.setPen(self.styles.pen(colors[color_index], 2))
+            tiny = []
+            for row in bucket:
+                center = QPointF(scale_x * cxs[row] + offset_x, scale_y * cys[row] + offset_y)
+                screen_radius = radii[row] * scale
+                if screen_radius < min_radius:
+                    tiny.append(center)
+                else:
+                    painter.drawEllipse(center, screen_radius, screen_radius)
+            if tiny:
+                painter.setPen(self.styles.pen(colors[color_index], 2 * min_radius))
+                painter.drawPoints(QPolygonF(tiny))
+
+    def draw_polygons(self, painter, rows: List[int], dense: bool = False):
+        """绘制多边形轮廓（按颜色分组设置一次画笔，每个多边形单独drawPolygon）及边长标签"""
+        polygons = self.scene.polygons
+        colors = self.scene.colors
+        scale_x, offset_x, scale_y, offset_y = self._mapping()
+        vxs, vys, offsets, counts = polygons.vx, polygons.vy, polygons.offsets, polygons.counts
+
+        font_key = self.LINE_LABEL_FONT
+        painter.setFont(self.styles.font(*font_key))
+        painter.setBrush(Qt.BrushStyle.NoBrush)  # 不填充
+        for color_index, bucket in sorted(polygons.color_buckets(rows).items()):
+            painter.setPen(self.styles.pen(colors[color_index], 2))
+            outlines = []
+            for row in bucket:
+                start = offsets[row]
+                outline = QPolygonF([QPointF(scale_x * vxs[i] + offset_x, scale_y * vys[i] + offset_y)
+                                     for i in range(start, start + counts[row])])
+                painter.drawPolygon(outline)
+                outlines.append(outline)
+            if dense:
+                continue
+
+            # 在每条边的中点绘制边长文本
+            for row, outline in zip(bucket, outlines):
+                count = outline.size()
+                for i, label in enumerate(polygons.labels[row]):
+                    if label:
+                        mid = QLineF(outline.at(i), outline.at((i + 1) % count)).center()
+                        self._draw_label_centered(painter, mid.x(), mid.y(), label, font_key)
+
+
+def _segment_quad(segment: QLineF, half_width: float) -> QPolygonF:
+    """线段按方头线帽加宽后的四边形，与宽度为2*half_width的方头画笔描出的形状相同"""
+    x1, y1, x2, y2 = segment.x1(), segment.y1(), segment.x2(), segment.y2()
+    length = math.hypot(x2 - x1, y2 - y1)
+    if length == 0:
+        ux, uy = half_width, 0.0  # 退化为点时画一个正方形
+    else:
+        ux, uy = (x2 - x1) * half_width / length, (y2 - y1) * half_width / length
+    x1, y1, x2, y2 = x1 - ux, y1 - uy, x2 + ux, y2 + uy
+    return QPolygonF([QPointF(x1 - uy, y1 + ux), QPointF(x2 - uy, y2 + ux),
+                      QPointF(x2 + uy, y2 - ux), QPointF(x1 + uy, y1 - ux)])
+
+
+def tick_step(spacing: float, tick_pixels: float = 50) -> float:
+    """刻度间距（网格单位），取 1/2/5×10^n 中对应像素距离不小于tick_pixels的最小值"""
+    raw = tick_pixels / spacing
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5):
+        if factor * magnitude >= raw:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def tick_label(index: int, step: float) -> str:
+    """第index个刻度的标签文本，小数位数由刻度间距决定"""
+    decimals = max(0, -math.floor(math.log10(step)))
+    return f"{index * step:.{decimals}f}"
+
+
+def visible_rows(scene, transform: QTransform, width: float, height: float,
+                 margin: float = 0) -> Optional[Dict[str, List[int]]]:
+    """返回在设备区域（含外扩边距）内可见的各类图元行号"""
+    inverse, invertible = transform.inverted()
+    if not invertible:
+        return None
+    grid_rect = inverse.mapRect(QRectF(-margin, -margin, width + 2 * margin, height + 2 * margin))
+    return scene.rows_in_rect(grid_rect.left(), grid_rect.top(),
+                              grid_rect.right(), grid_rect.bottom())
+
+
+def fit_transform(scene, width: float, height: float, margin: float = 40,
+                  default_spacing: float = 50) -> QTransform:
+    """使场景包围盒居中铺满设备区域（四周保留margin像素）的网格到设备变换
+
+    空场景或退化的包围盒（单个点、水平或竖直线段）在对应方向上保持default_spacing。
+    """
+    extent = scene.extent()
+    if extent is None:
+        return QTransform(default_spacing, 0, 0, -default_spacing, width // 2, height // 2)
+    min_x, min_y, max_x, max_y = extent
+    spans = []
+    if max_x > min_x:
+        spans.append(max(1, width - 2 * margin) / (max_x - min_x))
+    if max_y > min_y:
+        spans.append(max(1, height - 2 * margin) / (max_y - min_y))
+    spacing = min(spans) if spans else default_spacing
+    # 包围盒中心对准设备中心
+    center_x = (min_x + max_x) / 2
+    center_y = (min_y + max_y) / 2
+    return QTransform(spacing, 0, 0, -spacing,
+                      width // 2 - center_x * spacing, height // 2 + center_y * spacing)
+
+
+def paint_scene(painter, scene, transform: QTransform, width: float, height: float,
+                show_axes: bool = True, axis_color: str = "#555555", tick_pixels: float = 50,
+                background: Optional[str] = "#FFFFFF", lod_density: Optional[int] = None,
+                labels=None, margin: float = 20, grid=None,
+                regions: Optional[Sequence[QRectF]] = None, segment_quads: bool = False):
+    """在painter上绘制完整场景：背景、坐标轴和与设备区域相交的已提交图元
+
+    Args:
+        width, height: 设备区域大小（逻辑像素）
+        background: 背景颜色，为None时不填充
+        lod_density: 可见图元数超过该值时进入简化模式，为None时总是完整绘制
+        margin: 可见区域向外扩展的像素，保证边缘的点标记和标签完整
+        grid: 方格纸图案（GridPattern），给出时以方格纸作为背景
+        regions: 只重绘设备区域中的这些矩形（平移后露出的条带、分条导出的一条），
+            每个矩形只取与之相交的图元；是否简化、坐标轴刻度仍按整个设备区域决定，
+            因此与整幅绘制的对应部分一致
+        segment_quads: 线段以填充的四边形绘制（见SceneRenderer），分条导出与一次性渲染
+            都打开时二者逐像素相同
+    """
+    renderer = SceneRenderer(scene, transform, labels, segment_quads=segment_quads)
+    rows = None
+    if regions is None or lod_density is not None:
+        rows = visible_rows(scene, transform, width, height, margin)
+    dense = (rows is not None and lod_density is not None and
+             sum(len(kind_rows) for kind_rows in rows.values()) > lod_density)
+    if regions is None:
+        _paint_layers(painter, renderer, width, height, show_axes, axis_color, tick_pixels,
+                      background, grid, rows, dense)
+        return
+    for region in regions:
+        # 区域坐标系下的变换，只取该区域（含外扩边距）内的图元
+        local = transform * QTransform.fromTranslate(-region.x(), -region.y())
+        region_rows = visible_rows(scene, local, region.width(), region.height(), margin)
+        painter.save()
+        painter.setClipRect(region, Qt.ClipOperation.IntersectClip)
+        _paint_layers(painter, renderer, width, height, show_axes, axis_color, tick_pixels,
+                      background, grid, region_rows, dense)
+        painter.restore()
+
+
+def _paint_layers(painter, renderer, width, height, show_axes, axis_color, tick_pixels,
+                  background, grid, rows, dense):
+    """依次绘制背景、坐标轴和给定的图元行"""
+    if grid is not None:
+        renderer.draw_grid(painter, width, height, grid, tick_pixels, background)
+    elif background is not None:
+        painter.fillRect(QRectF(0, 0, width, height), renderer.styles.brush(background))
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    if show_axes:
+        renderer.draw_axes(painter, width, height, axis_color, tick_pixels)
+    if rows is not None:
+        renderer.render(painter, rows, dense)
+
+
+def render_scene(scene, device, transform: Optional[QTransform] = None, **options):
+    """把场景绘制到任意QPaintDevice（QImage、QPdfWriter、QSvgGenerator等）上
+
+    不需要任何窗口部件；未给出变换时自动缩放到铺满设备。其余参数同paint_scene。
+    """
+    # 以逻辑像素计算区域，高分辨率图像（设备像素比大于1）由QPainter自动缩放
+    ratio = device.devicePixelRatioF()
+    width, height = device.width() / ratio, device.height() / ratio
+    if transform is None:
+        transform = fit_transform(scene, width, height)
+    painter = QPainter(device)
+    try:
+        paint_scene(painter, scene, transform, width, height, **options)
+    finally:
+        painter.end()
@@ -1,16 +1,54 @@
 """
 形状处理器基类
 """
+import time
 from abc import ABC, abstractmethod
+from enum import Enum, auto
 from typing import Optional, Dict, Any
 
+class HandlerState(Enum):
+    """处理器的交互阶段"""
+    IDLE = auto()        # 尚未确定第一个点，指针移动只报告位置
+    ANCHORED = auto()    # 已确定至少一个点，等待指针移动
+    PREVIEWING = auto()  # 预览跟随指针
+    COMMITTED = auto()   # 图形刚刚提交，下一次移动回到IDLE
+
+# 已确定至少一个点、尚未提交的阶段
+DRAWING_STATES = (HandlerState.ANCHORED, HandlerState.PREVIEWING)
+
+class StateLatency:
+    """某一阶段内事件处理耗时的统计（秒）"""
+    __slots__ = ('count', 'total', 'worst')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+    
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.worst:
+            self.worst = elapsed
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
 class ShapeHandler(ABC):
-    """形状处理器基类"""
+    """形状处理器基类
+    
+    交互阶段由state显式记录（见HandlerState）。画布在设置处理器时绑定
+    dispatch_press/dispatch_move/dispatch_release，这三个入口按事件开始时的阶段
+    统计处理耗时，可通过latency查看。
+    """
     
     def __init__(self, canvas):
         self.canvas = canvas
         self.properties_panel = None
         self.is_active = False
+        self.state = HandlerState.IDLE
+        self.latency: Dict[HandlerState, StateLatency] = {state: StateLatency() for state in HandlerState}
         
     def set_properties_panel(self, panel):
         """设置关联的属性面板"""
@@ -19,14 +57,26 @@ class ShapeHandler(ABC):
     def activate(self):
         """激活此处理器"""
         self.is_active = True
+        self.state = HandlerState.IDLE
         self._reset_canvas_state()
         self._connect_canvas_events()
         
     def deactivate(self):
         """停用此处理器"""
         self.is_active = False
+        self.state = HandlerState.IDLE
         self._disconnect_canvas_events()
     
+    @property
+    def is_drawing(self) -> bool:
+        """是否已确定至少一个点且尚未提交"""
+        return self.state in DRAWING_STATES
+    
+    def reset_latency(self):
+        """清空耗时统计"""
+        for stats in self.latency.values():
+            stats.__init__()
+    
     def _on_properties_changed(self, properties: Dict[str, Any]):
         """处理属性变化"""
         if not self.is_active:
@@ -46,6 +96,25 @@ class ShapeHandler(ABC):
         # 具体实现由子类提供
         pass
     
+    # 画布绑定的事件入口：调用对应的处理方法，并按事件开始时的阶段记录耗时
+    def dispatch_press(self, x: float, y: float):
+        state = self.state
+        start = time.perf_counter()
+        self.handle_mouse_press(x, y)
+        self.latency[state].add(time.perf_counter() - start)
+    
+    def dispatch_move(self, x: float, y: float):
+        state = self.state
+        start = time.perf_counter()
+        self.handle_mouse_move(x, y)
+        self.latency[state].add(time.perf_counter() - start)
+    
+    def dispatch_release(self, x: float, y: float):
+        state = self.state
+        start = time.perf_counter()
+        self.handle_mouse_release(x, y)
+        self.latency[state].add(time.perf_counter() - start)
+    
     # 鼠标事件处理方法 - 子类可选择实现
     def handle_mouse_press(self, x: float, y: float):
         """处理鼠标按下事件"""
@@ -5,7 +5,7 @@ from typing import Dict, Any, Optional, Tuple
 import math
 
 from modules.canvas import Canvas
-from modules.shape_handlers import ShapeHandler
+from modules.shape_handlers import ShapeHandler, HandlerState
 from modules.shapes import ShapeType
 
 class CircleHandler(ShapeHandler):
@@ -49,17 +49,11 @@ class CircleHandler(ShapeHandler):
         y = properties.get('y', 0)
         radius = properties.get('radius', 1)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        # 计算屏幕上的半径长度
-        screen_radius = radius * self.canvas.grid_spacing
-        
-        # 设置临时状态用于预览显示
+        # 设置临时状态用于预览显示（网格坐标）
         self.canvas.current_shape = "circle_preview"
-        self.canvas.line_start_point = (screen_x, screen_y)
+        self.canvas.line_start_point = (x, y)
         # 计算圆上的一个点作为临时形状
-        self.canvas.temp_shape = (screen_x + screen_radius, screen_y)
+        self.canvas.temp_shape = (x + radius, y)
         
         # 更新画布
         self.canvas.update()
@@ -74,36 +68,16 @@ class CircleHandler(ShapeHandler):
         y = properties.get('y', 0)
         radius = properties.get('radius', 1)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        # 计算屏幕上的半径长度
-        screen_radius = radius * self.canvas.grid_spacing
-        
         # 添加圆心作为一个点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.scene.add_point(x, y, self.color)
         
-        # 计算圆的周长和面积
-        circumference = 2 * math.pi * screen_radius
-        area = math.pi * (screen_radius ** 2)
-        
-        # 存储到形状属性中
-        self.canvas.shapes.append({
-            'type': 'circle',
-            'center': (screen_x, screen_y),
-            'radius': screen_radius,
-            'circumference': circumference,
-            'area': area,
-            'color': self.color
-        })
+        # 存储到场景中
+        self.canvas.scene.add_circle(x, y, radius, self.color)
         
         # 清除临时状态
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
+        self.state = HandlerState.COMMITTED
         
         # 更新画布
         self.canvas.update()
@@ -122,14 +96,14 @@ class CircleHandler(ShapeHandler):
     
     def handle_mouse_press(self, x: float, y: float):
         """处理鼠标按下事件"""
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        if not self.center_point:
-            self.center_point = (screen_x, screen_y)
+        if not self.is_drawing:
+            self.center_point = (x, y)
             self.canvas.line_start_point = self.center_point
             self.canvas.current_shape = "circle"
             self.canvas.temp_shape = None
             # 添加圆心点
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self.canvas.scene.add_point(x, y, self.color)
+            self.state = HandlerState.ANCHORED
             self.canvas.update()
         else:
             # 完成圆形绘制
@@ -137,75 +111,61 @@ class CircleHandler(ShapeHandler):
 
     def handle_mouse_move(self, x: float, y: float):
         """处理鼠标移动事件"""
-        if not self.center_point:
+        if not self.is_drawing:
             # 未点击圆心时，显示当前位置作为圆心
-            if hasattr(self.canvas, 'shape_preview'):
-                preview_data = {
-                    'type': 'circle_preview_start',
-                    'x': x, 'y': y
-                }
-                self.canvas.shape_preview.emit(preview_data)
+            self.state = HandlerState.IDLE
+            preview_data = {
+                'type': 'circle_preview_start',
+                'x': x, 'y': y
+            }
+            self.canvas.shape_preview.emit(preview_data)
             return
             
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
         # 设置临时形状
-        self.canvas.temp_shape = (screen_x, screen_y)
+        self.state = HandlerState.PREVIEWING
+        self.canvas.temp_shape = (x, y)
         
         # 发送实时圆形信息
-        if hasattr(self.canvas, 'shape_preview'):
-            center_x, center_y = self.center_point
-            grid_center_x, grid_center_y = self.canvas.screen_to_grid(center_x, center_y)
-            
-            # 计算半径
-            radius = math.sqrt((x - grid_center_x)**2 + (y - grid_center_y)**2)
-            area = math.pi * (radius ** 2)
-            
-            preview_data = {
-                'type': 'circle_preview',
-                'center_x': grid_center_x, 'center_y': grid_center_y,
-                'radius': radius,
-                'area': area
-            }
-            self.canvas.shape_preview.emit(preview_data)
+        center_x, center_y = self.center_point
         
-        self.canvas.update()
+        # 计算半径
+        radius = math.sqrt((x - center_x)**2 + (y - center_y)**2)
+        area = math.pi * (radius ** 2)
+        
+        preview_data = {
+            'type': 'circle_preview',
+            'center_x': center_x, 'center_y': center_y,
+            'radius': radius,
+            'area': area
+        }
+        self.canvas.shape_preview.emit(preview_data)
+        
+        # 只重绘预览圆（含半径标签）的新旧包围盒
+        self.canvas.update_preview(self.canvas.preview_bounds([self.center_point, (x, y)], radius))
 
     def handle_mouse_release(self, x: float, y: float):
         """处理鼠标释放事件"""
-        if not self.center_point:
+        if not self.is_drawing:
             return
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
         center_x, center_y = self.center_point
         
         # 计算半径
-        radius = math.sqrt((screen_x - center_x)**2 + (screen_y - center_y)**2)
+        real_radius = math.sqrt((x - center_x)**2 + (y - center_y)**2)
         
         # 确保圆有最小半径
-        if radius < 15:  # 最小半径15像素
+        if real_radius * self.canvas.grid_spacing < 15:  # 最小半径15像素
             return
         
-        grid_spacing = self.canvas.grid_spacing
-        real_radius = radius / grid_spacing
         circumference = 2 * math.pi * real_radius
         area = math.pi * (real_radius ** 2)
         
-        self.canvas.shapes.append({
-            'type': 'circle',
-            'center': (center_x, center_y),
-            'radius': radius,
-            'circumference': circumference * grid_spacing,
-            'area': area * (grid_spacing ** 2),
-            'color': self.color
-        })
+        self.canvas.scene.add_circle(center_x, center_y, real_radius, self.color)
         
         # 发射信号
-        grid_x, grid_y = self.canvas.screen_to_grid(center_x, center_y)
         circle_data = {
             'type': 'circle',
-            'x': grid_x,
-            'y': grid_y,
+            'x': center_x,
+            'y': center_y,
             'radius': real_radius,
             'circumference': circumference,
             'area': area,
@@ -215,6 +175,7 @@ class CircleHandler(ShapeHandler):
         
         # 清除状态
         self.center_point = None
+        self.state = HandlerState.COMMITTED
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
         self.canvas.update()
@@ -5,7 +5,7 @@ from typing import Dict, Any, Optional, Tuple
 import math
 
 from modules.canvas import Canvas
-from modules.shape_handlers import ShapeHandler
+from modules.shape_handlers import ShapeHandler, HandlerState
 from modules.shapes import ShapeType
 
 class LineHandler(ShapeHandler):
@@ -46,19 +46,15 @@ class LineHandler(ShapeHandler):
         x2 = properties.get('x2', 0)
         y2 = properties.get('y2', 0)
         
-        # 转换为屏幕坐标
-        screen_x1, screen_y1 = self.canvas.grid_to_screen(x1, y1)
-        screen_x2, screen_y2 = self.canvas.grid_to_screen(x2, y2)
-        
-        # 设置临时状态用于预览显示
+        # 设置临时状态用于预览显示（网格坐标）
         self.canvas.current_shape = "line_preview"
-        self.canvas.line_start_point = (screen_x1, screen_y1)
-        self.canvas.temp_shape = (screen_x2, screen_y2)
+        self.canvas.line_start_point = (x1, y1)
+        self.canvas.temp_shape = (x2, y2)
         
         # 添加临时端点的预览
         self.canvas.temp_endpoints = [
-            {'x': screen_x1, 'y': screen_y1, 'color': self.color, 'name': 'A'},
-            {'x': screen_x2, 'y': screen_y2, 'color': self.color, 'name': 'B'}
+            {'x': x1, 'y': y1, 'color': self.color, 'name': 'A'},
+            {'x': x2, 'y': y2, 'color': self.color, 'name': 'B'}
         ]
         
         # 更新画布
@@ -75,31 +71,21 @@ class LineHandler(ShapeHandler):
         x2 = properties.get('x2', 0)
         y2 = properties.get('y2', 0)
         
-        # 转换为屏幕坐标
-        screen_x1, screen_y1 = self.canvas.grid_to_screen(x1, y1)
-        screen_x2, screen_y2 = self.canvas.grid_to_screen(x2, y2)
-        
-        # 设置临时状态用于预览显示
-        self.canvas.line_start_point = (screen_x1, screen_y1)
-        self.canvas.temp_shape = (screen_x2, screen_y2)
+        # 设置临时状态用于预览显示（网格坐标）
+        self.canvas.line_start_point = (x1, y1)
+        self.canvas.temp_shape = (x2, y2)
         
-        # 添加临时端点的预览
-        if not hasattr(self.canvas, 'temp_endpoints'):
-            self.canvas.temp_endpoints = []
-        
-        # 清空之前的临时端点
+        # 添加临时端点的预览（先清空之前的临时端点）
         self.canvas.temp_endpoints = []
-        
-        # 添加两个端点作为临时点
         self.canvas.temp_endpoints.append({
-            'x': screen_x1, 
-            'y': screen_y1, 
+            'x': x1, 
+            'y': y1, 
             'color': "#0277BD", 
             'name': 'A'
         })
         self.canvas.temp_endpoints.append({
-            'x': screen_x2, 
-            'y': screen_y2, 
+            'x': x2, 
+            'y': y2, 
             'color': "#0277BD", 
             'name': 'B'
         })
@@ -118,32 +104,20 @@ class LineHandler(ShapeHandler):
         x2 = properties.get('x2', 0)
         y2 = properties.get('y2', 0)
         
-        # 转换为屏幕坐标
-        screen_x1, screen_y1 = self.canvas.grid_to_screen(x1, y1)
-        screen_x2, screen_y2 = self.canvas.grid_to_screen(x2, y2)
-        
         # 添加起点和终点
-        self.canvas.points.append({'x': screen_x1, 'y': screen_y1, 'color': "#0277BD"})
-        self.canvas.points.append({'x': screen_x2, 'y': screen_y2, 'color': "#0277BD"})
+        self.canvas.scene.add_point(x1, y1, "#0277BD")
+        self.canvas.scene.add_point(x2, y2, "#0277BD")
         
         # 计算线段长度
-        length = math.sqrt((screen_x2 - screen_x1) ** 2 + (screen_y2 - screen_y1) ** 2)
-        real_length = length / self.canvas.grid_spacing
+        real_length = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
         length_text = f"{real_length:.1f}"
         
-        # 添加线段
-        self.canvas.lines.append({
-            'x1': screen_x1, 'y1': screen_y1,
-            'x2': screen_x2, 'y2': screen_y2,
-            'color': "#0277BD"
-        })
-        
-        # 添加长度文本
-        self.canvas.line_texts.append(length_text)
+        # 添加线段及其长度文本
+        self.canvas.scene.add_line(x1, y1, x2, y2, "#0277BD", length_text)
         
         # 清除临时端点
-        if hasattr(self.canvas, 'temp_endpoints'):
-            self.canvas.temp_endpoints = []
+        self.canvas.temp_endpoints = []
+        self.state = HandlerState.COMMITTED
         
         # 更新画布
         self.canvas.update()
@@ -164,9 +138,7 @@ class LineHandler(ShapeHandler):
             'angle': angle_deg
         }
         
-        # 如果Canvas有shape_created信号，则发射
-        if hasattr(self.canvas, 'shape_created'):
-            self.canvas.shape_created.emit(shape_data)
+        self.canvas.shape_created.emit(shape_data)
     
     def deactivate(self):
         """停用线段处理器"""
@@ -174,8 +146,7 @@ class LineHandler(ShapeHandler):
         # 清除Canvas相关状态
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
-        if hasattr(self.canvas, 'temp_endpoints'):
-            self.canvas.temp_endpoints = []
+        self.canvas.temp_endpoints = []
     
     def _connect_canvas_events(self):
         """连接画布事件"""
@@ -189,20 +160,15 @@ class LineHandler(ShapeHandler):
 
     def handle_mouse_press(self, x: float, y: float):
         """处理鼠标按下事件"""
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        if not self.start_point:
+        if not self.is_drawing:
             # 设置线段起点
-            self.start_point = (screen_x, screen_y)
+            self.start_point = (x, y)
             self.canvas.line_start_point = self.start_point
             self.canvas.current_shape = "line"
             
             # 添加起点
-            self.canvas.points.append({
-                'x': screen_x,
-                'y': screen_y,
-                'color': self.color
-            })
+            self.canvas.scene.add_point(x, y, self.color)
+            self.state = HandlerState.ANCHORED
             self.canvas.update()
         else:
             # 完成线段绘制
@@ -211,78 +177,64 @@ class LineHandler(ShapeHandler):
     def handle_mouse_move(self, x: float, y: float):
         """处理鼠标移动事件"""
         # 发送实时线段信息信号
-        if hasattr(self.canvas, 'shape_preview'):
-            if not self.start_point:
-                # 未点击第一点时，显示当前位置作为起点
-                preview_data = {
-                    'type': 'line_preview_start',
-                    'x1': x, 'y1': y
-                }
-                self.canvas.shape_preview.emit(preview_data)
-            else:
-                # 已点击第一点，显示完整线段信息
-                screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-                self.canvas.temp_shape = (screen_x, screen_y)
-                
-                x1, y1 = self.start_point
-                grid_x1, grid_y1 = self.canvas.screen_to_grid(x1, y1)
-                grid_x2, grid_y2 = x, y
-                
-                # 计算实时长度
-                length = math.sqrt((grid_x2 - grid_x1)**2 + (grid_y2 - grid_y1)**2)
-                
-                # 计算实时角度
-                angle_rad = math.atan2(grid_y2 - grid_y1, grid_x2 - grid_x1)
-                angle_deg = (angle_rad * 180 / math.pi) % 360
-                
-                preview_data = {
-                    'type': 'line_preview',
-                    'x1': grid_x1, 'y1': grid_y1,
-                    'x2': grid_x2, 'y2': grid_y2,
-                    'length': length,
-                    'angle': angle_deg
-                }
-                self.canvas.shape_preview.emit(preview_data)
-                
-                self.canvas.update()
+        if not self.is_drawing:
+            # 未点击第一点时，显示当前位置作为起点
+            self.state = HandlerState.IDLE
+            preview_data = {
+                'type': 'line_preview_start',
+                'x1': x, 'y1': y
+            }
+            self.canvas.shape_preview.emit(preview_data)
+            return
+        
+        # 已点击第一点，显示完整线段信息
+        self.state = HandlerState.PREVIEWING
+        self.canvas.temp_shape = (x, y)
+        
+        grid_x1, grid_y1 = self.start_point
+        grid_x2, grid_y2 = x, y
+        
+        # 计算实时长度
+        length = math.sqrt((grid_x2 - grid_x1)**2 + (grid_y2 - grid_y1)**2)
+        
+        # 计算实时角度
+        angle_rad = math.atan2(grid_y2 - grid_y1, grid_x2 - grid_x1)
+        angle_deg = (angle_rad * 180 / math.pi) % 360
+        
+        preview_data = {
+            'type': 'line_preview',
+            'x1': grid_x1, 'y1': grid_y1,
+            'x2': grid_x2, 'y2': grid_y2,
+            'length': length,
+            'angle': angle_deg
+        }
+        self.canvas.shape_preview.emit(preview_data)
+        
+        # 只重绘预览线段的新旧包围盒
+        self.canvas.update_preview(self.canvas.preview_bounds([self.start_point, (x, y)]))
 
     def handle_mouse_release(self, x: float, y: float):
         """处理鼠标释放事件"""
-        if not self.start_point:
+        if not self.is_drawing:
             return
             
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        x1, y1 = self.start_point
+        grid_x1, grid_y1 = self.start_point
+        grid_x2, grid_y2 = x, y
+        
+        # 计算长度
+        real_length = math.sqrt((grid_x2 - grid_x1)**2 + (grid_y2 - grid_y1)**2)
         
-        # 检查最小长度
-        if math.sqrt((screen_x - x1)**2 + (screen_y - y1)**2) < 10:
+        # 检查最小长度（10像素）
+        if real_length * self.canvas.grid_spacing < 10:
             return
         
         # 添加终点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
-        
-        # 计算长度
-        length = math.sqrt((screen_x - x1)**2 + (screen_y - y1)**2)
-        real_length = length / self.canvas.grid_spacing
+        self.canvas.scene.add_point(grid_x2, grid_y2, self.color)
         
-        # 添加线段
-        self.canvas.lines.append({
-            'x1': x1, 'y1': y1,
-            'x2': screen_x, 'y2': screen_y,
-            'color': self.color
-        })
-        
-        # 添加长度文本
-        self.canvas.line_texts.append(f"{real_length:.1f}")
+        # 添加线段及其长度文本
+        self.canvas.scene.add_line(grid_x1, grid_y1, grid_x2, grid_y2, self.color, f"{real_length:.1f}")
         
         # 发送线段创建信号
-        grid_x1, grid_y1 = self.canvas.screen_to_grid(x1, y1)
-        grid_x2, grid_y2 = self.canvas.screen_to_grid(screen_x, screen_y)
-        
         angle_rad = math.atan2(grid_y2 - grid_y1, grid_x2 - grid_x1)
         angle_deg = (angle_rad * 180 / math.pi) % 360
         
@@ -298,6 +250,7 @@ class LineHandler(ShapeHandler):
         
         # 清除临时状态
         self.start_point = None
+        self.state = HandlerState.COMMITTED
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
         self.canvas.update()
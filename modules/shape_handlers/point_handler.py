@@ -4,7 +4,7 @@
 from typing import Dict, Any
 
 from modules.shapes import ShapeType
-from modules.shape_handlers import ShapeHandler
+from modules.shape_handlers import ShapeHandler, HandlerState
 
 class PointHandler(ShapeHandler):
     """处理点相关操作的类"""
@@ -48,11 +48,8 @@ class PointHandler(ShapeHandler):
         x = properties.get('x', 0)
         y = properties.get('y', 0)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        # 设置临时点
-        self.canvas.temp_point = (screen_x, screen_y)
+        # 设置临时点（网格坐标）
+        self.canvas.temp_point = (x, y)
         
         # 更新画布
         self.canvas.update()
@@ -66,18 +63,12 @@ class PointHandler(ShapeHandler):
         x = properties.get('x', 0)
         y = properties.get('y', 0)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
         # 添加点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        self.canvas.scene.add_point(x, y, self.color)
         
         # 清除临时点
         self.canvas.temp_point = None
+        self.state = HandlerState.COMMITTED
         
         # 更新画布
         self.canvas.update()
@@ -88,15 +79,9 @@ class PointHandler(ShapeHandler):
     
     def handle_mouse_press(self, x: float, y: float):
         """处理鼠标按下事件"""
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        # 添加点
-        self.canvas.points.append({
-            'x': screen_x,
-            'y': screen_y,
-            'color': self.color
-        })
+        # 点一次点击即提交
+        self.canvas.scene.add_point(x, y, self.color)
+        self.state = HandlerState.COMMITTED
         
         # 更新画布
         self.canvas.update()
@@ -107,8 +92,8 @@ class PointHandler(ShapeHandler):
     
     def handle_mouse_move(self, x: float, y: float):
         """处理鼠标移动事件"""
-        # 在点处理器中通常不需要特殊处理鼠标移动
-        pass
+        # 点没有预览，提交后的移动回到空闲阶段
+        self.state = HandlerState.IDLE
     
     def handle_mouse_release(self, x: float, y: float):
         """处理鼠标释放事件"""
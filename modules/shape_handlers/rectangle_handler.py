@@ -5,7 +5,7 @@ from typing import Dict, Any, Optional, Tuple
 import math
 
 from modules.canvas import Canvas
-from modules.shape_handlers import ShapeHandler
+from modules.shape_handlers import ShapeHandler, HandlerState
 from modules.shapes import ShapeType
 
 class RectangleHandler(ShapeHandler):
@@ -16,6 +16,7 @@ class RectangleHandler(ShapeHandler):
         self._shape_type = ShapeType.RECTANGLE
         self.color = "#1A237E"  # 深蓝色
         self.start_point = None
+        self._start_point_id = None  # 起点预览点在场景中的ID
     
     @property
     def shape_type(self):
@@ -28,6 +29,7 @@ class RectangleHandler(ShapeHandler):
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
         self.start_point = None
+        self._start_point_id = None
     
     def _connect_canvas_events(self):
         """连接画布事件"""
@@ -50,17 +52,10 @@ class RectangleHandler(ShapeHandler):
         width = properties.get('length', 2)
         height = properties.get('width', 1)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
-        # 计算矩形的另一个角点
-        screen_w = width * self.canvas.grid_spacing
-        screen_h = height * self.canvas.grid_spacing
-        
-        # 设置临时状态用于预览显示
+        # 设置临时状态用于预览显示（(x, y)为左上角，网格Y轴向上）
         self.canvas.current_shape = "rectangle_preview"
-        self.canvas.line_start_point = (screen_x, screen_y)
-        self.canvas.temp_shape = (screen_x + screen_w, screen_y + screen_h)
+        self.canvas.line_start_point = (x, y)
+        self.canvas.temp_shape = (x + width, y - height)
         
         # 更新画布
         self.canvas.update()
@@ -76,54 +71,31 @@ class RectangleHandler(ShapeHandler):
         width = properties.get('length', 2)
         height = properties.get('width', 1)
         
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
+        # 计算矩形的四个顶点（网格Y轴向上）
+        x1, y1 = x, y  # 左上角
+        x2, y2 = x + width, y  # 右上角
+        x3, y3 = x + width, y - height  # 右下角
+        x4, y4 = x, y - height  # 左下角
         
-        # 计算矩形的四个顶点
-        screen_w = width * self.canvas.grid_spacing
-        screen_h = height * self.canvas.grid_spacing
-        
-        x1, y1 = screen_x, screen_y  # 左上角
-        x2, y2 = screen_x + screen_w, screen_y  # 右上角
-        x3, y3 = screen_x + screen_w, screen_y + screen_h  # 右下角
-        x4, y4 = screen_x, screen_y + screen_h  # 左下角
+        scene = self.canvas.scene
+        vertices = [(x1, y1), (x2, y2), (x3, y3), (x4, y4)]
+        side_texts = [f"{width:.1f}", f"{height:.1f}", f"{width:.1f}", f"{height:.1f}"]
         
         # 添加四个顶点
-        self.canvas.points.append({'x': x1, 'y': y1, 'color': self.color})
-        self.canvas.points.append({'x': x2, 'y': y2, 'color': self.color})
-        self.canvas.points.append({'x': x3, 'y': y3, 'color': self.color})
-        self.canvas.points.append({'x': x4, 'y': y4, 'color': self.color})
-        
-        # 添加四条边
-        self.canvas.lines.append({'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2, 'color': self.color})
-        self.canvas.lines.append({'x1': x2, 'y1': y2, 'x2': x3, 'y2': y3, 'color': self.color})
-        self.canvas.lines.append({'x1': x3, 'y1': y3, 'x2': x4, 'y2': y4, 'color': self.color})
-        self.canvas.lines.append({'x1': x4, 'y1': y4, 'x2': x1, 'y2': y1, 'color': self.color})
+        for vx, vy in vertices:
+            scene.add_point(vx, vy, self.color)
         
-        # 添加边长文本
-        self.canvas.line_texts.append(f"{width:.1f}")
-        self.canvas.line_texts.append(f"{height:.1f}")
-        self.canvas.line_texts.append(f"{width:.1f}")
-        self.canvas.line_texts.append(f"{height:.1f}")
+        # 矩形作为一个多边形提交，四条边的边长文本随多边形保存
+        scene.add_polygon(vertices, self.color, side_texts)
         
         # 计算面积和周长
         area = width * height
         perimeter = 2 * (width + height)
         
-        # 添加形状信息
-        self.canvas.shapes.append({
-            'type': 'rectangle',
-            'vertices': [(x1, y1), (x2, y2), (x3, y3), (x4, y4)],
-            'width': screen_w,
-            'height': screen_h,
-            'area': area * (self.canvas.grid_spacing ** 2),
-            'perimeter': perimeter * self.canvas.grid_spacing,
-            'color': self.color
-        })
-        
         # 清除临时状态
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
+        self.state = HandlerState.COMMITTED
         
         # 更新画布
         self.canvas.update()
@@ -143,14 +115,14 @@ class RectangleHandler(ShapeHandler):
     
     def handle_mouse_press(self, x: float, y: float):
         """处理鼠标按下事件"""
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        if not self.start_point:
-            self.start_point = (screen_x, screen_y)
+        if not self.is_drawing:
+            self.start_point = (x, y)
             self.canvas.line_start_point = self.start_point
             self.canvas.current_shape = "rectangle"
             self.canvas.temp_shape = None
             # 只在起点添加一个点，用于预览
-            self.canvas.points.append({'x': screen_x, 'y': screen_y, 'color': self.color})
+            self._start_point_id = self.canvas.scene.add_point(x, y, self.color)
+            self.state = HandlerState.ANCHORED
             self.canvas.update()
         else:
             # 完成矩形绘制
@@ -158,116 +130,91 @@ class RectangleHandler(ShapeHandler):
 
     def handle_mouse_move(self, x: float, y: float):
         """处理鼠标移动事件"""
-        if not self.start_point:
+        if not self.is_drawing:
             # 未点击第一点时，显示当前位置作为起点
-            if hasattr(self.canvas, 'shape_preview'):
-                preview_data = {
-                    'type': 'rectangle_preview_start',
-                    'x': x, 'y': y
-                }
-                self.canvas.shape_preview.emit(preview_data)
+            self.state = HandlerState.IDLE
+            preview_data = {
+                'type': 'rectangle_preview_start',
+                'x': x, 'y': y
+            }
+            self.canvas.shape_preview.emit(preview_data)
             return
             
-        # 转换为屏幕坐标
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
-        
         # 设置临时形状
-        self.canvas.temp_shape = (screen_x, screen_y)
+        self.state = HandlerState.PREVIEWING
+        self.canvas.temp_shape = (x, y)
         
         # 发送实时矩形信息
-        if hasattr(self.canvas, 'shape_preview'):
-            x1, y1 = self.start_point
-            grid_x1, grid_y1 = self.canvas.screen_to_grid(x1, y1)
-            
-            # 计算宽度和高度
-            width = abs(x - grid_x1)
-            height = abs(y - grid_y1)
-            area = width * height
-            
-            preview_data = {
-                'type': 'rectangle_preview',
-                'x1': grid_x1, 'y1': grid_y1,
-                'x2': x, 'y2': y,
-                'width': width,
-                'height': height,
-                'area': area
-            }
-            self.canvas.shape_preview.emit(preview_data)
+        grid_x1, grid_y1 = self.start_point
         
-        self.canvas.update()
+        # 计算宽度和高度
+        width = abs(x - grid_x1)
+        height = abs(y - grid_y1)
+        area = width * height
+        
+        preview_data = {
+            'type': 'rectangle_preview',
+            'x1': grid_x1, 'y1': grid_y1,
+            'x2': x, 'y2': y,
+            'width': width,
+            'height': height,
+            'area': area
+        }
+        self.canvas.shape_preview.emit(preview_data)
+        
+        # 只重绘预览矩形的新旧包围盒
+        self.canvas.update_preview(self.canvas.preview_bounds([self.start_point, (x, y)]))
 
     def handle_mouse_release(self, x: float, y: float):
         """处理鼠标释放事件"""
-        if not self.start_point:
+        if not self.is_drawing:
             return
-        screen_x, screen_y = self.canvas.grid_to_screen(x, y)
         x1, y1 = self.start_point
         
-        # 确保矩形有最小尺寸
-        if abs(screen_x - x1) < 10 or abs(screen_y - y1) < 10:
+        # 确保矩形有最小尺寸（10像素）
+        min_size = 10 / self.canvas.grid_spacing
+        if abs(x - x1) < min_size or abs(y - y1) < min_size:
             return
         
-        # 计算四个顶点（确保顺序正确）
-        min_x, max_x = min(x1, screen_x), max(x1, screen_x)
-        min_y, max_y = min(y1, screen_y), max(y1, screen_y)
+        # 计算四个顶点（确保顺序正确，网格Y轴向上）
+        min_x, max_x = min(x1, x), max(x1, x)
+        min_y, max_y = min(y1, y), max(y1, y)
         
         vertices = [
-            (min_x, min_y),  # 左上
-            (max_x, min_y),  # 右上
-            (max_x, max_y),  # 右下
-            (min_x, max_y)   # 左下
+            (min_x, max_y),  # 左上
+            (max_x, max_y),  # 右上
+            (max_x, min_y),  # 右下
+            (min_x, min_y)   # 左下
         ]
         
+        scene = self.canvas.scene
+        
         # 移除原来的起点，添加四个顶点
-        if self.canvas.points and self.canvas.points[-1]['x'] == x1 and self.canvas.points[-1]['y'] == y1:
-            self.canvas.points.pop()
+        if self._start_point_id is not None:
+            scene.remove(self._start_point_id)
+            self._start_point_id = None
         
         for vx, vy in vertices:
-            self.canvas.points.append({'x': vx, 'y': vy, 'color': self.color})
-        
-        # 添加四条边
-        for i in range(4):
-            x1_line, y1_line = vertices[i]
-            x2_line, y2_line = vertices[(i + 1) % 4]
-            self.canvas.lines.append({
-                'x1': x1_line, 'y1': y1_line, 
-                'x2': x2_line, 'y2': y2_line, 
-                'color': self.color
-            })
+            scene.add_point(vx, vy, self.color)
         
         # 计算长宽
-        grid_spacing = self.canvas.grid_spacing
-        real_width = (max_x - min_x) / grid_spacing
-        real_height = (max_y - min_y) / grid_spacing
+        real_width = max_x - min_x
+        real_height = max_y - min_y
         
-        # 添加边长文本
-        self.canvas.line_texts.extend([
-            f"{real_width:.1f}",   # 上边
-            f"{real_height:.1f}",  # 右边
-            f"{real_width:.1f}",   # 下边
-            f"{real_height:.1f}"   # 左边
-        ])
+        # 矩形作为一个多边形提交，边长文本依次对应上、右、下、左四条边
+        side_texts = [f"{real_width:.1f}", f"{real_height:.1f}",
+                      f"{real_width:.1f}", f"{real_height:.1f}"]
+        scene.add_polygon(vertices, self.color, side_texts)
         
         # 计算面积和周长
         area = real_width * real_height
         perimeter = 2 * (real_width + real_height)
         
-        self.canvas.shapes.append({
-            'type': 'rectangle',
-            'vertices': vertices,
-            'width': max_x - min_x,
-            'height': max_y - min_y,
-            'area': area,
-            'perimeter': perimeter,
-            'color': self.color
-        })
-        
         # 发射信号
-        grid_x1, grid_y1 = self.canvas.screen_to_grid(min_x, min_y)
         rectangle_data = {
             'type': 'rectangle',
-            'x': grid_x1,
-            'y': grid_y1,
+            'x': min_x,
+            'y': max_y,
             'length': real_width,
             'width': real_height,
             'area': area,
@@ -278,6 +225,7 @@ class RectangleHandler(ShapeHandler):
         
         # 清除状态
         self.start_point = None
+        self.state = HandlerState.COMMITTED
         self.canvas.line_start_point = None
         self.canvas.temp_shape = None
         self.canvas.update()
@@ -290,6 +238,7 @@ class RectangleHandler(ShapeHandler):
         self.canvas.temp_shape = None
         self.canvas.current_shape = None
         self.start_point = None
+        self._start_point_id = None
     
     def activate(self):
         """激活矩形处理器"""
@@ -0,0 +1,139 @@
+"""
+形状绘制注册表，按形状类型查找已提交图形和实时预览的绘制函数
+
+已提交的图形由SceneRenderer按场景中的图元类型批量绘制，注册表为每种形状记下它提交后的
+图元类型和SceneRenderer中对应的绘制方法名；SceneRenderer的绘制顺序表也由本注册表生成，
+两者只有这一张分派表。本模块不导入SceneRenderer，无界面的场景绘制也可以使用。
+"""
+import math
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from PyQt6.QtCore import Qt, QLineF, QPointF, QRectF
+from PyQt6.QtGui import QPolygonF
+
+from modules.render_cache import STYLES
+from modules.shapes import ShapeType
+
+# 屏幕坐标点
+ScreenPoint = Tuple[float, float]
+
+# 预览绘制函数 (painter, 已确定的顶点, 当前指针位置, 网格间距)，坐标均为屏幕坐标
+PreviewRenderer = Callable[[object, List[ScreenPoint], ScreenPoint, float], None]
+
+# 预览的线条和标签样式
+PREVIEW_COLOR = "#999999"
+PREVIEW_EDGE_COLOR = "#666666"
+PREVIEW_LABEL_COLOR = "#333333"
+PREVIEW_FONT = ("Arial", 9)
+
+
+def _set_preview_pen(painter):
+    painter.setPen(STYLES.pen(PREVIEW_COLOR, 1, Qt.PenStyle.DashLine))
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+
+
+def _set_label_pen(painter):
+    painter.setPen(STYLES.pen(PREVIEW_LABEL_COLOR, 1))
+    painter.setFont(STYLES.font(*PREVIEW_FONT))
+
+
+def _draw_length_label(painter, start: ScreenPoint, end: ScreenPoint, spacing: float,
+                       prefix: str = ""):
+    """在线段中点右上方标注其网格长度"""
+    length = math.hypot(end[0] - start[0], end[1] - start[1]) / spacing
+    mid_x = (start[0] + end[0]) / 2
+    mid_y = (start[1] + end[1]) / 2
+    painter.drawText(QPointF(mid_x + 5, mid_y - 5), f"{prefix}{length:.1f}")
+
+
+def draw_segment_preview(painter, anchors: List[ScreenPoint], current: ScreenPoint, spacing: float):
+    """线段预览：起点到指针的虚线"""
+    _set_preview_pen(painter)
+    painter.drawLine(QLineF(*anchors[0], *current))
+
+
+def draw_rectangle_preview(painter, anchors: List[ScreenPoint], current: ScreenPoint, spacing: float):
+    """矩形预览：对角两点确定的虚线矩形，上边标注宽度，左边标注高度"""
+    rect = QRectF(QPointF(*anchors[0]), QPointF(*current)).normalized()
+    _set_preview_pen(painter)
+    painter.drawRect(rect)
+
+    _set_label_pen(painter)
+    painter.drawText(QPointF(rect.center().x() - 15, rect.top() - 5),
+                     f"{rect.width() / spacing:.1f}")
+    painter.drawText(QPointF(rect.left() - 25, rect.center().y() + 5),
+                     f"{rect.height() / spacing:.1f}")
+
+
+def draw_circle_preview(painter, anchors: List[ScreenPoint], current: ScreenPoint, spacing: float):
+    """圆预览：虚线圆和半径线，半径线中点标注半径"""
+    center = anchors[0]
+    radius = math.hypot(current[0] - center[0], current[1] - center[1])
+    _set_preview_pen(painter)
+    painter.drawEllipse(QPointF(*center), radius, radius)
+    painter.drawLine(QLineF(*center, *current))
+
+    _set_label_pen(painter)
+    _draw_length_label(painter, center, current, spacing, "r=")
+
+
+def draw_triangle_preview(painter, anchors: List[ScreenPoint], current: ScreenPoint, spacing: float):
+    """三角形预览：已确定的边为实线，连接指针的两条边为虚线，每条边标注长度"""
+    if len(anchors) < 2:
+        draw_segment_preview(painter, anchors, current, spacing)
+        _set_label_pen(painter)
+        _draw_length_label(painter, anchors[0], current, spacing)
+        return
+
+    first, second = anchors[0], anchors[1]
+    painter.setPen(STYLES.pen(PREVIEW_EDGE_COLOR, 2))
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    painter.drawLine(QLineF(*first, *second))
+
+    # 三个顶点作为一个开放折线一次提交
+    _set_preview_pen(painter)
+    painter.drawPolyline(QPolygonF([QPointF(*second), QPointF(*current), QPointF(*first)]))
+
+    _set_label_pen(painter)
+    for start, end in ((first, second), (second, current), (current, first)):
+        _draw_length_label(painter, start, end, spacing)
+
+
+class ShapeRenderer(NamedTuple):
+    """一种形状的绘制方式"""
+    kind: str                  # 提交后在场景中的图元类型
+    draw: str                  # SceneRenderer中批量绘制该类图元的方法名
+    preview: PreviewRenderer   # 创建过程中的预览绘制函数
+
+
+class ShapeRendererRegistry:
+    """形状绘制注册表
+
+    矩形和三角形都以多边形提交，共用同一个绘制方法。
+    """
+
+    _renderers: Dict[ShapeType, ShapeRenderer] = {
+        ShapeType.POINT: ShapeRenderer('point', 'draw_points', draw_segment_preview),
+        ShapeType.LINE: ShapeRenderer('line', 'draw_lines', draw_segment_preview),
+        ShapeType.RECTANGLE: ShapeRenderer('polygon', 'draw_polygons', draw_rectangle_preview),
+        ShapeType.CIRCLE: ShapeRenderer('circle', 'draw_circles', draw_circle_preview),
+        ShapeType.TRIANGLE: ShapeRenderer('polygon', 'draw_polygons', draw_triangle_preview),
+    }
+
+    # 已提交图元的绘制顺序：多边形在最下层，顶点标记盖在轮廓之上
+    KIND_ORDER = ('polygon', 'point', 'line', 'circle')
+
+    @classmethod
+    def preview_for(cls, shape_type) -> PreviewRenderer:
+        """返回形状类型对应的预览绘制函数，没有处理器或未注册的类型使用线段预览"""
+        renderer = cls._renderers.get(shape_type)
+        return renderer.preview if renderer is not None else draw_segment_preview
+
+    @classmethod
+    def kind_renderers(cls) -> Tuple[Tuple[str, str], ...]:
+        """按绘制顺序返回已提交图元的 (图元类型, SceneRenderer方法名)"""
+        methods: Dict[str, str] = {}
+        for renderer in cls._renderers.values():
+            if methods.setdefault(renderer.kind, renderer.draw) != renderer.draw:
+                raise ValueError(f"图元类型 {renderer.kind} 注册了不同的绘制方法")
+        return tuple((kind, methods[kind]) for kind in cls.KIND_ORDER if kind in methods)
@@ -1,8 +1,19 @@
 """
 形状模块，定义了基本的几何形状类型和类。
+
+点、线段、矩形、圆和三角形是不可变的值类型：没有实例字典（__slots__），
+构造后不能修改，边长、周长、面积、包围盒、角度等派生量在首次访问时计算并缓存，
+之后的读取不再重复计算。坐标为网格坐标，Y轴向上。
 """
+import math
+from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import Tuple, List, Optional, Dict, Any
+from typing import Tuple, List, Dict, Any
+
+from modules.predicates import point_in_triangle, segments_intersect, triangle_area
+
+# 包围盒 (min_x, min_y, max_x, max_y)
+Bounds = Tuple[float, float, float, float]
 
 class ShapeType(Enum):
     """形状类型枚举"""
@@ -12,31 +23,97 @@ class ShapeType(Enum):
     CIRCLE = auto()
     TRIANGLE = auto()
 
-class Point:
+class _ValueType:
+    """不可变值类型基类
+
+    子类在_fields中列出构造字段，在__slots__中另外声明以下划线开头的缓存槽位；
+    缓存槽位在构造时置为None，由_cached在首次访问时填充。
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def _init(self, *values):
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+        for name in self.__slots__:
+            if name.startswith('_'):
+                object.__setattr__(self, name, None)
+
+    def _cached(self, name: str, compute):
+        """返回缓存槽位中的值，首次访问时计算"""
+        value = getattr(self, name)
+        if value is None:
+            value = compute()
+            object.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 是不可变类型，不能修改属性 {name}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 是不可变类型，不能删除属性 {name}")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def replace(self, **changes) -> '_ValueType':
+        """返回修改了部分字段的新实例"""
+        values = {name: getattr(self, name) for name in self._fields}
+        values.update(changes)
+        return type(self)(**values)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__,) + self._values())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return type(self), self._values()
+
+class Point(_ValueType):
     """表示二维平面上的一个点"""
+    __slots__ = ('x', 'y', 'color', 'name')
+    _fields = ('x', 'y', 'color', 'name')
+
     def __init__(self, x: float, y: float, color: str = "#000000", name: str = ""):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.name = name
-    
+        self._init(x, y, color, name)
+
     def to_screen(self, center_x: float, center_y: float, grid_spacing: float) -> Tuple[float, float]:
         """转换为屏幕坐标"""
         screen_x = center_x + self.x * grid_spacing
         screen_y = center_y - self.y * grid_spacing  # 反转Y轴，符合数学坐标系
         return screen_x, screen_y
-    
+
     @staticmethod
     def from_screen(screen_x: float, screen_y: float, center_x: float, center_y: float, grid_spacing: float) -> 'Point':
         """从屏幕坐标创建点"""
         x = (screen_x - center_x) / grid_spacing
         y = (center_y - screen_y) / grid_spacing  # 反转Y轴，符合数学坐标系
         return Point(x, y)
-    
+
     def distance_to(self, other: 'Point') -> float:
         """计算到另一个点的距离"""
-        return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
-    
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+    def angle_to(self, other: 'Point') -> float:
+        """计算到另一个点的角度（弧度）"""
+        return math.atan2(other.y - self.y, other.x - self.x)
+
+    def angle_to_degrees(self, other: 'Point') -> float:
+        """计算到另一个点的角度（度数，0-360°）"""
+        return math.degrees(self.angle_to(other)) % 360
+
+    def midpoint(self, other: 'Point') -> 'Point':
+        """计算与另一个点的中点"""
+        return Point((self.x + other.x) / 2, (self.y + other.y) / 2, self.color)
+
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典表示"""
         return {
@@ -45,3 +122,193 @@ class Point:
             'color': self.color,
             'name': self.name
         }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'Point':
+        """从字典创建点"""
+        return Point(
+            x=data.get('x', 0.0),
+            y=data.get('y', 0.0),
+            color=data.get('color', "#000000"),
+            name=data.get('name', "")
+        )
+
+def _bounds_of(points) -> Bounds:
+    xs = [point.x for point in points]
+    ys = [point.y for point in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+class Line(_ValueType):
+    """线段"""
+    __slots__ = ('start', 'end', 'color', '_length', '_angle', '_bounds')
+    _fields = ('start', 'end', 'color')
+
+    def __init__(self, start: Point, end: Point, color: str = "#0277BD"):
+        self._init(start, end, color)
+
+    @property
+    def length(self) -> float:
+        """线段长度"""
+        return self._cached('_length', lambda: self.start.distance_to(self.end))
+
+    @property
+    def angle(self) -> float:
+        """线段角度（度数，0-360°）"""
+        return self._cached('_angle', lambda: self.start.angle_to_degrees(self.end))
+
+    @property
+    def bounds(self) -> Bounds:
+        """包围盒"""
+        return self._cached('_bounds', lambda: _bounds_of((self.start, self.end)))
+
+    def intersects(self, other: 'Line') -> bool:
+        """是否与另一条线段相交（端点接触和共线重叠也算相交）"""
+        return segments_intersect((self.start.x, self.start.y), (self.end.x, self.end.y),
+                                  (other.start.x, other.start.y), (other.end.x, other.end.y))
+
+class Rectangle(_ValueType):
+    """轴对齐矩形，top_left为左上角（网格Y轴向上，其余顶点在其下方）"""
+    __slots__ = ('top_left', 'width', 'height', 'color', '_vertices', '_perimeter', '_area', '_bounds')
+    _fields = ('top_left', 'width', 'height', 'color')
+
+    def __init__(self, top_left: Point, width: float, height: float, color: str = "#1A237E"):
+        self._init(top_left, width, height, color)
+
+    @property
+    def vertices(self) -> Tuple[Point, Point, Point, Point]:
+        """四个顶点：左上、右上、右下、左下"""
+        def compute():
+            x, y, color = self.top_left.x, self.top_left.y, self.color
+            right, bottom = x + self.width, y - self.height
+            return (self.top_left, Point(right, y, color),
+                    Point(right, bottom, color), Point(x, bottom, color))
+        return self._cached('_vertices', compute)
+
+    @property
+    def top_right(self) -> Point:
+        return self.vertices[1]
+
+    @property
+    def bottom_right(self) -> Point:
+        return self.vertices[2]
+
+    @property
+    def bottom_left(self) -> Point:
+        return self.vertices[3]
+
+    @property
+    def perimeter(self) -> float:
+        """周长"""
+        return self._cached('_perimeter', lambda: 2 * (self.width + self.height))
+
+    @property
+    def area(self) -> float:
+        """面积"""
+        return self._cached('_area', lambda: self.width * self.height)
+
+    @property
+    def bounds(self) -> Bounds:
+        """包围盒"""
+        return self._cached('_bounds', lambda: _bounds_of(self.vertices))
+
+class Circle(_ValueType):
+    """圆"""
+    __slots__ = ('center', 'radius', 'color', '_circumference', '_area', '_bounds')
+    _fields = ('center', 'radius', 'color')
+
+    def __init__(self, center: Point, radius: float, color: str = "#1B5E20"):
+        self._init(center, radius, color)
+
+    @property
+    def circumference(self) -> float:
+        """周长"""
+        return self._cached('_circumference', lambda: 2 * math.pi * self.radius)
+
+    @property
+    def area(self) -> float:
+        """面积"""
+        return self._cached('_area', lambda: math.pi * self.radius * self.radius)
+
+    @property
+    def bounds(self) -> Bounds:
+        """包围盒"""
+        def compute():
+            x, y, r = self.center.x, self.center.y, self.radius
+            return x - r, y - r, x + r, y + r
+        return self._cached('_bounds', compute)
+
+class Triangle(_ValueType):
+    """三角形"""
+    __slots__ = ('vertex1', 'vertex2', 'vertex3', 'color',
+                 '_sides', '_perimeter', '_area', '_bounds')
+    _fields = ('vertex1', 'vertex2', 'vertex3', 'color')
+
+    def __init__(self, vertex1: Point, vertex2: Point, vertex3: Point, color: str = "#311B92"):
+        self._init(vertex1, vertex2, vertex3, color)
+
+    @property
+    def vertices(self) -> Tuple[Point, Point, Point]:
+        """三个顶点"""
+        return self.vertex1, self.vertex2, self.vertex3
+
+    @property
+    def sides(self) -> Tuple[float, float, float]:
+        """三条边的长度：v1-v2、v2-v3、v3-v1"""
+        return self._cached('_sides', lambda: (self.vertex1.distance_to(self.vertex2),
+                                               self.vertex2.distance_to(self.vertex3),
+                                               self.vertex3.distance_to(self.vertex1)))
+
+    @property
+    def perimeter(self) -> float:
+        """周长"""
+        return self._cached('_perimeter', lambda: sum(self.sides))
+
+    @property
+    def coords(self) -> Tuple[Tuple[float, float], ...]:
+        """三个顶点的坐标元组"""
+        return tuple((vertex.x, vertex.y) for vertex in self.vertices)
+
+    @property
+    def area(self) -> float:
+        """面积（方向行列式），三点共线时为0"""
+        return self._cached('_area', lambda: triangle_area(*self.coords))
+
+    @property
+    def is_degenerate(self) -> bool:
+        """三个顶点是否共线"""
+        return self.area == 0
+
+    def contains_point(self, x: float, y: float) -> bool:
+        """点是否在三角形内（含边界）"""
+        return point_in_triangle((x, y), *self.coords)
+
+    @property
+    def bounds(self) -> Bounds:
+        """包围盒"""
+        return self._cached('_bounds', lambda: _bounds_of(self.vertices))
+
+class Shape(ABC):
+    """可绘制形状的抽象基类"""
+
+    def __init__(self, shape_type: ShapeType):
+        self.shape_type = shape_type
+
+    @abstractmethod
+    def get_points(self) -> List[Point]:
+        """获取形状上的所有点"""
+        pass
+
+    @abstractmethod
+    def contains(self, x: float, y: float, tolerance: float = 5.0) -> bool:
+        """判断给定点是否包含在形状中（或在形状附近）"""
+        pass
+
+    @abstractmethod
+    def render(self, painter) -> None:
+        """使用给定的QPainter绘制形状"""
+        pass
+
+    @abstractmethod
+    def to_dict(self) -> Dict:
+        """转换为字典表示，用于序列化"""
+        pass
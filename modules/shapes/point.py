@@ -2,11 +2,11 @@
 点形状的实现。
 """
 from typing import Dict, Any, List, Tuple
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont
+from PyQt6.QtGui import QPainter
 from PyQt6.QtCore import QRect
 
-# 修正导入语句使用正确的路径
-from modules.shapes import Shape, ShapeType
+from modules.shapes import Point, Shape, ShapeType
+from modules.render_cache import STYLES
 
 class PointShape(Shape):
     """表示一个点的形状"""
@@ -30,9 +30,9 @@ class PointShape(Shape):
     
     def render(self, painter: QPainter) -> None:
         """使用给定的QPainter绘制形状"""
-        # 设置点的颜色
-        painter.setPen(QPen(QColor(self.color), 2))
-        painter.setBrush(QBrush(QColor(self.color)))
+        # 设置点的颜色（与画布共享样式缓存）
+        painter.setPen(STYLES.pen(self.color, 2))
+        painter.setBrush(STYLES.brush(self.color))
         
         # 绘制点
         painter.drawEllipse(int(self.x) - self.radius, int(self.y) - self.radius, 
@@ -40,10 +40,8 @@ class PointShape(Shape):
         
         # 绘制点的名称标签
         if self.name:
-            painter.setPen(QPen(QColor("#000000")))
-            font = QFont("Arial", 10)
-            font.setBold(True)
-            painter.setFont(font)
+            painter.setPen(STYLES.pen("#000000"))
+            painter.setFont(STYLES.font("Arial", 10, bold=True))
             painter.drawText(int(self.x) - 5, int(self.y) - 10, self.name)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -67,81 +65,3 @@ class PointShape(Shape):
             name=data.get('name'),
             color=data.get('color', "#E65100")
         )
-
-"""
-点类的实现，表示二维平面上的一个点。
-"""
-from typing import Tuple, Dict, Any, Optional
-import math
-
-class Point:
-    """表示二维平面上的一个点"""
-    def __init__(self, x: float, y: float, color: str = "#000000", name: str = ""):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.name = name
-    
-    def to_screen(self, center_x: float, center_y: float, grid_spacing: float) -> Tuple[float, float]:
-        """转换为屏幕坐标"""
-        screen_x = center_x + self.x * grid_spacing
-        screen_y = center_y - self.y * grid_spacing  # 反转Y轴，符合数学坐标系
-        return screen_x, screen_y
-    
-    @staticmethod
-    def from_screen(screen_x: float, screen_y: float, center_x: float, center_y: float, grid_spacing: float) -> 'Point':
-        """从屏幕坐标创建点"""
-        x = (screen_x - center_x) / grid_spacing
-        y = (center_y - screen_y) / grid_spacing  # 反转Y轴，符合数学坐标系
-        return Point(x, y)
-    
-    def distance_to(self, other: 'Point') -> float:
-        """计算到另一个点的距离"""
-        return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
-    
-    def angle_to(self, other: 'Point') -> float:
-        """计算到另一个点的角度（弧度）"""
-        dx = other.x - self.x
-        dy = other.y - self.y
-        return math.atan2(dy, dx)
-    
-    def angle_to_degrees(self, other: 'Point') -> float:
-        """计算到另一个点的角度（度数，0-360°）"""
-        angle_rad = self.angle_to(other)
-        angle_deg = (angle_rad * 180 / math.pi) % 360
-        return angle_deg
-    
-    def midpoint(self, other: 'Point') -> 'Point':
-        """计算与另一个点的中点"""
-        mid_x = (self.x + other.x) / 2
-        mid_y = (self.y + other.y) / 2
-        return Point(mid_x, mid_y, self.color)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典表示"""
-        return {
-            'x': self.x,
-            'y': self.y,
-            'color': self.color,
-            'name': self.name
-        }
-    
-    @staticmethod
-    def from_dict(data: Dict[str, Any]) -> 'Point':
-        """从字典创建点"""
-        return Point(
-            x=data.get('x', 0.0),
-            y=data.get('y', 0.0),
-            color=data.get('color', "#000000"),
-            name=data.get('name', "")
-        )
-    
-    def __eq__(self, other: object) -> bool:
-        """判断两个点是否相等"""
-        if not isinstance(other, Point):
-            return False
-        return self.x == other.x and self.y == other.y
-    
-    def __repr__(self) -> str:
-        """返回点的字符串表示"""
-        return f"Point({self.x}, {self.y})"
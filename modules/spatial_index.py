@@ -0,0 +1,214 @@
+"""
+空间索引模块，用均匀网格哈希加速画布图元的命中测试和范围查询
+"""
+import math
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+# 轴对齐包围盒 (min_x, min_y, max_x, max_y)，网格坐标
+Bounds = Tuple[float, float, float, float]
+
+
+class SpatialHash:
+    """均匀网格哈希
+
+    平面被划分为边长为cell_size的方格，每个图元按包围盒登记到覆盖的所有方格中。
+    插入、删除和小范围查询都只触及少量方格，与场景中图元总数无关。
+    跨越方格过多的大图元（很长的线段、很大的圆）单独存放，每次查询都参与筛选。
+
+    图元数每翻一倍，按图元的分布范围和平均尺寸重新选择方格边长（平均每个方格约
+    TARGET_LOAD个图元，且平均大小的图元只覆盖一两个方格）并重新登记，摊还代价为常数，
+    场景整体放大或缩小后大图元也不会越积越多。
+
+    copy()得到的副本与原索引共享各方格的集合（写时复制）：之后原索引要修改某个方格时
+    先复制该方格的集合，因此复制只需浅拷贝字典，代价与方格内的图元数无关。
+    """
+
+    # 单个图元最多登记的方格数，超出视为大图元
+    MAX_CELLS_PER_ITEM = 64
+    # 重新登记时每个方格的目标平均图元数
+    TARGET_LOAD = 2
+
+    def __init__(self, cell_size: float = 1.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._bounds: Dict[Hashable, Bounds] = {}
+        self._large: Set[Hashable] = set()
+        self._extent: Optional[Bounds] = None  # 图元包围盒的并集，删除时不收缩
+        self._span_sum = 0.0  # 已登记图元包围盒较长边之和
+        self._rehash_size = 1  # 图元数达到该值的两倍时重新登记
+        # 上次copy()之后新建或复制过的方格，其余方格的集合与副本共享；None表示没有副本
+        self._owned: Optional[Set[Tuple[int, int]]] = None
+
+    def _cell_range(self, bounds: Bounds) -> Tuple[int, int, int, int]:
+        """包围盒覆盖的方格下标范围（闭区间）"""
+        min_x, min_y, max_x, max_y = bounds
+        size = self.cell_size
+        return (math.floor(min_x / size), math.floor(min_y / size),
+                math.floor(max_x / size), math.floor(max_y / size))
+
+    def _rehash(self):
+        """按图元的分布范围和平均尺寸重新选择方格边长，并重新登记所有图元"""
+        count = len(self._bounds)
+        min_x, min_y, max_x, max_y = self._extent
+        width, height = max_x - min_x, max_y - min_y
+        if width > 0 and height > 0:
+            size = math.sqrt(width * height * self.TARGET_LOAD / count)
+        else:
+            size = max(width, height) * self.TARGET_LOAD / count
+        size = max(size, self._span_sum / count)
+        if size > 0:
+            self.cell_size = size
+        self._cells = {}
+        self._large = set()
+        self._owned = None  # 重新登记后所有方格都是新建的，不再与副本共享
+        for key, bounds in self._bounds.items():
+            self._register(key, bounds)
+        self._rehash_size = count
+
+    def insert(self, key: Hashable, bounds: Bounds):
+        """登记图元，已存在时按新包围盒重新登记"""
+        if key in self._bounds:
+            self.remove(key)
+        self._bounds[key] = bounds
+        min_x, min_y, max_x, max_y = bounds
+        self._span_sum += max(max_x - min_x, max_y - min_y)
+        if self._extent is None:
+            self._extent = bounds
+        else:
+            ext = self._extent
+            self._extent = (min(ext[0], min_x), min(ext[1], min_y),
+                            max(ext[2], max_x), max(ext[3], max_y))
+        if len(self._bounds) >= 2 * self._rehash_size:
+            self._rehash()
+        else:
+            self._register(key, bounds)
+
+    def _register(self, key: Hashable, bounds: Bounds):
+        """把图元登记到覆盖的方格中，覆盖方格过多时作为大图元单独存放"""
+        col0, row0, col1, row1 = self._cell_range(bounds)
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > self.MAX_CELLS_PER_ITEM:
+            self._large.add(key)
+            return
+        cells = self._cells
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                bucket = self._writable((col, row))
+                if bucket is None:
+                    cells[(col, row)] = {key}
+                    if self._owned is not None:
+                        self._owned.add((col, row))
+                else:
+                    bucket.add(key)
+
+    def _writable(self, cell: Tuple[int, int]) -> Optional[Set[Hashable]]:
+        """返回可以原地修改的方格集合；与副本共享时先复制一份"""
+        bucket = self._cells.get(cell)
+        owned = self._owned
+        if bucket is not None and owned is not None and cell not in owned:
+            bucket = set(bucket)
+            self._cells[cell] = bucket
+            owned.add(cell)
+        return bucket
+
+    def remove(self, key: Hashable) -> bool:
+        """注销图元"""
+        bounds = self._bounds.pop(key, None)
+        if bounds is None:
+            return False
+        self._span_sum -= max(bounds[2] - bounds[0], bounds[3] - bounds[1])
+        if key in self._large:
+            self._large.discard(key)
+            return True
+        col0, row0, col1, row1 = self._cell_range(bounds)
+        cells = self._cells
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                bucket = self._writable((col, row))
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del cells[(col, row)]
+        return True
+
+    def bounds(self, key: Hashable) -> Optional[Bounds]:
+        """返回图元登记的包围盒"""
+        return self._bounds.get(key)
+
+    def extent(self) -> Optional[Bounds]:
+        """所有图元包围盒的并集，索引为空时返回None"""
+        if not self._bounds:
+            return None
+        all_bounds = self._bounds.values()
+        return (min(bounds[0] for bounds in all_bounds), min(bounds[1] for bounds in all_bounds),
+                max(bounds[2] for bounds in all_bounds), max(bounds[3] for bounds in all_bounds))
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> Set[Hashable]:
+        """返回包围盒与查询矩形相交的所有图元"""
+        col0, row0, col1, row1 = self._cell_range((min_x, min_y, max_x, max_y))
+        cells = self._cells
+        candidates: Set[Hashable] = set(self._large)
+        if (col1 - col0 + 1) * (row1 - row0 + 1) > len(cells):
+            # 查询范围比已占用的方格还多时，直接遍历已占用的方格
+            for (col, row), bucket in cells.items():
+                if col0 <= col <= col1 and row0 <= row <= row1:
+                    candidates |= bucket
+        else:
+            for col in range(col0, col1 + 1):
+                for row in range(row0, row1 + 1):
+                    bucket = cells.get((col, row))
+                    if bucket:
+                        candidates |= bucket
+        all_bounds = self._bounds
+        return {key for key in candidates
+                if _overlaps(all_bounds[key], min_x, min_y, max_x, max_y)}
+
+    def query_point(self, x: float, y: float, tolerance: float) -> Set[Hashable]:
+        """返回包围盒与以(x, y)为中心、半边长为tolerance的正方形相交的图元"""
+        return self.query(x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+
+    def copy(self) -> 'SpatialHash':
+        """返回索引的独立副本（方格集合写时复制，两边之后的修改互不影响）"""
+        clone = SpatialHash(self.cell_size)
+        clone._cells = dict(self._cells)
+        clone._owned = set()
+        self._owned = set()
+        clone._bounds = dict(self._bounds)
+        clone._large = set(self._large)
+        clone._extent = self._extent
+        clone._span_sum = self._span_sum
+        clone._rehash_size = self._rehash_size
+        return clone
+
+    def clear(self):
+        """清空索引"""
+        self._cells.clear()
+        self._bounds.clear()
+        self._large.clear()
+        self._extent = None
+        self._span_sum = 0.0
+        self._rehash_size = 1
+        self._owned = None
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._bounds
+
+
+def _overlaps(bounds: Bounds, min_x: float, min_y: float, max_x: float, max_y: float) -> bool:
+    """两个包围盒是否相交（含边界）"""
+    return (bounds[0] <= max_x and bounds[2] >= min_x and
+            bounds[1] <= max_y and bounds[3] >= min_y)
+
+
+def segment_distance(px: float, py: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """点到线段的距离"""
+    dx = x2 - x1
+    dy = y2 - y1
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(px - x1, py - y1)
+    t = ((px - x1) * dx + (py - y1) * dy) / length_sq
+    t = max(0.0, min(1.0, t))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
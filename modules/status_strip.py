@@ -0,0 +1,171 @@
+"""
+状态栏组件，以固定字段槽位直接绘制坐标和测量信息
+"""
+from typing import List, Sequence, Tuple
+
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+from PyQt6.QtCore import QPointF, QRectF, QSize
+from PyQt6.QtGui import QPainter, QFontMetricsF
+
+from modules.render_cache import STYLES, LabelCache
+
+# 字段 (标题, 数值)，标题为空时只显示数值
+Field = Tuple[str, str]
+
+# 状态栏自己的小标签缓存：坐标等数值每次移动都会变化，放进画布共享的缓存会把画布的标签挤出去；
+# 最近使用的标题、分隔符和当前数值每次重绘都会被访问，LRU淘汰时总能留下
+STRIP_LABELS = LabelCache(STYLES, max_entries=64)
+
+
+class StatusStrip(QWidget):
+    """轻量状态栏
+
+    由若干（标题, 数值）字段组成，字段之间以竖线分隔。粗体标题和数值都以缓存的
+    静态文本绘制；标题不变时每个字段的位置固定，数值变化只重绘该字段的槽位。
+    槽位宽度只增不减，避免数值位数变化时整行跳动。
+    """
+
+    CAPTION_FONT = ("Arial", 10, True)
+    VALUE_FONT = ("Arial", 10, False)
+    SEPARATOR = " | "
+
+    BACKGROUND_COLOR = "#F8F9FA"
+    TEXT_COLOR = "#212529"
+    BORDER_COLOR = "#DEE2E6"
+
+    PADDING_X = 8
+    PADDING_Y = 2
+    MAX_LINES = 2
+
+    def __init__(self, text: str = "", parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self._line_height = QFontMetricsF(STYLES.font(*self.VALUE_FONT)).height()
+        self._fields: Tuple[Field, ...] = ()
+        self._value_widths: List[float] = []   # 每个槽位预留的数值宽度
+        self._caption_positions: List[QPointF] = []
+        self._separator_positions: List[QPointF] = []
+        self._value_rects: List[QRectF] = []
+        self._lines = 1
+        self.setFixedHeight(self._strip_height(1))
+        self.set_message(text)
+
+    def _strip_height(self, lines: int) -> int:
+        return int(lines * self._line_height + 2 * self.PADDING_Y + 6)
+
+    def _text_width(self, text: str, font_key) -> float:
+        return STRIP_LABELS.get(text, font_key).size().width() if text else 0.0
+
+    def fields(self) -> Tuple[Field, ...]:
+        """当前显示的字段"""
+        return self._fields
+
+    def set_message(self, text: str):
+        """显示一条不带标题的消息"""
+        self.set_fields([("", text)])
+
+    def set_fields(self, fields: Sequence[Field]):
+        """更新显示的字段，只重绘数值发生变化的槽位"""
+        fields = tuple(fields)
+        if fields == self._fields:
+            return
+        old_fields = self._fields
+        self._fields = fields
+
+        if [caption for caption, _ in old_fields] != [caption for caption, _ in fields]:
+            # 字段结构变化，重新排布所有槽位
+            self._value_widths = [self._text_width(value, self.VALUE_FONT) for _, value in fields]
+            self._relayout()
+            self.update()
+            return
+
+        changed = []
+        grown = False
+        for index, ((_, old_value), (_, value)) in enumerate(zip(old_fields, fields)):
+            if old_value == value:
+                continue
+            changed.append(index)
+            width = self._text_width(value, self.VALUE_FONT)
+            if width > self._value_widths[index]:
+                self._value_widths[index] = width
+                grown = True
+
+        if grown:
+            self._relayout()
+            self.update()
+        else:
+            for index in changed:
+                self.update(self._value_rects[index].toAlignedRect())
+
+    def _relayout(self):
+        """计算各字段标题、分隔符和数值的位置，超出宽度时换行"""
+        caption_key, value_key = self.CAPTION_FONT, self.VALUE_FONT
+        separator_width = self._text_width(self.SEPARATOR, value_key)
+        left = self.PADDING_X
+        right = max(left + 1, self.width() - self.PADDING_X)
+        line_height = self._line_height
+
+        self._caption_positions = []
+        self._separator_positions = []
+        self._value_rects = []
+        x, line = left, 0
+        for index, (caption, _) in enumerate(self._fields):
+            caption_width = self._text_width(caption, caption_key)
+            if caption:
+                caption_width += self._text_width(" ", value_key)
+            field_width = caption_width + self._value_widths[index]
+            if index > 0:
+                if x + separator_width + field_width > right and line + 1 < self.MAX_LINES:
+                    x, line = left, line + 1
+                else:
+                    self._separator_positions.append(QPointF(x, line * line_height))
+                    x += separator_width
+            self._caption_positions.append(QPointF(x, line * line_height))
+            x += caption_width
+            self._value_rects.append(QRectF(x, line * line_height,
+                                            self._value_widths[index], line_height))
+            x += self._value_widths[index]
+
+        # 垂直居中：把所有位置整体下移
+        lines = line + 1
+        top = (self._strip_height(lines) - lines * line_height) / 2
+        for position in self._caption_positions + self._separator_positions:
+            position.setY(position.y() + top)
+        for rect in self._value_rects:
+            rect.translate(0, top)
+
+        if lines != self._lines:
+            self._lines = lines
+            self.setFixedHeight(self._strip_height(lines))
+
+    def sizeHint(self) -> QSize:
+        return QSize(400, self._strip_height(self._lines))
+
+    def resizeEvent(self, event):
+        self._relayout()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        """绘制背景、分隔符、标题和数值"""
+        painter = QPainter(self)
+        painter.setClipRect(event.rect())
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        painter.setPen(STYLES.pen(self.BORDER_COLOR))
+        painter.setBrush(STYLES.brush(self.BACKGROUND_COLOR))
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+
+        painter.setPen(STYLES.pen(self.TEXT_COLOR))
+        value_key = self.VALUE_FONT
+        painter.setFont(STYLES.font(*value_key))
+        for position in self._separator_positions:
+            painter.drawStaticText(position, STRIP_LABELS.get(self.SEPARATOR, value_key))
+        for (_, value), rect in zip(self._fields, self._value_rects):
+            if value:
+                painter.drawStaticText(rect.topLeft(), STRIP_LABELS.get(value, value_key))
+
+        caption_key = self.CAPTION_FONT
+        painter.setFont(STYLES.font(*caption_key))
+        for (caption, _), position in zip(self._fields, self._caption_positions):
+            if caption:
+                painter.drawStaticText(position, STRIP_LABELS.get(caption, caption_key))
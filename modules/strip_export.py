@@ -0,0 +1,130 @@
+"""
+分条导出模块，按水平条带渲染场景并以流式方式写入PNG，内存占用与输出尺寸无关
+"""
+import struct
+import zlib
+from fractions import Fraction
+from typing import BinaryIO, Optional
+
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QImage, QPainter
+
+from modules.scene_renderer import fit_transform, paint_scene
+
+# 逻辑像素对应的分辨率（与屏幕一致），dpi换算设备像素比时使用
+LOGICAL_DPI = 96
+
+# 单个条带的内存上限（字节）
+STRIP_BYTES = 32 * 1024 * 1024
+
+
+class PngStreamWriter:
+    """流式PNG写入器
+
+    逐行接收RGB像素数据，边压缩边写出IDAT块，不在内存中保留整幅图像。
+    """
+
+    PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    # 缓冲的压缩数据达到该大小时写出一个IDAT块
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, file: BinaryIO, width: int, height: int,
+                 dpi: Optional[float] = None, level: int = 6):
+        self._file = file
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._compressor = zlib.compressobj(level)
+        self._buffer = bytearray()
+
+        file.write(self.PNG_SIGNATURE)
+        # 8位RGB，默认压缩、过滤方式，不隔行
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        if dpi:
+            pixels_per_meter = int(round(dpi / 0.0254))
+            self._write_chunk(b'pHYs', struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1))
+
+    def _write_chunk(self, tag: bytes, data: bytes):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(tag)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    def write_row(self, row: bytes):
+        """写入一行像素（width*3字节的RGB数据）"""
+        if len(row) != self.width * 3:
+            raise ValueError(f"行数据长度应为 {self.width * 3} 字节，实际为 {len(row)}")
+        if self._rows_written >= self.height:
+            raise ValueError("写入的行数超过图像高度")
+        # 每行前加过滤类型字节0（不过滤）
+        self._buffer += self._compressor.compress(b'\x00' + row)
+        self._rows_written += 1
+        if len(self._buffer) >= self.CHUNK_SIZE:
+            self._write_chunk(b'IDAT', bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        """写出剩余的压缩数据和文件结束块"""
+        if self._rows_written != self.height:
+            raise ValueError(f"只写入了 {self._rows_written}/{self.height} 行")
+        self._buffer += self._compressor.flush()
+        self._write_chunk(b'IDAT', bytes(self._buffer))
+        self._buffer.clear()
+        self._write_chunk(b'IEND', b'')
+
+
+def export_png_strips(scene, path: str, width: float, height: float, ratio: float = 1.0,
+                      dpi: Optional[float] = None, strip_bytes: int = STRIP_BYTES, **options):
+    """按水平条带渲染场景并流式写入PNG
+
+    每个条带都按整幅图像的尺寸和变换绘制，只是画笔向上平移条带顶部的距离，并只重绘
+    条带所在的区域（见paint_scene的regions），坐标轴刻度、简化判断和跨条带图元的
+    抗锯齿都与一次性渲染（scene_export.render_to_image）逐像素相同。峰值内存只取决于条带大小。
+
+    Args:
+        width, height: 输出的逻辑尺寸
+        ratio: 设备像素比，输出像素尺寸为逻辑尺寸乘以ratio
+        dpi: 写入PNG的物理分辨率（打印时使用），为None时不写
+        strip_bytes: 单个条带的内存上限
+        options: 传给paint_scene的其他参数（show_axes、background等）
+    """
+    # 与render_to_image相同：像素尺寸取整后再折算回逻辑尺寸
+    pixel_width = int(width * ratio)
+    pixel_height = int(height * ratio)
+    width, height = pixel_width / ratio, pixel_height / ratio
+    transform = fit_transform(scene, width, height)
+    strip_height = max(1, min(pixel_height, strip_bytes // (pixel_width * 4)))
+    ratio_fraction = Fraction(ratio).limit_denominator(64)
+    if ratio_fraction == ratio and ratio_fraction.numerator < pixel_height:
+        # 条带高度取设备像素比分子的整数倍，条带顶部的逻辑坐标为整数，平移没有舍入误差
+        step = ratio_fraction.numerator
+        strip_height = max(step, strip_height // step * step)
+    # 线段不受条带边界裁剪的影响（见SceneRenderer）
+    options.setdefault('segment_quads', True)
+
+    with open(path, 'wb') as file:
+        writer = PngStreamWriter(file, pixel_width, pixel_height, dpi)
+        for top in range(0, pixel_height, strip_height):
+            rows = min(strip_height, pixel_height - top)
+            strip = QImage(pixel_width, rows, QImage.Format.Format_ARGB32_Premultiplied)
+            strip.setDevicePixelRatio(ratio)
+            strip.fill(Qt.GlobalColor.white)
+
+            # 条带在整幅图像中的逻辑区域；画笔上移到该区域的顶部
+            region = QRectF(0, top / ratio, width, rows / ratio)
+            painter = QPainter(strip)
+            try:
+                painter.translate(0, -region.top())
+                paint_scene(painter, scene, transform, width, height, regions=[region], **options)
+            finally:
+                painter.end()
+
+            rgb = strip.convertToFormat(QImage.Format.Format_RGB888)
+            stride = rgb.bytesPerLine()
+            row_bytes = pixel_width * 3
+            bits = rgb.constBits()
+            bits.setsize(rgb.sizeInBytes())
+            data = memoryview(bits)
+            for row in range(rows):
+                writer.write_row(bytes(data[row * stride:row * stride + row_bytes]))
+        writer.close()
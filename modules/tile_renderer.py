@@ -0,0 +1,253 @@
+"""
+瓦片渲染模块，在线程池中把场景快照分块光栅化为QImage
+"""
+import math
+from typing import Dict, Optional, Set, Tuple
+
+from PyQt6.QtCore import Qt, QObject, QRect, QRectF, QPointF, QRunnable, QThread, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPainter, QRegion, QTransform
+
+from modules.render_cache import StyleCache
+from modules.scene_renderer import SceneRenderer, visible_rows
+
+# 瓦片层级 (代数, 缩放, 设备像素比)；瓦片键 (层级, 列, 行)
+TileLevel = Tuple[int, float, float]
+TileKey = Tuple[TileLevel, int, int]
+
+
+class _TileSignals(QObject):
+    """工作线程向GUI线程回传结果的信号（排队连接）"""
+    finished = pyqtSignal(object, object, int)  # (瓦片键, QImage, 请求序号)
+
+
+class _TileJob(QRunnable):
+    """绘制单个瓦片的任务，只读取不可变的场景快照"""
+
+    def __init__(self, key: TileKey, snapshot, density_limit: float, signals: _TileSignals,
+                 ticket: int):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._key = key
+        self._ticket = ticket
+        self._snapshot = snapshot
+        self._density_limit = density_limit
+        self._signals = signals
+
+    def run(self):
+        (_, spacing, ratio), column, row = self._key
+        size = TileCache.TILE_SIZE
+        image = QImage(int(size * ratio), int(size * ratio), QImage.Format.Format_ARGB32_Premultiplied)
+        image.setDevicePixelRatio(ratio)
+        image.fill(Qt.GlobalColor.transparent)
+
+        # 瓦片以世界原点为锚，(column, row)号瓦片覆盖世界像素 [column*size, (column+1)*size)
+        transform = QTransform(spacing, 0, 0, -spacing, -column * size, -row * size)
+        rows = visible_rows(self._snapshot, transform, size, size, TileCache.CULL_MARGIN)
+        if rows is not None and any(rows.values()):
+            dense = sum(len(kind_rows) for kind_rows in rows.values()) > self._density_limit
+            painter = QPainter(image)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            # 工作线程不共享标签缓存和样式缓存：直接绘制文本，画笔等由本任务自己的缓存提供
+            SceneRenderer(self._snapshot, transform, styles=StyleCache()).render(painter, rows, dense)
+            painter.end()
+        self._signals.finished.emit(self._key, image, self._ticket)
+
+
+class TileCache(QObject):
+    """瓦片缓存和后台渲染调度
+
+    世界平面按当前缩放划分为固定像素大小的瓦片，缺失的瓦片交给线程池绘制，
+    绘制完成后通过tile_ready通知画布重绘对应区域。平移只改变合成位置，不需要重绘瓦片。
+
+    场景增删图元后，按场景的变更日志只把与增删图元包围盒（含外扩边距）相交的瓦片
+    标记为过期并重绘，新瓦片就绪前继续显示过期的旧瓦片；日志无法覆盖（清空过场景）、
+    更换场景或细节层次阈值变化时递增代数，所有瓦片失效。缩放变化时切换层级，新层级的瓦片尚未就绪时，
+    用上一个完整层级的瓦片按比例缩放后作为占位。
+    """
+
+    tile_ready = pyqtSignal(object)  # 瓦片键
+
+    TILE_SIZE = 256
+    # 瓦片内的查询范围向外扩展的像素，跨瓦片边界的点标记和标签在两侧都会绘制
+    CULL_MARGIN = 20
+    # 缓存的瓦片上限（设备像素比为1时每块256KB，共约32MB），
+    # 足够容纳1080p视口的当前层级和占位层级
+    MAX_TILES = 128
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))
+        self._signals = _TileSignals(self)
+        self._signals.finished.connect(self._on_finished)
+
+        self._snapshot = None
+        self._scene = None              # 快照所属的场景，更换场景后全部失效
+        self._state = None              # 快照对应的 (场景修订号, 细节层次阈值)
+        self._density_limit = 0.0
+        self._generation = 0
+
+        self._tiles: Dict[TileKey, QImage] = {}
+        self._stale: Set[TileKey] = set()        # 内容已过期、等待重绘的瓦片
+        self._pending: Dict[TileKey, int] = {}   # 排队中的瓦片 -> 请求序号
+        self._tickets = 0
+        self._level: Optional[TileLevel] = None     # 当前层级
+        self._fallback: Optional[TileLevel] = None  # 占位层级
+        self._level_complete = False
+
+    def sync(self, scene, lod_density: int, viewport_area: float):
+        """场景状态变化时拍摄新的快照，并使受影响的瓦片失效
+
+        Args:
+            lod_density: 视口内可见图元数的简化阈值，按面积比例折算到每个瓦片
+            viewport_area: 视口面积（像素）
+        """
+        state = (scene.revision, lod_density)
+        if scene is self._scene and state == self._state:
+            return
+        changes = None
+        if scene is self._scene and lod_density == self._state[1]:
+            changes = scene.changes_since(self._state[0])
+        if changes is not None:
+            self._invalidate_bounds([bounds for _, bounds in changes])
+        else:
+            self._generation += 1
+        self._scene = scene
+        self._state = state
+        self._snapshot = scene.snapshot()
+        self._density_limit = lod_density * self.TILE_SIZE * self.TILE_SIZE / max(1.0, viewport_area)
+
+    def _invalidate_bounds(self, bounds):
+        """把与任一包围盒（网格坐标）相交的瓦片标记为过期，排队中的相应任务作废"""
+        size = self.TILE_SIZE
+        margin = self.CULL_MARGIN
+        for key in set(self._tiles) | set(self._pending):
+            (_, spacing, _), column, row = key
+            # 瓦片（含外扩边距）覆盖的世界像素换算回网格坐标，y轴方向相反
+            left = (column * size - margin) / spacing
+            right = ((column + 1) * size + margin) / spacing
+            top = -(row * size - margin) / spacing
+            bottom = -((row + 1) * size + margin) / spacing
+            if not any(min_x <= right and max_x >= left and min_y <= top and max_y >= bottom
+                       for min_x, min_y, max_x, max_y in bounds):
+                continue
+            if key in self._tiles:
+                self._stale.add(key)
+            # 排队中的任务用的是旧快照，结果作废，需要时重新提交
+            self._pending.pop(key, None)
+        if self._level is not None and any(key[0] == self._level for key in self._stale):
+            self._level_complete = False
+
+    def _switch_level(self, level: TileLevel):
+        """切换到新层级：取消排队的任务，保留一个完整的旧层级作为占位"""
+        self._pool.clear()
+        self._pending.clear()
+        if self._level is not None and self._level_complete:
+            self._fallback = self._level
+        self._level = level
+        self._level_complete = False
+        keep = (self._level, self._fallback)
+        self._tiles = {key: image for key, image in self._tiles.items() if key[0] in keep}
+        self._stale = {key for key in self._stale if key in self._tiles}
+
+    def _tile_range(self, rect: QRectF, origin_x: float, origin_y: float, size: float):
+        """屏幕矩形覆盖的瓦片下标范围（闭区间）"""
+        return (math.floor((rect.left() - origin_x) / size), math.floor((rect.top() - origin_y) / size),
+                math.floor((rect.right() - origin_x) / size), math.floor((rect.bottom() - origin_y) / size))
+
+    def paint(self, painter, dirty: QRect, origin_x: float, origin_y: float,
+              spacing: float, ratio: float):
+        """合成脏区域内的瓦片，缺失的瓦片提交后台绘制并以占位层级代替"""
+        if self._snapshot is None:
+            return
+        level = (self._generation, spacing, ratio)
+        if level != self._level:
+            self._switch_level(level)
+
+        area = QRectF(dirty)
+        size = self.TILE_SIZE
+        column0, row0, column1, row1 = self._tile_range(area, origin_x, origin_y, size)
+        missing = QRegion()
+        for column in range(column0, column1 + 1):
+            for row in range(row0, row1 + 1):
+                key = (level, column, row)
+                image = self._tiles.get(key)
+                if image is None:
+                    missing += self.tile_rect(key, origin_x, origin_y)
+                    self._request(key)
+                else:
+                    if key in self._stale:
+                        self._request(key)
+                    painter.drawImage(QPointF(origin_x + column * size, origin_y + row * size), image)
+
+        if missing.isEmpty():
+            if not self._pending:
+                self._level_complete = True
+        elif self._fallback is not None:
+            self._paint_fallback(painter, area, missing, origin_x, origin_y, spacing)
+
+    def _paint_fallback(self, painter, area: QRectF, missing: QRegion,
+                        origin_x: float, origin_y: float, spacing: float):
+        """在缺失瓦片的区域内，把占位层级的瓦片按缩放比例绘制到当前位置"""
+        fallback = self._fallback
+        scale = spacing / fallback[1]
+        size = self.TILE_SIZE * scale
+        column0, row0, column1, row1 = self._tile_range(area, origin_x, origin_y, size)
+        painter.save()
+        painter.setClipRegion(missing, Qt.ClipOperation.IntersectClip)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        for column in range(column0, column1 + 1):
+            for row in range(row0, row1 + 1):
+                image = self._tiles.get((fallback, column, row))
+                if image is not None:
+                    painter.drawImage(QRectF(origin_x + column * size, origin_y + row * size, size, size),
+                                      image)
+        painter.restore()
+
+    def _request(self, key: TileKey):
+        """提交瓦片绘制任务（已在排队的不重复提交）"""
+        if key in self._pending:
+            return
+        self._tickets += 1
+        self._pending[key] = self._tickets
+        self._pool.start(_TileJob(key, self._snapshot, self._density_limit, self._signals,
+                                  self._tickets))
+
+    def _on_finished(self, key: TileKey, image: QImage, ticket: int):
+        """瓦片绘制完成（GUI线程），过期层级或已作废请求的结果直接丢弃"""
+        if self._pending.get(key) != ticket:
+            return
+        del self._pending[key]
+        if key[0] != self._level:
+            return
+        if len(self._tiles) >= self.MAX_TILES:
+            # 先淘汰占位层级的瓦片，再淘汰最早缓存的瓦片
+            stale = [old for old in self._tiles if old[0] != self._level]
+            for old in stale or list(self._tiles)[:len(self._tiles) // 4]:
+                del self._tiles[old]
+                self._stale.discard(old)
+        self._tiles.pop(key, None)  # 重绘的瓦片移到末尾，按最近绘制的顺序淘汰
+        self._tiles[key] = image
+        self._stale.discard(key)
+        if not self._pending:
+            self._level_complete = True
+        self.tile_ready.emit(key)
+
+    def tile_rect(self, key: TileKey, origin_x: float, origin_y: float) -> QRect:
+        """瓦片在屏幕上的矩形"""
+        _, column, row = key
+        size = self.TILE_SIZE
+        return QRectF(origin_x + column * size, origin_y + row * size, size, size).toAlignedRect()
+
+    def clear(self):
+        """清空所有瓦片并取消排队的任务"""
+        self._pool.clear()
+        self._pending.clear()
+        self._tiles.clear()
+        self._stale.clear()
+        self._level = None
+        self._fallback = None
+        self._level_complete = False
+        self._scene = None
+        self._state = None
+        self._snapshot = None
@@ -0,0 +1,103 @@
+"""
+几何计算内核：NumPy路径与纯Python路径的一致性测试
+"""
+import math
+import random
+import unittest
+
+from modules.geometry_kernel import (HAS_NUMPY, circle_metrics, point_distances, rectangle_metrics,
+                                     segment_metrics, triangle_metrics)
+
+
+def _flatten(value):
+    """把度量结果（列或列的元组）展开为浮点数列表"""
+    if isinstance(value, tuple):
+        return [x for column in value for x in _flatten(column)]
+    return [float(x) for x in value]
+
+
+def _random_rows(rng: random.Random, count: int, width: int):
+    return [[rng.uniform(-100, 100) for _ in range(width)] for _ in range(count)]
+
+
+class FallbackTest(unittest.TestCase):
+    """纯Python路径与逐个手算的结果对照"""
+
+    def test_segment_metrics(self):
+        metrics = segment_metrics([(0, 0, 3, 4), (1, 1, 1, -1)], use_numpy=False)
+        self.assertEqual(list(metrics.lengths), [5.0, 2.0])
+        self.assertAlmostEqual(metrics.angles[0], math.degrees(math.atan2(4, 3)))
+        self.assertAlmostEqual(metrics.angles[1], 270.0)
+
+    def test_triangle_metrics(self):
+        metrics = triangle_metrics([(0, 0, 4, 0, 0, 3), (0, 0, 1, 1, 2, 2)], use_numpy=False)
+        self.assertEqual([column[0] for column in metrics.sides], [4.0, 5.0, 3.0])
+        self.assertEqual(list(metrics.perimeters), [12.0, 4 * math.sqrt(2)])
+        self.assertEqual(list(metrics.areas), [6.0, 0.0])
+        angles = [column[0] for column in metrics.angles]
+        self.assertAlmostEqual(angles[0], 90.0)
+        self.assertAlmostEqual(angles[1], math.degrees(math.atan2(3, 4)))
+        self.assertAlmostEqual(sum(angles), 180.0)
+        # 三点共线：端点处为0°，中间的顶点处为180°
+        self.assertEqual([column[1] for column in metrics.angles], [0.0, 180.0, 0.0])
+
+    def test_single_flat_row(self):
+        self.assertEqual(list(point_distances([3, 4], 0, 0, use_numpy=False)), [5.0])
+
+    def test_row_width_is_checked(self):
+        with self.assertRaisesRegex(ValueError, "每一行应包含 4 个数值，实际为 3"):
+            segment_metrics([(0, 0, 1)], use_numpy=False)
+
+
+@unittest.skipUnless(HAS_NUMPY, "未安装NumPy")
+class NumpyParityTest(unittest.TestCase):
+    """NumPy路径与纯Python路径逐项一致"""
+
+    def _assert_parity(self, function, data):
+        vectorised = function(data, use_numpy=True)
+        fallback = function(data, use_numpy=False)
+        for field in vectorised._fields:
+            expected = _flatten(getattr(fallback, field))
+            actual = _flatten(getattr(vectorised, field))
+            self.assertEqual(len(actual), len(expected))
+            for a, b in zip(actual, expected):
+                self.assertAlmostEqual(a, b, delta=1e-9 * max(1.0, abs(b)))
+
+    def test_parity(self):
+        rng = random.Random(1)
+        self._assert_parity(segment_metrics, _random_rows(rng, 300, 4))
+        self._assert_parity(rectangle_metrics, _random_rows(rng, 300, 2))
+        self._assert_parity(triangle_metrics, _random_rows(rng, 300, 6))
+        self._assert_parity(circle_metrics, [rng.uniform(0, 100) for _ in range(300)])
+        rows = _random_rows(rng, 300, 2)
+        for a, b in zip(point_distances(rows, 1.5, -2.5, use_numpy=True),
+                        point_distances(rows, 1.5, -2.5, use_numpy=False)):
+            self.assertAlmostEqual(a, b, delta=1e-9 * max(1.0, b))
+
+    def test_degenerate_triangles(self):
+        self._assert_parity(triangle_metrics, [(0, 0, 1, 1, 2, 2), (1, 1, 1, 1, 1, 1),
+                                               (0, 0, 1e-9, 1, 0, 2)])
+
+    def test_array_input(self):
+        import numpy as np
+        data = np.array(_random_rows(random.Random(2), 50, 6))
+        self._assert_parity(triangle_metrics, data)
+
+    def test_shapes_rejected_like_fallback(self):
+        import numpy as np
+        for data in ([(0, 0, 1, 1, 2, 2, 3, 3)], np.zeros((2, 8)), list(range(8)),
+                     np.zeros((2, 2, 4)), [(0, 0, 1)]):
+            messages = []
+            for use_numpy in (True, False):
+                with self.assertRaises(ValueError) as context:
+                    segment_metrics(data, use_numpy=use_numpy)
+                messages.append(str(context.exception))
+            self.assertEqual(messages[0], messages[1])
+
+    def test_empty_input(self):
+        for use_numpy in (True, False):
+            self.assertEqual(len(segment_metrics([], use_numpy=use_numpy).lengths), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
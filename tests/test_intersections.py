@@ -0,0 +1,167 @@
+"""
+交点查找测试：扫描线与两两暴力求交对照，增量更新与全量重建对照
+"""
+import itertools
+import os
+import random
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication
+
+from modules.intersection_cache import IntersectionCache
+from modules.intersections import (IntersectionFinder, make_segment, scene_intersections,
+                                   segment_pair_points, sweep_intersections)
+from modules.scene import SceneStore
+from modules.scene_export import _ensure_app
+
+
+def _brute_force(segments):
+    """逐对求交，返回与sweep_intersections相同形式的结果"""
+    results = {}
+    for i, j in itertools.combinations(range(len(segments)), 2):
+        for point in segment_pair_points(segments[i], segments[j]):
+            results.setdefault(point, set()).update((i, j))
+    return results
+
+
+def _random_segments(rng: random.Random, count: int, grid: int):
+    """整数网格上的线段：大量端点接触、共线重叠、竖直线段和多线共点"""
+    segments = []
+    while len(segments) < count:
+        segment = make_segment((rng.randint(0, grid), rng.randint(0, grid)),
+                               (rng.randint(0, grid), rng.randint(0, grid)), ('line', len(segments)))
+        if segment:
+            segments.append(segment)
+    return segments
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_sweep_matches_brute_force_on_degenerate_input(self):
+        rng = random.Random(1)
+        for trial in range(40):
+            segments = _random_segments(rng, 30, 6 + trial % 5)
+            self.assertEqual(sweep_intersections(segments), _brute_force(segments), trial)
+
+    def test_sweep_matches_brute_force_on_float_input(self):
+        rng = random.Random(2)
+        segments = []
+        for i in range(150):
+            x, y = rng.uniform(-50, 50), rng.uniform(-50, 50)
+            segments.append(make_segment((x, y), (x + rng.uniform(-30, 30), y + rng.uniform(-30, 30)),
+                                         ('line', i)))
+        self.assertEqual(sweep_intersections(segments), _brute_force(segments))
+
+    def test_concurrent_segments(self):
+        # 五条线段交于同一点，另有一条竖直线段经过该点
+        segments = [make_segment((-k, -1), (k, 1), ('line', k)) for k in range(1, 6)]
+        segments.append(make_segment((0, -3), (0, 3), ('line', 6)))
+        self.assertEqual(sweep_intersections(segments), {(0.0, 0.0): set(range(6))})
+
+
+def _random_edit(rng: random.Random, scene: SceneStore, ids: list):
+    """对场景做一次随机增删，坐标取整数，以便产生退化的相交情况"""
+    def c():
+        return rng.randint(0, 15)
+
+    r = rng.random()
+    if r < 0.3:
+        ids.append(scene.add_line(c(), c(), c(), c(), "#000000"))
+    elif r < 0.45:
+        ids.append(scene.add_circle(c(), c(), rng.randint(1, 5), "#000000"))
+    elif r < 0.6:
+        ids.append(scene.add_polygon([(c(), c()), (c(), c()), (c(), c())], "#000000"))
+    elif r < 0.7:
+        ids.append(scene.add_point(c(), c(), "#000000"))
+    elif r < 0.97 and ids:
+        scene.remove(ids.pop(rng.randrange(len(ids))))
+    else:
+        scene.clear()
+        ids.clear()
+
+
+class IntersectionFinderTest(unittest.TestCase):
+
+    def test_incremental_matches_rebuild(self):
+        rng = random.Random(3)
+        for _ in range(15):
+            scene, ids = SceneStore(), []
+            finder = IntersectionFinder()
+            for step in range(120):
+                _random_edit(rng, scene, ids)
+                if step % 4 == 0:
+                    finder.sync(scene)
+                    fresh = IntersectionFinder()
+                    self.assertEqual(sorted(finder.intersections(scene)),
+                                     sorted(fresh.intersections(scene)))
+                    self.assertEqual(sorted(finder.derived_points(scene)),
+                                     sorted(fresh.derived_points(scene)))
+
+    def test_removal_inside_collinear_overlap(self):
+        # 两条重叠的线段只因第三条线段的端点才在(2, 0)处成为交点
+        scene = SceneStore()
+        scene.add_line(0, 0, 4, 0, "#000000")
+        scene.add_line(1, 0, 5, 0, "#000000")
+        third = scene.add_line(2, 0, 2, 3, "#000000")
+        finder = IntersectionFinder()
+        self.assertIn((2.0, 0.0), finder.derived_points(scene))
+        scene.remove(third)
+        self.assertEqual(sorted(finder.derived_points(scene)), [(1.0, 0.0), (4.0, 0.0)])
+
+    def test_snapshot_matches_scene(self):
+        rng = random.Random(4)
+        scene, ids = SceneStore(), []
+        for _ in range(200):
+            _random_edit(rng, scene, ids)
+        self.assertEqual(scene_intersections(scene.snapshot()), scene_intersections(scene))
+
+    def test_existing_points_are_not_marked(self):
+        scene = SceneStore()
+        scene.add_line(0, 0, 2, 2, "#000000")
+        scene.add_line(0, 2, 2, 0, "#000000")
+        finder = IntersectionFinder()
+        self.assertEqual(finder.derived_points(scene), [(1.0, 1.0)])
+        scene.add_point(1, 1, "#000000")
+        self.assertEqual(finder.derived_points(scene), [])
+
+
+class IntersectionCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        _ensure_app()
+
+    def _wait_ready(self, cache):
+        ready = []
+        cache.ready.connect(lambda: ready.append(True))
+        deadline = time.monotonic() + 10
+        while not ready and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(ready)
+
+    def test_rebuild_runs_in_background_then_catches_up(self):
+        rng = random.Random(5)
+        scene = SceneStore()
+        for _ in range(300):
+            x, y = rng.uniform(0, 50), rng.uniform(0, 50)
+            scene.add_line(x, y, x + rng.uniform(-10, 10), y + rng.uniform(-10, 10), "#000000")
+        cache = IntersectionCache()
+        # 第一次查询只提交重建，不在调用线程中计算
+        self.assertEqual(cache.points(scene), [])
+        self._wait_ready(cache)
+        expected = IntersectionFinder().derived_points(scene)
+        self.assertTrue(expected)
+        self.assertEqual(sorted(cache.points(scene)), sorted(expected))
+        # 之后的编辑增量更新
+        scene.add_line(0, 0, 50, 50, "#000000")
+        scene.remove(3)
+        self.assertEqual(sorted(cache.points(scene)),
+                         sorted(IntersectionFinder().derived_points(scene)))
+
+
+if __name__ == "__main__":
+    unittest.main()
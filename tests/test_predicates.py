@@ -0,0 +1,129 @@
+"""
+鲁棒谓词与Fraction精确计算的一致性测试，输入集中在接近退化的情况
+"""
+import math
+import random
+import unittest
+from fractions import Fraction
+
+from modules.predicates import (on_segment, orient2d, orientation, point_in_polygon,
+                                point_in_triangle, segments_intersect, triangle_area)
+
+
+def _exact_orientation(a, b, c) -> int:
+    ax, ay, bx, by, cx, cy = map(Fraction, (*a, *b, *c))
+    det = (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+    return (det > 0) - (det < 0)
+
+
+def _exact_area(a, b, c) -> Fraction:
+    ax, ay, bx, by, cx, cy = map(Fraction, (*a, *b, *c))
+    return ((ax - cx) * (by - cy) - (ay - cy) * (bx - cx)) / 2
+
+
+def _near_degenerate_grid():
+    """Shewchuk的经典例子：(0.5, 0.5)附近按最小浮点间距排列的点，与(12, 12)、(24, 24)几乎共线"""
+    step = 2.0 ** -53
+    for i in range(64):
+        for j in range(64):
+            yield (0.5 + i * step, 0.5 + j * step), (12.0, 12.0), (24.0, 24.0)
+
+
+def _near_line(rng: random.Random, count: int):
+    """直线上按浮点舍入取的点，三点的精确方向多为非0但非常接近0"""
+    for _ in range(count):
+        slope, offset = rng.uniform(-3, 3), rng.uniform(-100, 100)
+        xs = [rng.uniform(-1e3, 1e3) for _ in range(3)]
+        yield tuple((x, slope * x + offset) for x in xs)
+
+
+class OrientationTest(unittest.TestCase):
+
+    def test_grid_matches_exact(self):
+        signs = set()
+        for a, b, c in _near_degenerate_grid():
+            expected = _exact_orientation(a, b, c)
+            signs.add(expected)
+            self.assertEqual(orientation(a, b, c), expected, (a, b, c))
+        # 网格确实跨过了直线两侧，而不是只测到一种符号
+        self.assertEqual(signs, {-1, 0, 1})
+
+    def test_near_line_matches_exact(self):
+        for a, b, c in _near_line(random.Random(1), 3000):
+            expected = _exact_orientation(a, b, c)
+            self.assertEqual(orientation(a, b, c), expected)
+            self.assertEqual((orient2d(a, b, c) > 0) - (orient2d(a, b, c) < 0), expected)
+
+    def test_permutations_are_consistent(self):
+        for a, b, c in _near_line(random.Random(2), 500):
+            sign = orientation(a, b, c)
+            self.assertEqual(orientation(b, c, a), sign)
+            self.assertEqual(orientation(b, a, c), -sign)
+
+    def test_triangle_area(self):
+        self.assertEqual(triangle_area((0, 0), (4, 0), (0, 3)), 6.0)
+        self.assertEqual(triangle_area((0.1, 0.1), (0.2, 0.2), (0.3, 0.3)),
+                         abs(float(_exact_area((0.1, 0.1), (0.2, 0.2), (0.3, 0.3)))))
+
+
+def _exact_on_segment(p, a, b) -> bool:
+    return (_exact_orientation(a, b, p) == 0 and
+            min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and
+            min(a[1], b[1]) <= p[1] <= max(a[1], b[1]))
+
+
+def _exact_segments_intersect(p1, p2, q1, q2) -> bool:
+    d1, d2 = _exact_orientation(q1, q2, p1), _exact_orientation(q1, q2, p2)
+    d3, d4 = _exact_orientation(p1, p2, q1), _exact_orientation(p1, p2, q2)
+    if d1 * d2 < 0 and d3 * d4 < 0:
+        return True
+    return (_exact_on_segment(p1, q1, q2) or _exact_on_segment(p2, q1, q2) or
+            _exact_on_segment(q1, p1, p2) or _exact_on_segment(q2, p1, p2))
+
+
+class SegmentTest(unittest.TestCase):
+
+    def test_segments_intersect_matches_exact(self):
+        rng = random.Random(3)
+        for a, b, c in _near_line(rng, 2000):
+            # 第四个点取在同一条直线附近，覆盖共线重叠、端点接触和几乎平行的情况
+            d = (c[0] + rng.uniform(-1, 1), c[1] + rng.choice((0.0, 1e-12, -1e-12)))
+            self.assertEqual(segments_intersect(a, b, c, d), _exact_segments_intersect(a, b, c, d))
+            self.assertEqual(on_segment(c, a, b), _exact_on_segment(c, a, b))
+
+    def test_touching_and_collinear(self):
+        self.assertTrue(segments_intersect((0, 0), (1, 1), (1, 1), (2, 0)))
+        self.assertTrue(segments_intersect((0, 0), (2, 2), (1, 1), (3, 3)))
+        self.assertFalse(segments_intersect((0, 0), (1, 1), (2, 2), (3, 3)))
+        self.assertFalse(segments_intersect((0, 0), (1, 0), (0, 1e-300), (1, 1e-300)))
+
+
+class ContainmentTest(unittest.TestCase):
+
+    def test_point_in_triangle_on_edges(self):
+        a, b, c = (0.1, 0.1), (10.3, 0.7), (3.3, 9.9)
+        for t in [i / 16 for i in range(17)]:
+            # 按浮点舍入取在边上的点，精确位置可能略在边内或边外
+            p = (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+            inside = _exact_orientation(a, b, p) >= 0
+            self.assertEqual(point_in_triangle(p, a, b, c), inside, p)
+
+    def test_point_in_convex_polygon_matches_half_planes(self):
+        rng = random.Random(4)
+        # 凸多边形：内部判断等价于对每条边的方向都不为负
+        vertices = [(math.cos(k * math.pi / 5) * 7.1, math.sin(k * math.pi / 5) * 7.1)
+                    for k in range(10)]
+        for _ in range(2000):
+            i = rng.randrange(10)
+            a, b = vertices[i - 1], vertices[i]
+            t = rng.random()
+            p = (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+            if rng.random() < 0.5:
+                p = (p[0] * rng.uniform(0.5, 1.5), p[1] * rng.uniform(0.5, 1.5))
+            expected = all(_exact_orientation(vertices[j - 1], vertices[j], p) >= 0
+                           for j in range(10))
+            self.assertEqual(point_in_polygon(p, vertices), expected, p)
+
+
+if __name__ == "__main__":
+    unittest.main()
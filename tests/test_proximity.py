@@ -0,0 +1,110 @@
+"""
+最近点对与k近邻查询和暴力计算的对照测试
+"""
+import itertools
+import math
+import random
+import unittest
+
+from modules.proximity import PointGrid, closest_pair
+from modules.scene import SceneStore
+
+
+def _brute_closest(xs, ys) -> float:
+    return min(math.hypot(xs[i] - xs[j], ys[i] - ys[j])
+               for i, j in itertools.combinations(range(len(xs)), 2))
+
+
+def _brute_nearest(points, x, y, k, exclude=None):
+    return sorted((math.hypot(px - x, py - y), key)
+                  for key, (px, py) in points.items() if key != exclude)[:k]
+
+
+class ClosestPairTest(unittest.TestCase):
+
+    def _assert_closest(self, xs, ys):
+        distance, i, j = closest_pair(xs, ys)
+        self.assertNotEqual(i, j)
+        self.assertEqual(distance, math.hypot(xs[i] - xs[j], ys[i] - ys[j]))
+        self.assertEqual(distance, _brute_closest(xs, ys))
+
+    def test_random_points(self):
+        rng = random.Random(1)
+        for count in (2, 3, 10, 200, 600):
+            xs = [rng.uniform(-100, 100) for _ in range(count)]
+            ys = [rng.uniform(-100, 100) for _ in range(count)]
+            self._assert_closest(xs, ys)
+
+    def test_degenerate_layouts(self):
+        rng = random.Random(2)
+        # 几乎同一横坐标（活动集合包含所有点）、整数网格上的重复点、同一条水平线
+        xs = [1.0 + rng.uniform(0, 1e-9) for _ in range(300)]
+        ys = [rng.uniform(-100, 100) for _ in range(300)]
+        self._assert_closest(xs, ys)
+        xs = [float(rng.randint(0, 10)) for _ in range(200)]
+        ys = [float(rng.randint(0, 10)) for _ in range(200)]
+        self.assertEqual(closest_pair(xs, ys)[0], 0.0)
+        self._assert_closest([float(i * i) for i in range(50)], [0.0] * 50)
+
+    def test_too_few_points(self):
+        self.assertIsNone(closest_pair([], []))
+        self.assertIsNone(closest_pair([1.0], [2.0]))
+
+    def test_scene_closest_points(self):
+        scene = SceneStore()
+        ids = [scene.add_point(x, y, "#000000") for x, y in ((0, 0), (5, 5), (5.5, 5), (9, 0))]
+        self.assertEqual(scene.closest_points(), (0.5, ids[1], ids[2]))
+        scene.remove(ids[2])
+        distance, first, second = scene.closest_points()
+        self.assertEqual(distance, math.hypot(4, 5))
+        self.assertEqual({first, second}, {ids[1], ids[3]})
+
+
+class PointGridTest(unittest.TestCase):
+
+    def test_nearest_matches_brute_force(self):
+        rng = random.Random(3)
+        grid = PointGrid()
+        points = {}
+        for key in range(1500):
+            # 一部分点聚成一团，其余分散，覆盖网格密度很不均匀的情况
+            if key % 3:
+                point = (rng.gauss(0, 1), rng.gauss(0, 1))
+            else:
+                point = (rng.uniform(-500, 500), rng.uniform(-500, 500))
+            points[key] = point
+            grid.insert(key, *point)
+            if key in (0, 10, 500, 1499):
+                self._assert_queries(grid, points, rng)
+        for key in rng.sample(sorted(points), 600):
+            del points[key]
+            self.assertTrue(grid.remove(key))
+        self._assert_queries(grid, points, rng)
+
+    def _assert_queries(self, grid, points, rng):
+        for _ in range(40):
+            x, y = rng.uniform(-600, 600), rng.uniform(-600, 600)
+            if rng.random() < 0.5:
+                x, y = x / 300, y / 300
+            k = rng.choice((1, 3, 10))
+            expected = _brute_nearest(points, x, y, k)
+            result = grid.nearest(x, y, k)
+            self.assertEqual([distance for distance, _ in result],
+                             [distance for distance, _ in expected])
+        key = rng.choice(sorted(points))
+        x, y = points[key]
+        result = grid.nearest(x, y, 2, exclude=key)
+        self.assertNotIn(key, [found for _, found in result])
+        self.assertEqual([distance for distance, _ in result],
+                         [distance for distance, _ in _brute_nearest(points, x, y, 2, key)])
+
+    def test_empty_and_small(self):
+        grid = PointGrid()
+        self.assertEqual(grid.nearest(0, 0, 3), [])
+        grid.insert('a', 1, 1)
+        self.assertEqual(grid.nearest(0, 0, 3), [(math.hypot(1, 1), 'a')])
+        self.assertEqual(grid.nearest(0, 0, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
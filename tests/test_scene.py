@@ -0,0 +1,110 @@
+"""
+场景存储的增删、修订号、变更日志和序列化测试
+"""
+import random
+import unittest
+
+from modules.scene import SceneStore
+
+
+def _random_scene(seed: int, count: int = 200):
+    """随机场景，同时返回按ID记录的图元 {ID: (类型, 数值)} 作为参照"""
+    rng = random.Random(seed)
+    scene = SceneStore()
+    items = {}
+    for i in range(count):
+        x, y = rng.uniform(-10, 10), rng.uniform(-10, 10)
+        kind = i % 4
+        if kind == 0:
+            items[scene.add_point(x, y, "#E65100")] = ('point', (x, y))
+        elif kind == 1:
+            values = (x, y, x + rng.uniform(-3, 3), y + rng.uniform(-3, 3))
+            items[scene.add_line(*values, "#0277BD", "1.5")] = ('line', values)
+        elif kind == 2:
+            radius = rng.uniform(0.1, 2)
+            items[scene.add_circle(x, y, radius, "#2E7D32")] = ('circle', (x, y, radius))
+        else:
+            vertices = [(x, y), (x + 1, y), (x, y + 2)]
+            items[scene.add_polygon(vertices, "#1A237E")] = ('polygon', vertices)
+    return scene, items
+
+
+class SceneStoreTest(unittest.TestCase):
+
+    def test_add_remove_and_revision(self):
+        scene, items = _random_scene(1)
+        self.assertEqual(len(scene), len(items))
+        self.assertEqual(scene.revision, len(items))
+        rng = random.Random(2)
+        for item_id in rng.sample(sorted(items), 80):
+            revision = scene.revision
+            kind, _ = items.pop(item_id)
+            self.assertEqual(scene.locate(item_id)[0], kind)
+            self.assertTrue(scene.remove(item_id))
+            self.assertEqual(scene.revision, revision + 1)
+            self.assertIsNone(scene.locate(item_id))
+            self.assertFalse(scene.remove(item_id))
+            self.assertEqual(scene.revision, revision + 1)
+        self.assertEqual(len(scene), len(items))
+        for item_id, (kind, _) in items.items():
+            self.assertEqual(scene.locate(item_id)[0], kind)
+
+    def test_ids_are_not_reused(self):
+        scene = SceneStore()
+        first = scene.add_point(0, 0, "#000000")
+        scene.remove(first)
+        self.assertGreater(scene.add_point(0, 0, "#000000"), first)
+        scene.clear()
+        self.assertGreater(scene.add_point(0, 0, "#000000"), first + 1)
+
+    def test_changes_since(self):
+        scene, items = _random_scene(3, 20)
+        revision = scene.revision
+        removed = next(iter(items))
+        bounds = scene.bounds((items[removed][0], removed))
+        added = scene.add_line(0, 0, 1, 1, "#000000")
+        scene.remove(removed)
+        changes = scene.changes_since(revision)
+        self.assertEqual(changes, [(('line', added), (0, 0, 1, 1)),
+                                   ((items[removed][0], removed), bounds)])
+        self.assertEqual(scene.changes_since(scene.revision), [])
+        scene.clear()
+        self.assertIsNone(scene.changes_since(revision))
+        self.assertEqual(scene.changes_since(scene.revision), [])
+
+    def test_changes_since_after_journal_trim(self):
+        scene = SceneStore()
+        for i in range(SceneStore.MAX_CHANGES + 10):
+            scene.add_point(i, 0, "#000000")
+        self.assertIsNone(scene.changes_since(0))
+        changes = scene.changes_since(scene.revision - 5)
+        self.assertEqual(len(changes), 5)
+
+    def test_to_dict_round_trip(self):
+        scene, items = _random_scene(4)
+        for item_id in list(items)[::7]:
+            scene.remove(item_id)
+        data = scene.to_dict()
+        restored = SceneStore.from_dict(data)
+        self.assertEqual(restored.to_dict(), data)
+        self.assertEqual(len(restored), len(scene))
+        self.assertEqual(restored.extent(), scene.extent())
+
+    def test_rows_in_rect_matches_brute_force(self):
+        scene, _ = _random_scene(5)
+        rect = (-3.0, -2.0, 4.0, 5.0)
+        expected = {}
+        for kind, table in scene._tables():
+            expected[kind] = [row for row, item_id in enumerate(table.ids)
+                              if _overlaps(scene.bounds((kind, item_id)), rect)]
+        self.assertEqual(scene.rows_in_rect(*rect), expected)
+        self.assertEqual(scene.snapshot().rows_in_rect(*rect), expected)
+
+
+def _overlaps(bounds, rect) -> bool:
+    return (bounds[0] <= rect[2] and bounds[2] >= rect[0] and
+            bounds[1] <= rect[3] and bounds[3] >= rect[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+形状值类型的默认值、相等性、不可变性和缓存度量测试
+"""
+import math
+import pickle
+import unittest
+
+from modules.shapes import Circle, Line, Point, Rectangle, Triangle
+
+
+class PointTest(unittest.TestCase):
+
+    def test_defaults(self):
+        point = Point(1, 2)
+        self.assertEqual(point.color, "#000000")
+        self.assertEqual(point.name, "")
+        self.assertEqual(Point.from_dict({'x': 1, 'y': 2}), point)
+        self.assertEqual(Point.from_dict(point.to_dict()), point)
+
+    def test_equality_compares_every_field(self):
+        self.assertEqual(Point(1, 2, "#FF0000", "A"), Point(1, 2, "#FF0000", "A"))
+        self.assertEqual(hash(Point(1, 2, "#FF0000", "A")), hash(Point(1, 2, "#FF0000", "A")))
+        self.assertNotEqual(Point(1, 2), Point(1, 2, "#FF0000"))
+        self.assertNotEqual(Point(1, 2), Point(1, 2, name="A"))
+        self.assertNotEqual(Point(1, 2), Point(2, 1))
+
+    def test_immutable_and_replace(self):
+        point = Point(1, 2)
+        with self.assertRaises(AttributeError):
+            point.x = 3
+        with self.assertRaises(AttributeError):
+            point.extra = 3
+        self.assertEqual(point.replace(x=3), Point(3, 2))
+        self.assertEqual(point, Point(1, 2))
+        self.assertEqual(pickle.loads(pickle.dumps(point)), point)
+
+    def test_screen_round_trip(self):
+        point = Point(1.5, -2.0)
+        screen = point.to_screen(400, 300, 40)
+        self.assertEqual(screen, (460.0, 380.0))
+        back = Point.from_screen(*screen, 400, 300, 40)
+        self.assertEqual((back.x, back.y), (1.5, -2.0))
+
+    def test_metrics(self):
+        a, b = Point(0, 0), Point(3, 4)
+        self.assertEqual(a.distance_to(b), 5.0)
+        self.assertAlmostEqual(Point(0, 0).angle_to_degrees(Point(0, -1)), 270.0)
+        self.assertEqual(a.midpoint(b), Point(1.5, 2.0))
+
+
+class ValueTypeTest(unittest.TestCase):
+
+    def test_line(self):
+        line = Line(Point(1, 1), Point(1, -2))
+        self.assertEqual(line.length, 3.0)
+        self.assertAlmostEqual(line.angle, 270.0)
+        self.assertEqual(line.bounds, (1, -2, 1, 1))
+        self.assertTrue(line.intersects(Line(Point(0, 0), Point(2, 0))))
+        self.assertFalse(line.intersects(Line(Point(2, 0), Point(3, 0))))
+
+    def test_rectangle_follows_y_up(self):
+        rectangle = Rectangle(Point(1, 5), 4, 2)
+        self.assertEqual([(p.x, p.y) for p in rectangle.vertices],
+                         [(1, 5), (5, 5), (5, 3), (1, 3)])
+        self.assertEqual(rectangle.bounds, (1, 3, 5, 5))
+        self.assertEqual((rectangle.perimeter, rectangle.area), (12, 8))
+
+    def test_circle(self):
+        circle = Circle(Point(1, 1), 2)
+        self.assertAlmostEqual(circle.area, 4 * math.pi)
+        self.assertAlmostEqual(circle.circumference, 4 * math.pi)
+        self.assertEqual(circle.bounds, (-1, -1, 3, 3))
+
+    def test_triangle(self):
+        triangle = Triangle(Point(0, 0), Point(4, 0), Point(0, 3))
+        self.assertEqual(triangle.sides, (4.0, 5.0, 3.0))
+        self.assertEqual(triangle.perimeter, 12.0)
+        self.assertEqual(abs(triangle.area), 6.0)
+        self.assertTrue(triangle.contains_point(1, 1))
+        self.assertTrue(triangle.contains_point(2, 0))
+        self.assertFalse(triangle.contains_point(3, 3))
+        self.assertTrue(Triangle(Point(0, 0), Point(1, 1), Point(2, 2)).is_degenerate)
+
+    def test_cached_metrics_follow_replace(self):
+        line = Line(Point(0, 0), Point(3, 4))
+        self.assertEqual(line.length, 5.0)
+        self.assertEqual(line.replace(end=Point(6, 8)).length, 10.0)
+        self.assertEqual(line.length, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
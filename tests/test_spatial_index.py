@@ -0,0 +1,121 @@
+"""
+空间索引与暴力筛选的一致性测试
+"""
+import math
+import random
+import unittest
+
+from modules.scene import SceneStore
+from modules.spatial_index import SpatialHash, segment_distance
+
+
+def _random_bounds(rng: random.Random, spread: float, size: float):
+    x, y = rng.uniform(-spread, spread), rng.uniform(-spread, spread)
+    return x, y, x + rng.uniform(0, size), y + rng.uniform(0, size)
+
+
+def _brute_query(items, min_x, min_y, max_x, max_y):
+    return {key for key, bounds in items.items()
+            if bounds[0] <= max_x and bounds[2] >= min_x and
+            bounds[1] <= max_y and bounds[3] >= min_y}
+
+
+class SpatialHashTest(unittest.TestCase):
+
+    def _assert_queries(self, index, items, rng, spread):
+        for _ in range(50):
+            rect = _random_bounds(rng, spread, spread / 4)
+            self.assertEqual(index.query(*rect), _brute_query(items, *rect))
+
+    def test_query_across_rehashes(self):
+        rng = random.Random(1)
+        index = SpatialHash()
+        items = {}
+        cell_sizes = set()
+        for i in range(2000):
+            # 前一半是小图元，后一半分布范围和尺寸都放大，迫使方格边长变化并产生大图元
+            spread, size = (10, 0.5) if i < 1000 else (1000, 300)
+            items[i] = _random_bounds(rng, spread, size)
+            index.insert(i, items[i])
+            cell_sizes.add(index.cell_size)
+            if i in (10, 999, 1999):
+                self._assert_queries(index, items, rng, spread)
+        self.assertGreater(len(cell_sizes), 3)
+        self.assertEqual(len(index), len(items))
+
+    def test_remove_and_reinsert(self):
+        rng = random.Random(2)
+        index = SpatialHash()
+        items = {i: _random_bounds(rng, 50, 5) for i in range(500)}
+        for key, bounds in items.items():
+            index.insert(key, bounds)
+        for key in rng.sample(sorted(items), 200):
+            del items[key]
+            self.assertTrue(index.remove(key))
+            self.assertFalse(index.remove(key))
+        for key in rng.sample(sorted(items), 100):
+            items[key] = _random_bounds(rng, 50, 5)
+            index.insert(key, items[key])
+        for key, bounds in items.items():
+            self.assertEqual(index.bounds(key), bounds)
+        self._assert_queries(index, items, rng, 50)
+
+    def test_copy_is_independent(self):
+        rng = random.Random(3)
+        index = SpatialHash()
+        items = {i: _random_bounds(rng, 20, 2) for i in range(300)}
+        for key, bounds in items.items():
+            index.insert(key, bounds)
+        snapshot_items = dict(items)
+        clone = index.copy()
+        for key in range(0, 300, 3):
+            index.remove(key)
+            del items[key]
+        for key in range(300, 400):
+            items[key] = _random_bounds(rng, 20, 2)
+            index.insert(key, items[key])
+        second = index.copy()
+        index.remove(301)
+        self._assert_queries(clone, snapshot_items, rng, 20)
+        self._assert_queries(second, items, rng, 20)
+        del items[301]
+        self._assert_queries(index, items, rng, 20)
+
+    def test_segment_distance(self):
+        self.assertAlmostEqual(segment_distance(0, 1, -1, 0, 1, 0), 1.0)
+        self.assertAlmostEqual(segment_distance(3, 4, 0, 0, 0, 0), 5.0)
+        self.assertAlmostEqual(segment_distance(2, 1, -1, 0, 1, 0), math.sqrt(2))
+
+
+class SceneHitTestingTest(unittest.TestCase):
+
+    def test_items_within_and_nearest_match_brute_force(self):
+        rng = random.Random(4)
+        scene = SceneStore()
+        for i in range(400):
+            x, y = rng.uniform(-20, 20), rng.uniform(-20, 20)
+            if i % 3 == 0:
+                scene.add_point(x, y, "#000000")
+            elif i % 3 == 1:
+                scene.add_line(x, y, x + rng.uniform(-4, 4), y + rng.uniform(-4, 4), "#000000")
+            else:
+                scene.add_circle(x, y, rng.uniform(0.2, 3), "#000000")
+        keys = [(kind, item_id) for kind, table in scene._tables() for item_id in table.ids]
+        for _ in range(100):
+            x, y = rng.uniform(-22, 22), rng.uniform(-22, 22)
+            tolerance = rng.uniform(0.1, 2)
+            expected = sorted(key for key in keys if scene.distance_to(key, x, y) <= tolerance)
+            hits = scene.items_within(x, y, tolerance)
+            self.assertEqual(sorted(key for _, key in hits), expected)
+            self.assertEqual([distance for distance, _ in hits],
+                             sorted(distance for distance, _ in hits))
+            nearest = scene.nearest(x, y, tolerance)
+            if expected:
+                best = min(scene.distance_to(key, x, y) for key in expected)
+                self.assertEqual(scene.distance_to(nearest, x, y), best)
+            else:
+                self.assertIsNone(nearest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+分条导出与一次性渲染的一致性测试
+"""
+import os
+import random
+import tempfile
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QImage
+
+from modules.scene import SceneStore
+from modules.scene_export import _ensure_app, render_to_image
+from modules.strip_export import export_png_strips
+
+
+def _sample_scene() -> SceneStore:
+    """含点、带标签的线段和多边形、圆的随机场景，长线段跨越多个条带"""
+    rng = random.Random(7)
+    scene = SceneStore()
+    colors = ["#FF0000", "#0000FF", "#000000"]
+    for i in range(400):
+        x, y = rng.uniform(-10, 10), rng.uniform(-8, 8)
+        color = rng.choice(colors)
+        kind = i % 4
+        if kind == 0:
+            scene.add_point(x, y, color)
+        elif kind == 1:
+            scene.add_line(x, y, x + rng.uniform(-6, 6), y + rng.uniform(-6, 6), color, "2.38")
+        elif kind == 2:
+            scene.add_circle(x, y, rng.uniform(0.05, 1.5), color)
+        else:
+            scene.add_polygon([(x, y), (x + 1, y), (x, y + 1.5)], color, ["1", "1.8", "1.5"])
+    return scene
+
+
+class StripExportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        _ensure_app()
+        cls.scene = _sample_scene()
+
+    def _assert_same_as_single_pass(self, width, height, ratio, strip_rows):
+        single = render_to_image(self.scene, width, height, ratio)
+        pixel_width = int(width * ratio)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bandes.png")
+            export_png_strips(self.scene, path, width, height, ratio,
+                              strip_bytes=pixel_width * 4 * strip_rows)
+            strips = QImage(path)
+        self.assertEqual(strips.size(), single.size())
+        single = single.convertToFormat(QImage.Format.Format_RGB32)
+        strips = strips.convertToFormat(QImage.Format.Format_RGB32)
+        different = sum(1 for y in range(single.height()) for x in range(single.width())
+                        if single.pixel(x, y) != strips.pixel(x, y))
+        self.assertEqual(different, 0)
+
+    def test_strips_match_single_pass(self):
+        self._assert_same_as_single_pass(800, 600, 1.0, 37)
+
+    def test_strips_match_single_pass_high_dpi(self):
+        self._assert_same_as_single_pass(400, 300, 2.0, 53)
+
+    def test_strips_match_single_pass_fractional_ratio(self):
+        self._assert_same_as_single_pass(400, 300, 1.5, 41)
+
+
+if __name__ == "__main__":
+    unittest.main()